@@ -0,0 +1,155 @@
+import sys
+from copy import copy
+from pathlib import Path
+from typing import Iterable
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from core.algorithms.dag import DAG
+from core.gitManager import CommitObj
+from core.tools.utils.simpleLogger import loggerPrint
+
+
+# 链压缩后的提交图视图，类似 git log --simplify-by-decoration
+# 只有一个父节点且只有一个子节点、并且没有被标记保留（分支头等）的提交组成的最长线性链会被折叠为一个超级节点
+# 超级节点的名称为链上第一个（最早的）提交加上 ".."，链在末端继续增长时名称保持不变
+# 折叠的链可以按需展开，展开状态在重新构建后保留
+class ChainCompressedDAG(DAG):
+    SUPER_NODE_SUFFIX = ".."
+
+    def __init__(self, source: DAG, keepNodes: Iterable[str] = (), minChainLength: int = 2, expanded: Iterable[str] = ()):
+        super().__init__()
+        self.source = source
+        self.keepNodes: set[str] = set(keepNodes)
+        self.minChainLength = minChainLength
+        self.expanded: set[str] = set(expanded)
+        self.chains: dict[str, list[str]] = {} # 超级节点 -> 链上的提交（从父到子）
+        self.chainOf: dict[str, str] = {} # 提交 -> 所属链的超级节点（包括已展开的链）
+        self.rebuild()
+
+    @classmethod
+    def superNodeName(cls, firstNode: str) -> str:
+        return firstNode + cls.SUPER_NODE_SUFFIX
+
+    def isSuperNode(self, node: str) -> bool:
+        return node in self.chains and node in self.graph
+
+    # 按当前的保留节点与展开状态，从源图重新构建压缩视图，O(V + E)
+    def rebuild(self) -> None:
+        sourceGraph = self.source.graph
+        parentsOf: dict[str, list[str]] = {node: [] for node in sourceGraph}
+        for node, children in sourceGraph.items():
+            for child in children:
+                parentsOf[child].append(node)
+
+        def isInternal(node: str) -> bool:
+            return len(parentsOf[node]) == 1 and len(sourceGraph[node]) == 1 and node not in self.keepNodes
+
+        self.chains = {}
+        self.chainOf = {}
+        for node in sourceGraph:
+            if not isInternal(node) or isInternal(parentsOf[node][0]):
+                continue
+            chain = [node]
+            child = next(iter(sourceGraph[node]))
+            while isInternal(child):
+                chain.append(child)
+                child = next(iter(sourceGraph[child]))
+            if len(chain) < self.minChainLength:
+                continue
+            superNode = self.superNodeName(node)
+            self.chains[superNode] = chain
+            for member in chain:
+                self.chainOf[member] = superNode
+        self.expanded &= set(self.chains)
+
+        # 直接写入邻接表：源图无环，收缩线性链不会产生环，逐条 add_edge 校验的开销没有必要
+        self.reset_graph()
+        for node in sourceGraph:
+            displayNode = self.displayNodeOf(node)
+            if displayNode not in self.graph:
+                self.graph[displayNode] = set()
+        for node, children in sourceGraph.items():
+            displayNode = self.displayNodeOf(node)
+            for child in children:
+                displayChild = self.displayNodeOf(child)
+                if displayChild != displayNode:
+                    self.graph[displayNode].add(displayChild)
+        self.version += 1
+
+    # 提交在当前视图中对应的节点
+    def displayNodeOf(self, node: str) -> str:
+        superNode = self.chainOf.get(node)
+        if superNode is None or superNode in self.expanded:
+            return node
+        return superNode
+
+    # 视图中的节点所代表的全部提交
+    def members(self, node: str) -> list[str]:
+        if self.isSuperNode(node):
+            return list(self.chains[node])
+        return [node]
+
+    def expand(self, superNode: str) -> bool:
+        if not self.isSuperNode(superNode):
+            return False
+        self.expanded.add(superNode)
+        self.rebuild()
+        return True
+
+    # 把某个已展开的提交所在的链重新折叠
+    def collapse(self, node: str) -> bool:
+        superNode = self.chainOf.get(node)
+        if superNode is None or superNode not in self.expanded:
+            return False
+        self.expanded.discard(superNode)
+        self.rebuild()
+        return True
+
+    def toggle(self, node: str) -> bool:
+        return self.expand(node) if self.isSuperNode(node) else self.collapse(node)
+
+    # 视图中每个节点对应的提交信息，父子关系换成视图中的节点，超级节点的信息由链上首尾提交汇总
+    def displayCommits(self, commitInfo: dict[str, CommitObj]) -> dict[str, CommitObj]:
+        displayInfo: dict[str, CommitObj] = {}
+        for node in self.graph:
+            if self.isSuperNode(node):
+                chain = self.chains[node]
+                first = commitInfo[chain[0]]
+                last = commitInfo[chain[-1]]
+                commitObj = CommitObj(
+                    hexSha=node,
+                    author=last.author,
+                    message=f"{len(chain)} 个提交: {first.hexSha}..{last.hexSha}",
+                    parents=[],
+                    children=[],
+                    branches=list(last.branches),
+                    commitDate=last.commitDate,
+                )
+                parents = first.parents
+                children = last.children
+            else:
+                commitObj = copy(commitInfo[node])
+                parents = commitObj.parents
+                children = commitObj.children
+            commitObj.parents = [self.displayNodeOf(parent) for parent in parents if parent in self.source.graph]
+            commitObj.children = [self.displayNodeOf(child) for child in children if child in self.source.graph]
+            displayInfo[node] = commitObj
+        return displayInfo
+
+
+if __name__ == '__main__':
+    dag = DAG()
+    for i in range(10):
+        dag.graph[f"c{i}"] = {f"c{i + 1}"} if i < 9 else set()
+    dag.graph["c3"].add("b0")
+    dag.graph["b0"] = {"b1"}
+    dag.graph["b1"] = {"b2"}
+    dag.graph["b2"] = set()
+    view = ChainCompressedDAG(dag, keepNodes=["c9", "b2"])
+    loggerPrint(f"{view.graph}")
+    view.expand("c4..")
+    loggerPrint(f"{view.graph}")
+    view.collapse("c6")
+    loggerPrint(f"{view.graph}")
\ No newline at end of file
@@ -0,0 +1,190 @@
+import sys
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from core.algorithms.dag import DAG
+from core.tools.utils.simpleLogger import loggerPrint
+
+
+# 以整数编号 + 压缩稀疏行（CSR）数组保存的只读有向无环图
+# 节点 i 的直接下游为 outTargets[outOffsets[i]:outOffsets[i + 1]]，直接上游为 inTargets[inOffsets[i]:inOffsets[i + 1]]
+# 查询接口与 DAG 保持一致，节点名称与整数编号之间通过 nodeNames / nodeIndex 互相转换
+class CsrDAG(object):
+    def __init__(self, nodeNames: list[str], srcIds: Iterable[int], dstIds: Iterable[int]):
+        self.nodeNames: list[str] = list(nodeNames)
+        self.nodeIndex: dict[str, int] = {name: i for i, name in enumerate(self.nodeNames)}
+        if len(self.nodeIndex) != len(self.nodeNames):
+            raise KeyError('duplicate node names')
+
+        nodeCount = len(self.nodeNames)
+        src = np.fromiter(srcIds, dtype=np.int32)
+        dst = np.fromiter(dstIds, dtype=np.int32)
+        if len(src) != len(dst):
+            raise ValueError('source and target id arrays differ in length')
+        if len(src) and (min(src.min(), dst.min()) < 0 or max(src.max(), dst.max()) >= nodeCount):
+            raise KeyError('edge references a node id out of range')
+
+        self.outOffsets, self.outTargets = self._buildCsr(src, dst, nodeCount)
+        self.inOffsets, self.inTargets = self._buildCsr(dst, src, nodeCount)
+
+        # 拓扑序只在第一次用到时计算，图不可变所以之后一直有效
+        self._topoOrder: Optional[np.ndarray] = None
+        self._topoRank: Optional[np.ndarray] = None
+
+    # 按 keys 分桶得到 offsets，同一个桶内保持边的原始顺序
+    @staticmethod
+    def _buildCsr(keys: np.ndarray, values: np.ndarray, nodeCount: int) -> tuple[np.ndarray, np.ndarray]:
+        order = np.argsort(keys, kind='stable')
+        offsets = np.zeros(nodeCount + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=nodeCount), out=offsets[1:])
+        return offsets, values[order]
+
+    @classmethod
+    def fromEdges(cls, nodeNames: list[str], edges: Iterable[tuple[str, str]]) -> 'CsrDAG':
+        index = {name: i for i, name in enumerate(nodeNames)}
+        src: list[int] = []
+        dst: list[int] = []
+        for indNode, depNode in edges:
+            if indNode not in index or depNode not in index:
+                raise KeyError('one or more nodes do not exist in graph')
+            src.append(index[indNode])
+            dst.append(index[depNode])
+        return cls(nodeNames, src, dst)
+
+    @classmethod
+    def fromDAG(cls, dag: DAG) -> 'CsrDAG':
+        return cls.fromEdges(list(dag.graph.keys()), dag.get_all_edges())
+
+    def _id(self, node: str) -> int:
+        nodeId = self.nodeIndex.get(node)
+        if nodeId is None:
+            raise KeyError('node %s is not in graph' % node)
+        return nodeId
+
+    def _names(self, ids: Iterable[int]) -> list[str]:
+        names = self.nodeNames
+        return [names[i] for i in ids]
+
+    def graphSize(self) -> int:
+        return len(self.nodeNames)
+
+    def edgeCount(self) -> int:
+        return len(self.outTargets)
+
+    # 各节点出度 / 入度，直接由 offsets 差分得到
+    def outDegrees(self) -> np.ndarray:
+        return np.diff(self.outOffsets)
+
+    def inDegrees(self) -> np.ndarray:
+        return np.diff(self.inOffsets)
+
+    def downstreamIds(self, nodeId: int) -> np.ndarray:
+        return self.outTargets[self.outOffsets[nodeId]:self.outOffsets[nodeId + 1]]
+
+    def upstreamIds(self, nodeId: int) -> np.ndarray:
+        return self.inTargets[self.inOffsets[nodeId]:self.inOffsets[nodeId + 1]]
+
+    def downstream(self, node: str) -> list[str]:
+        return self._names(self.downstreamIds(self._id(node)).tolist())
+
+    # 获取节点的直接上游节点
+    def upstream(self, node: str) -> list[str]:
+        return self._names(self.upstreamIds(self._id(node)).tolist())
+
+    def predecessors(self, node: str) -> list[str]:
+        return self.upstream(node)
+
+    def directNodes(self, node: str) -> list[str]:
+        return self.upstream(node) + self.downstream(node)
+
+    def all_leaves(self) -> list[str]:
+        return self._names(np.flatnonzero(self.outDegrees() == 0).tolist())
+
+    def ind_nodes(self) -> list[str]:
+        return self._names(np.flatnonzero(self.inDegrees() == 0).tolist())
+
+    def get_all_edges(self) -> list[tuple[str, str]]:
+        src = np.repeat(np.arange(self.graphSize()), self.outDegrees()).tolist()
+        return list(zip(self._names(src), self._names(self.outTargets.tolist())))
+
+    # Kahn 算法，结果按编号缓存；入度数组整体计算后再在 python 列表上遍历
+    def topologicalOrderIds(self) -> np.ndarray:
+        if self._topoOrder is not None:
+            return self._topoOrder
+
+        nodeCount = self.graphSize()
+        inDegree = self.inDegrees().tolist()
+        offsets = self.outOffsets.tolist()
+        targets = self.outTargets.tolist()
+        ready = np.flatnonzero(self.inDegrees() == 0).tolist()
+        ready.reverse()
+        result: list[int] = []
+        while ready:
+            u = ready.pop()
+            result.append(u)
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                inDegree[v] -= 1
+                if inDegree[v] == 0:
+                    ready.append(v)
+
+        if len(result) != nodeCount:
+            raise ValueError('graph is not acyclic')
+
+        self._topoOrder = np.asarray(result, dtype=np.int32)
+        self._topoRank = np.empty(nodeCount, dtype=np.int32)
+        self._topoRank[self._topoOrder] = np.arange(nodeCount, dtype=np.int32)
+        return self._topoOrder
+
+    def topological_sort(self) -> list[str]:
+        return self._names(self.topologicalOrderIds().tolist())
+
+    # 从 nodeId 出发可达的所有节点编号（不含自身），按拓扑序排列
+    def allDownstreamIds(self, nodeId: int) -> np.ndarray:
+        offsets = self.outOffsets
+        targets = self.outTargets
+        visited = bytearray(self.graphSize())
+        stack = [nodeId]
+        found: list[int] = []
+        while stack:
+            u = stack.pop()
+            for v in targets[offsets[u]:offsets[u + 1]].tolist():
+                if not visited[v]:
+                    visited[v] = 1
+                    found.append(v)
+                    stack.append(v)
+
+        self.topologicalOrderIds()
+        ranks = np.sort(self._topoRank[np.asarray(found, dtype=np.int32)]) # type: ignore
+        return self._topoOrder[ranks] # type: ignore
+
+    def all_downstreams(self, node: str) -> list[str]:
+        return self._names(self.allDownstreamIds(self._id(node)).tolist())
+
+    def toDAG(self) -> DAG:
+        dag = DAG()
+        for name in self.nodeNames:
+            dag.graph[name] = set()
+        for indNode, depNode in self.get_all_edges():
+            dag.graph[indNode].add(depNode)
+        return dag
+
+
+if __name__ == '__main__':
+    dag = DAG()
+    dag.from_dict({
+        "a": ["b", "d"],
+        "b": ["c"],
+        "c": ["e"],
+        "d": [],
+        "e": [],
+    })
+    csr = CsrDAG.fromDAG(dag)
+    loggerPrint(f"{csr.topological_sort()}")
+    loggerPrint(f"{csr.all_downstreams("b")}")
+    loggerPrint(f"{csr.all_leaves()} {csr.ind_nodes()}")
+    loggerPrint(f"{csr.upstream("e")} {csr.downstream("a")}")
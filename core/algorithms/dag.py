@@ -7,12 +7,18 @@ rootPath = str(Path(__file__).resolve().parent.parent.parent)
 sys.path.append(rootPath)
 
 from core.tools.utils.simpleLogger import loggerPrint
+from core.tools.utils.decorators.versionCache import versionCached
 
 class DAG(object):
     """ Directed acyclic graph implementation. """
 
+    # all_downstreams 按节点缓存的条目上限
+    ALL_DOWNSTREAMS_CACHE_SIZE = 1024
+
     def __init__(self):
         """ Construct a new DAG with no nodes or edges. """
+        # 修改计数，每次增删节点或边都会加一，遍历类查询的缓存以此判断是否失效
+        self.version = 0
         self.reset_graph()
 
     def add_node(self, node_name, graph=None):
@@ -22,6 +28,7 @@ class DAG(object):
         if node_name in graph:
             raise KeyError('node %s already exists' % node_name)
         graph[node_name] = set()
+        self.version += 1
 
     def add_node_if_not_exists(self, node_name, graph=None):
         try:
@@ -40,6 +47,7 @@ class DAG(object):
         for node, edges in graph.items():
             if node_name in edges:
                 edges.remove(node_name)
+        self.version += 1
 
     def delete_node_if_exists(self, node_name, graph=None):
         try:
@@ -58,6 +66,7 @@ class DAG(object):
         is_valid, message = self.validate(test_graph)
         if is_valid:
             graph[ind_node].add(dep_node)
+            self.version += 1
         else:
             raise Exception()
 
@@ -68,6 +77,7 @@ class DAG(object):
         if dep_node not in graph.get(ind_node, []):
             raise KeyError('this edge does not exist in graph')
         graph[ind_node].remove(dep_node)
+        self.version += 1
 
     def rename_edges(self, old_task_name, new_task_name, graph=None):
         """ Change references to a task in existing edges. """
@@ -83,6 +93,7 @@ class DAG(object):
                 if old_task_name in edges:
                     edges.remove(old_task_name)
                     edges.add(new_task_name)
+        self.version += 1
 
     def predecessors(self, node, graph=None):
         """ Returns a list of all predecessors of the given node """
@@ -98,6 +109,7 @@ class DAG(object):
             raise KeyError('node %s is not in graph' % node)
         return list(graph[node])
 
+    @versionCached(maxSize=ALL_DOWNSTREAMS_CACHE_SIZE)
     def all_downstreams(self, node, graph=None):
         """Returns a list of all nodes ultimately downstream
         of the given node in the dependency graph, in
@@ -114,6 +126,9 @@ class DAG(object):
                     nodes_seen.add(downstream_node)
                     nodes.append(downstream_node)
             i += 1
+        if graph is self.graph:
+            rank = self._topological_rank()
+            return sorted(nodes_seen, key=rank.__getitem__)
         return list(
             filter(
                 lambda node: node in nodes_seen,
@@ -121,6 +136,7 @@ class DAG(object):
             )
         )
 
+    @versionCached()
     def all_leaves(self, graph=None):
         """ Return a list of all leaves (nodes with no downstreams) """
         if graph is None:
@@ -144,7 +160,9 @@ class DAG(object):
     def reset_graph(self):
         """ Restore the graph to an empty state. """
         self.graph = OrderedDict()
+        self.version += 1
 
+    @versionCached()
     def ind_nodes(self, graph=None):
         """ Returns a list of all nodes in the graph with no dependencies. """
         if graph is None:
@@ -166,6 +184,7 @@ class DAG(object):
             return False, 'failed topological sort'
         return True, 'valid'
 
+    @versionCached()
     def topological_sort(self, graph=None):
         """ Returns a topological ordering of the DAG.
         Raises an error if this is not possible (graph is not valid).
@@ -193,6 +212,11 @@ class DAG(object):
         else:
             raise ValueError('graph is not acyclic')
 
+    # 节点在拓扑序中的位置，用于把一组节点按拓扑序排列
+    @versionCached()
+    def _topological_rank(self) -> dict[str, int]:
+        return {node: i for i, node in enumerate(self.topological_sort())}
+
     def graphSize(self):
         return len(self.graph)
 
@@ -0,0 +1,112 @@
+import sys
+from pathlib import Path
+from typing import Optional
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from core.algorithms.dag import DAG
+from core.algorithms.mergeBase import MergeBaseIndex
+from core.tools.utils.simpleLogger import loggerPrint
+
+
+# 图结构分析结果
+class GraphStructureReport:
+    # 最多记录的环的个数，每个环会记录完整路径
+    MAX_REPORTED_CYCLES = 16
+
+    def __init__(self):
+        self.cycles: list[list[str]] = [] # 每个环按边的方向记录节点，首尾相接
+        self.merges: list[str] = [] # 有多个父节点的合并提交
+        self.roots: list[str] = [] # 没有父节点的节点
+        self.diamonds: list[tuple[str, str]] = [] # (分叉节点, 合并节点)，分叉后又合并形成的菱形
+
+    def hasCycle(self) -> bool:
+        return len(self.cycles) != 0
+
+    def hasMerge(self) -> bool:
+        return len(self.merges) != 0
+
+    def hasMultipleRoots(self) -> bool:
+        return len(self.roots) > 1
+
+    def hasDiamond(self) -> bool:
+        return len(self.diamonds) != 0
+
+
+# 对整个图做一次 O(V + E) 的迭代遍历，分别统计环、合并提交、根节点与菱形结构
+# mergeBaseIndex 为调用方已为同一个图建立的索引，与图的修改计数不一致或未提供时才重新建立
+def analyzeStructure(dag: DAG, mergeBaseIndex: Optional[MergeBaseIndex] = None) -> GraphStructureReport:
+    graph = dag.graph
+    report = GraphStructureReport()
+
+    parentsOf: dict[str, list[str]] = {node: [] for node in graph}
+    for node, deps in graph.items():
+        for dep in deps:
+            parentsOf[dep].append(node)
+    report.roots = [node for node, parents in parentsOf.items() if len(parents) == 0]
+    report.merges = [node for node, parents in parentsOf.items() if len(parents) > 1]
+
+    # 三色迭代 DFS，从每个未访问的节点出发以覆盖整个图（包括没有根的环）
+    # pathIndex 记录当前路径上（灰色）节点在 path 中的位置，遇到指向灰色节点的边即为一个环
+    WHITE, GRAY, BLACK = 0, 1, 2
+    color: dict[str, int] = dict.fromkeys(graph, WHITE)
+    for start in graph:
+        if color[start] != WHITE:
+            continue
+        color[start] = GRAY
+        path: list[str] = [start]
+        pathIndex: dict[str, int] = {start: 0}
+        stack = [iter(graph[start])]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                finished = path.pop()
+                pathIndex.pop(finished)
+                color[finished] = BLACK
+                continue
+            if color[node] == WHITE:
+                color[node] = GRAY
+                pathIndex[node] = len(path)
+                path.append(node)
+                stack.append(iter(graph[node]))
+            elif color[node] == GRAY and len(report.cycles) < GraphStructureReport.MAX_REPORTED_CYCLES:
+                report.cycles.append(path[pathIndex[node]:] + [node])
+
+    # 有环时无法建立 merge-base 索引，菱形结构只在无环时统计
+    if report.hasCycle() or not report.hasMerge():
+        return report
+
+    if mergeBaseIndex is None or mergeBaseIndex.graphVersion != dag.version:
+        mergeBaseIndex = MergeBaseIndex.fromDAG(dag)
+    pairs: list[tuple[str, str]] = []
+    mergeOfPair: list[str] = []
+    for merge in report.merges:
+        parents = parentsOf[merge]
+        for parent in parents[1:]:
+            pairs.append((parents[0], parent))
+            mergeOfPair.append(merge)
+    diamonds: set[tuple[str, str]] = set()
+    for merge, fork in zip(mergeOfPair, mergeBaseIndex.batchMergeBase(pairs)):
+        if fork is not None and (fork, merge) not in diamonds:
+            diamonds.add((fork, merge))
+            report.diamonds.append((fork, merge))
+
+    return report
+
+
+if __name__ == '__main__':
+    dag = DAG()
+    dag.from_dict({
+        "a": ["b", "c"],
+        "b": ["d"],
+        "c": ["d"],
+        "d": [],
+        "x": [],
+    })
+    report = analyzeStructure(dag)
+    loggerPrint(f"roots: {report.roots}, merges: {report.merges}, diamonds: {report.diamonds}, cycles: {report.cycles}")
+    dag.graph["d"].add("a")
+    report = analyzeStructure(dag)
+    loggerPrint(f"roots: {report.roots}, merges: {report.merges}, diamonds: {report.diamonds}, cycles: {report.cycles}")
\ No newline at end of file
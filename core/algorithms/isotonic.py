@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from core.tools.utils.simpleLogger import loggerPrint
+
+
+# 分段保序回归（PAVA）：每段内在拟合值单调不减的约束下最小化 sum((fit[i] - values[i]) ^ 2)
+# 相邻块的平均值逆序时合并，块内取平均值；每一轮把所有连续逆序的块一次合并，全部为 NumPy 向量运算
+# 一串平均值递减的块按顺序逐个合并时每一步都仍是逆序，因此一次合并与逐个合并的结果相同
+# 轮数为最长的连锁合并次数，没有逆序时只做一轮检查
+# isStart 标记每段的第一个元素，省略时整体为一段；返回拟合值与每个元素所在块的大小（为 1 表示没有被合并，拟合值即原值）
+def isotonicFit(values, isStart: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+    values = np.asarray(values, dtype=np.float64)
+    count = len(values)
+    if isStart is None:
+        isStart = np.zeros(count, dtype=bool)
+        if count:
+            isStart[0] = True
+    sums = values.copy()
+    sizes = np.ones(count, dtype=np.int64)
+    blockStarts = np.asarray(isStart, dtype=bool)
+    while len(sums) > 1:
+        means = sums / sizes
+        merge = ~blockStarts[1:] & (means[1:] < means[:-1])
+        if not merge.any():
+            break
+        keep = np.concatenate(([True], ~merge))
+        groups = np.cumsum(keep) - 1
+        sums = np.bincount(groups, weights=sums)
+        sizes = np.bincount(groups, weights=sizes).astype(np.int64)
+        blockStarts = blockStarts[keep]
+    return np.repeat(sums / sizes, sizes), np.repeat(sizes, sizes)
+
+
+if __name__ == '__main__':
+    fitted, sizes = isotonicFit([1.0, 3.0, 2.0, 0.0, 5.0, 4.0, 6.0], np.array([True, False, False, False, True, False, False]))
+    loggerPrint(f"fitted: {fitted.tolist()}, block sizes: {sizes.tolist()}")
\ No newline at end of file
@@ -0,0 +1,122 @@
+import sys
+import heapq
+from pathlib import Path
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from core.tools.utils.simpleLogger import loggerPrint
+
+
+# 类似 git log --graph 的泳道布局，输入输出都是按节点编号排列的普通列表，不依赖 Qt
+#   1. 行：按拓扑序排列，同时可选的节点按 sortKeys（提交时间）从早到晚取，每个节点独占一行
+#   2. 泳道：从最新的一行往回扫一遍，每条泳道记录它正在等待的父节点
+#      节点占用等待它的最左边的泳道，其余等待它的泳道释放（分支在此分叉）
+#      第一父节点接着占用节点所在的泳道，其余父节点（合并）优先复用已经在等待它的泳道，否则取编号最小的空闲泳道
+# 泳道的颜色键在泳道开始时确定，沿第一父节点一直延续，同一分支每次布局得到同一个颜色键
+# parents[v] 为节点 v 的父节点编号（第一个为第一父节点），colorKeys[v] 为节点作为分支头时的分支名，不是分支头时为空
+class LaneLayout:
+    def __init__(self, parents: list[list[int]], sortKeys: list[str], colorKeys: list[str]):
+        if not (len(parents) == len(sortKeys) == len(colorKeys)):
+            raise ValueError('parents, sortKeys and colorKeys differ in length')
+        self.parents = parents
+        self.sortKeys = sortKeys
+        self.colorKeys = colorKeys
+
+        self.nodeCount = len(parents)
+        self.rows: list[int] = []
+        self.levels: list[int] = []
+        self.lanes: list[int] = []
+        self.laneColorKeys: list[str] = []
+        self.laneCount = 0
+
+    def run(self) -> 'LaneLayout':
+        self.assignRows()
+        self.assignLanes()
+        return self
+
+    # 带优先队列的 Kahn 算法，父节点都已排好的节点中先取时间最早的，O((V + E) log V)
+    def assignRows(self) -> None:
+        nodeCount = self.nodeCount
+        children: list[list[int]] = [[] for _ in range(nodeCount)]
+        inDegree = [0] * nodeCount
+        for v, parents in enumerate(self.parents):
+            for p in parents:
+                children[p].append(v)
+            inDegree[v] = len(parents)
+
+        sortKeys = self.sortKeys
+        levels = [0] * nodeCount
+        ready = [(sortKeys[v], v) for v in range(nodeCount) if inDegree[v] == 0]
+        heapq.heapify(ready)
+        order: list[int] = []
+        while ready:
+            _, u = heapq.heappop(ready)
+            order.append(u)
+            for v in children[u]:
+                levels[v] = max(levels[v], levels[u] + 1)
+                inDegree[v] -= 1
+                if inDegree[v] == 0:
+                    heapq.heappush(ready, (sortKeys[v], v))
+        if len(order) != nodeCount:
+            raise ValueError('graph is not acyclic')
+
+        rows = [0] * nodeCount
+        for row, v in enumerate(order):
+            rows[v] = row
+        self.order = order
+        self.rows = rows
+        self.levels = levels
+
+    def assignLanes(self) -> None:
+        lanes = [0] * self.nodeCount
+        nodeColorKeys = [""] * self.nodeCount
+        laneColorKeys: list[str] = [] # 每条泳道当前的颜色键
+        waiting: dict[int, list[int]] = {} # 父节点 -> 正在等待它的泳道
+        freeLanes: list[int] = [] # 空闲泳道，最小堆
+
+        def claimLane(colorKey: str) -> int:
+            if freeLanes:
+                lane = heapq.heappop(freeLanes)
+                laneColorKeys[lane] = colorKey
+            else:
+                lane = len(laneColorKeys)
+                laneColorKeys.append(colorKey)
+            return lane
+
+        for v in reversed(self.order):
+            expecting = waiting.pop(v, None)
+            if expecting:
+                lane = min(expecting)
+                for other in expecting:
+                    if other != lane:
+                        heapq.heappush(freeLanes, other)
+            else:
+                # 没有泳道在等待，说明是分支头
+                lane = claimLane(self.colorKeys[v] or f"lane-{v}")
+            lanes[v] = lane
+            nodeColorKeys[v] = laneColorKeys[lane]
+
+            parents = self.parents[v]
+            if not parents:
+                heapq.heappush(freeLanes, lane)
+                continue
+            waiting.setdefault(parents[0], []).append(lane)
+            for p in parents[1:]:
+                if p in waiting:
+                    continue
+                waiting[p] = [claimLane(self.colorKeys[p] or f"lane-{p}")]
+
+        self.lanes = lanes
+        self.laneColorKeys = nodeColorKeys
+        self.laneCount = len(laneColorKeys)
+
+
+if __name__ == '__main__':
+    # a <- b <- c <- e(merge c, d), b <- d
+    layout = LaneLayout(
+        parents=[[], [0], [1], [1], [2, 3]],
+        sortKeys=["1", "2", "3", "4", "5"],
+        colorKeys=["", "", "", "", "main"],
+    ).run()
+    loggerPrint(f"rows: {layout.rows}, lanes: {layout.lanes}, colors: {layout.laneColorKeys}")
\ No newline at end of file
@@ -0,0 +1,260 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from core.algorithms.isotonic import isotonicFit
+from core.tools.utils.simpleLogger import loggerPrint
+
+
+# 分层（Sugiyama）布局，输入输出都是按节点编号排列的普通列表，不依赖 Qt
+#   1. 分层：按拓扑序取最长路径，level[v] = max(level[parent]) + 1
+#   2. 跨越多层的边拆成逐层的虚拟节点
+#   3. 交叉减少：上下交替按重心（相邻层邻居位置的平均值）排序，保留交叉数最少的一次
+#   4. 坐标分配：每层在保持顺序与最小间距的前提下，用保序回归让节点尽量靠近相邻层邻居的平均横坐标
+# parents[v] 为节点 v 的父节点编号（第一个为第一父节点），widths[v] 为节点宽度
+# 结果 xs / ys 为节点左上角坐标，第一层 y 为 0，每层向下 verticalSpacing
+class LayeredLayout:
+    DUMMY_SPACING_RATIO = 0.5 # 虚拟节点与相邻节点之间只保留一半的间距
+
+    def __init__(
+        self,
+        parents: list[list[int]],
+        widths: list[float],
+        horizontalSpacing: float,
+        verticalSpacing: float,
+        sweeps: int = 4,
+    ):
+        if len(parents) != len(widths):
+            raise ValueError('parents and widths differ in length')
+        self.parents = parents
+        self.widths = widths
+        self.horizontalSpacing = horizontalSpacing
+        self.verticalSpacing = verticalSpacing
+        self.sweeps = sweeps
+
+        self.nodeCount = len(parents)
+        self.levels: list[int] = []
+        self.xs: list[float] = []
+        self.ys: list[float] = []
+
+        # 中间结果，编号不小于 nodeCount 的为虚拟节点
+        self.children: list[list[int]] = []
+        self.topoOrder: list[int] = []
+        self.allLevels: list[int] = []
+        self.upper: list[list[int]] = []
+        self.lower: list[list[int]] = []
+        self.layers: list[list[int]] = []
+        self.crossings = 0
+
+    def run(self) -> 'LayeredLayout':
+        self.assignLevels()
+        self.insertDummies()
+        self.reduceCrossings()
+        self.assignCoordinates()
+        return self
+
+    def assignLevels(self) -> None:
+        nodeCount = self.nodeCount
+        children: list[list[int]] = [[] for _ in range(nodeCount)]
+        inDegree = [0] * nodeCount
+        for v, parents in enumerate(self.parents):
+            for p in parents:
+                children[p].append(v)
+            inDegree[v] = len(parents)
+
+        levels = [0] * nodeCount
+        ready = [v for v in range(nodeCount) if inDegree[v] == 0]
+        ready.reverse()
+        order: list[int] = []
+        while ready:
+            u = ready.pop()
+            order.append(u)
+            for v in reversed(children[u]):
+                levels[v] = max(levels[v], levels[u] + 1)
+                inDegree[v] -= 1
+                if inDegree[v] == 0:
+                    ready.append(v)
+        if len(order) != nodeCount:
+            raise ValueError('graph is not acyclic')
+
+        self.levels = levels
+        self.children = children
+        self.topoOrder = order
+
+    # 把每条边拆成只跨一层的边，upper / lower 为所有节点（含虚拟节点）在上一层 / 下一层的邻居
+    def insertDummies(self) -> None:
+        levels = list(self.levels)
+        upper: list[list[int]] = [[] for _ in range(self.nodeCount)]
+        lower: list[list[int]] = [[] for _ in range(self.nodeCount)]
+        for u in self.topoOrder:
+            for v in self.children[u]:
+                prev = u
+                for level in range(levels[u] + 1, levels[v]):
+                    dummy = len(levels)
+                    levels.append(level)
+                    upper.append([prev])
+                    lower.append([])
+                    lower[prev].append(dummy)
+                    prev = dummy
+                lower[prev].append(v)
+                upper[v].append(prev)
+
+        # 初始顺序：按拓扑序（深度优先的第一父节点顺序）依次放入各层，虚拟节点紧跟在其上方节点之后
+        layers: list[list[int]] = [[] for _ in range(max(levels, default=-1) + 1)]
+        placed = bytearray(len(levels))
+        for u in self.topoOrder:
+            stack = [u]
+            while stack:
+                w = stack.pop()
+                if placed[w]:
+                    continue
+                placed[w] = 1
+                layers[levels[w]].append(w)
+                stack.extend(x for x in reversed(lower[w]) if x >= self.nodeCount)
+
+        self.allLevels = levels
+        self.upper = upper
+        self.lower = lower
+        self.layers = layers
+
+    # 相邻两层之间的交叉数：按上层位置排序后统计下层位置的逆序对，树状数组 O(E log V)
+    @staticmethod
+    def countCrossings(upperLayer: list[int], lowerPos: dict[int, int], lower: list[list[int]], lowerSize: int) -> int:
+        if len(upperLayer) < 2 or lowerSize < 2:
+            return 0
+        tree = [0] * (lowerSize + 1)
+        crossings = 0
+        seen = 0
+        for u in upperLayer:
+            targets = sorted(lowerPos[v] for v in lower[u])
+            for pos in targets:
+                # 统计已插入且位置大于 pos 的个数
+                i = pos + 1
+                notGreater = 0
+                while i > 0:
+                    notGreater += tree[i]
+                    i -= i & -i
+                crossings += seen - notGreater
+            for pos in targets:
+                i = pos + 1
+                while i <= lowerSize:
+                    tree[i] += 1
+                    i += i & -i
+                seen += 1
+        return crossings
+
+    def totalCrossings(self, layers: list[list[int]]) -> int:
+        total = 0
+        for i in range(len(layers) - 1):
+            if len(layers[i]) < 2 or len(layers[i + 1]) < 2:
+                continue
+            lowerPos = {v: pos for pos, v in enumerate(layers[i + 1])}
+            total += self.countCrossings(layers[i], lowerPos, self.lower, len(layers[i + 1]))
+        return total
+
+    # 按邻居在相邻层中位置的平均值排序，没有邻居的节点保持原位置
+    @staticmethod
+    def sortByBarycenter(layer: list[int], neighbors: list[list[int]], neighborPos: dict[int, int]) -> list[int]:
+        if len(layer) < 2:
+            return layer
+        keys: list[tuple[float, int]] = []
+        for pos, v in enumerate(layer):
+            adjacent = neighbors[v]
+            if adjacent:
+                keys.append((sum(neighborPos[w] for w in adjacent) / len(adjacent), pos))
+            else:
+                keys.append((float(pos), pos))
+        return [layer[pos] for _, pos in sorted(keys)]
+
+    def reduceCrossings(self) -> None:
+        layers = self.layers
+        best = [list(layer) for layer in layers]
+        bestCrossings = self.totalCrossings(layers)
+        for sweep in range(self.sweeps):
+            if bestCrossings == 0:
+                break
+            if sweep % 2 == 0:
+                for i in range(1, len(layers)):
+                    if len(layers[i]) < 2:
+                        continue
+                    prevPos = {v: pos for pos, v in enumerate(layers[i - 1])}
+                    layers[i] = self.sortByBarycenter(layers[i], self.upper, prevPos)
+            else:
+                for i in range(len(layers) - 2, -1, -1):
+                    if len(layers[i]) < 2:
+                        continue
+                    nextPos = {v: pos for pos, v in enumerate(layers[i + 1])}
+                    layers[i] = self.sortByBarycenter(layers[i], self.lower, nextPos)
+            crossings = self.totalCrossings(layers)
+            if crossings < bestCrossings:
+                bestCrossings = crossings
+                best = [list(layer) for layer in layers]
+        self.layers = best
+        self.crossings = bestCrossings
+
+    def _width(self, v: int) -> float:
+        return self.widths[v] if v < self.nodeCount else 0.0
+
+    # 在 x[i + 1] - x[i] >= gap[i] 的约束下最小化 sum((x[i] - desired[i]) ^ 2)
+    # 减去间距的前缀和后约束变为单调不减，即保序回归（PAVA）
+    @staticmethod
+    def placeLayer(desired: list[float], gaps: list[float]) -> list[float]:
+        if len(desired) < 2:
+            return desired
+        offsets = np.concatenate(([0.0], np.cumsum(gaps)))
+        fitted, _ = isotonicFit(np.asarray(desired, dtype=np.float64) - offsets)
+        return (fitted + offsets).tolist()
+
+    # 自上而下、自下而上、再自上而下三次分配，最后一次让子节点尽量居中于父节点下方
+    def assignCoordinates(self) -> None:
+        centers = [0.0] * len(self.allLevels)
+        gapsOf: list[list[float]] = []
+        for layer in self.layers:
+            gaps: list[float] = []
+            for a, b in zip(layer, layer[1:]):
+                spacing = self.horizontalSpacing
+                if a >= self.nodeCount or b >= self.nodeCount:
+                    spacing *= self.DUMMY_SPACING_RATIO
+                gaps.append((self._width(a) + self._width(b)) / 2 + spacing)
+            gapsOf.append(gaps)
+
+        def place(layerIndex: int, neighbors: list[list[int]]) -> None:
+            layer = self.layers[layerIndex]
+            desired: list[float] = []
+            for pos, v in enumerate(layer):
+                adjacent = neighbors[v]
+                if adjacent:
+                    desired.append(sum(centers[w] for w in adjacent) / len(adjacent))
+                elif pos > 0:
+                    desired.append(desired[-1] + gapsOf[layerIndex][pos - 1])
+                else:
+                    desired.append(centers[v])
+            for v, x in zip(layer, self.placeLayer(desired, gapsOf[layerIndex])):
+                centers[v] = x
+
+        layerCount = len(self.layers)
+        for i in range(layerCount):
+            place(i, self.upper)
+        for i in range(layerCount - 2, -1, -1):
+            place(i, self.lower)
+        for i in range(1, layerCount):
+            place(i, self.upper)
+
+        self.xs = [centers[v] - self.widths[v] / 2 for v in range(self.nodeCount)]
+        self.ys = [self.levels[v] * self.verticalSpacing for v in range(self.nodeCount)]
+
+
+if __name__ == '__main__':
+    # a -> b, a -> c, b -> d, c -> d, a -> e
+    layout = LayeredLayout(
+        parents=[[], [0], [0], [1, 2], [0]],
+        widths=[30, 30, 30, 30, 30],
+        horizontalSpacing=100,
+        verticalSpacing=100,
+    ).run()
+    loggerPrint(f"levels: {layout.levels}, crossings: {layout.crossings}")
+    loggerPrint(f"xs: {layout.xs}, ys: {layout.ys}")
\ No newline at end of file
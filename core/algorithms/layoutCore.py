@@ -0,0 +1,117 @@
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from core.algorithms.layeredLayout import LayeredLayout
+from core.algorithms.laneLayout import LaneLayout
+from core.tools.utils.simpleLogger import loggerPrint
+
+
+LAYOUT_MODE_LAYERED = "layered" # 分层布局，子节点居中排列在父节点下方
+LAYOUT_MODE_LANES = "lanes" # 泳道布局，每个节点一行，按时间排序
+LAYOUT_MODES = (LAYOUT_MODE_LAYERED, LAYOUT_MODE_LANES)
+
+
+# 布局计算的输入，只包含普通列表与数值，可以直接交给线程或进程
+# nodeIds[i] 为第 i 个节点，parents[i] 为其父节点下标，widths[i] 为其宽度，centers[i] 为其中心到外接矩形左边的距离
+# 泳道布局另外需要 sortKeys（用于按时间排序行）和 colorKeys（作为分支头时的分支名），此时两个间距分别为泳道宽度与行高
+# generation 由发起方填写，结果原样带回，用来丢弃过期的布局结果
+class LayoutRequest:
+    def __init__(
+        self,
+        nodeIds: list[str],
+        parents: list[list[int]],
+        widths: list[float],
+        horizontalSpacing: float,
+        verticalSpacing: float,
+        generation: int = 0,
+        mode: str = LAYOUT_MODE_LAYERED,
+        centers: Optional[list[float]] = None,
+        sortKeys: Optional[list[str]] = None,
+        colorKeys: Optional[list[str]] = None,
+    ):
+        self.nodeIds = nodeIds
+        self.parents = parents
+        self.widths = widths
+        self.horizontalSpacing = horizontalSpacing
+        self.verticalSpacing = verticalSpacing
+        self.generation = generation
+        self.mode = mode
+        self.centers = centers if centers is not None else [width / 2 for width in widths]
+        self.sortKeys = sortKeys if sortKeys is not None else [""] * len(nodeIds)
+        self.colorKeys = colorKeys if colorKeys is not None else [""] * len(nodeIds)
+
+
+# 布局计算的输出，xs / ys 为节点外接矩形左上角坐标，与请求中的 nodeIds 一一对应
+# 泳道布局时 colorKeys 为各节点所在泳道的颜色键，分层布局时为空
+class LayoutResult:
+    def __init__(
+        self,
+        nodeIds: list[str],
+        xs: list[float],
+        ys: list[float],
+        levels: list[int],
+        crossings: int = 0,
+        generation: int = 0,
+        colorKeys: Optional[list[str]] = None,
+    ):
+        self.nodeIds = nodeIds
+        self.xs = xs
+        self.ys = ys
+        self.levels = levels
+        self.crossings = crossings
+        self.generation = generation
+        self.colorKeys = colorKeys if colorKeys is not None else []
+
+
+def computeLayout(request: LayoutRequest) -> LayoutResult:
+    if request.mode == LAYOUT_MODE_LANES:
+        return computeLaneLayout(request)
+    if request.mode != LAYOUT_MODE_LAYERED:
+        raise ValueError(f"unknown layout mode: {request.mode}")
+    layout = LayeredLayout(
+        parents=request.parents,
+        widths=request.widths,
+        horizontalSpacing=request.horizontalSpacing,
+        verticalSpacing=request.verticalSpacing,
+    ).run()
+    return LayoutResult(request.nodeIds, layout.xs, layout.ys, layout.levels, layout.crossings, request.generation)
+
+
+# 节点中心落在泳道中线上
+def computeLaneLayout(request: LayoutRequest) -> LayoutResult:
+    layout = LaneLayout(request.parents, request.sortKeys, request.colorKeys).run()
+    xs = [lane * request.horizontalSpacing - center for lane, center in zip(layout.lanes, request.centers)]
+    ys = [row * request.verticalSpacing for row in layout.rows]
+    return LayoutResult(request.nodeIds, xs, ys, layout.levels, generation=request.generation, colorKeys=layout.laneColorKeys)
+
+
+# 布局是纯 python 计算，在线程中执行会一直占着 GIL 拖慢界面，节点较多时放到子进程中执行
+# 子进程用 spawn 启动，避免在已有 Qt 线程的进程中 fork
+_processPool: Optional[ProcessPoolExecutor] = None
+
+def getLayoutProcessPool() -> ProcessPoolExecutor:
+    global _processPool
+    if _processPool is None:
+        _processPool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    return _processPool
+
+def computeLayoutInProcess(request: LayoutRequest) -> LayoutResult:
+    return getLayoutProcessPool().submit(computeLayout, request).result()
+
+
+if __name__ == '__main__':
+    request = LayoutRequest(
+        nodeIds=["a", "b", "c", "d"],
+        parents=[[], [0], [0], [1, 2]],
+        widths=[30, 30, 30, 30],
+        horizontalSpacing=100,
+        verticalSpacing=100,
+    )
+    result = computeLayoutInProcess(request)
+    loggerPrint(f"{result.nodeIds} {result.xs} {result.ys} {result.levels}")
\ No newline at end of file
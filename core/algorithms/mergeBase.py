@@ -0,0 +1,197 @@
+import sys
+import heapq
+from pathlib import Path
+from itertools import combinations
+from typing import Optional
+
+import numpy as np
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from core.algorithms.dag import DAG
+from core.algorithms.csrDag import CsrDAG
+from core.tools.utils.simpleLogger import loggerPrint
+
+
+# 最近公共祖先 / merge-base 查询
+# 预处理：在 first-parent 树上建立倍增表（up[k][v] 为 v 沿第一父节点向上 2^k 步的节点）
+# 两个节点的祖先中都不含合并提交时，树上的 LCA 就是 merge-base，单次查询 O(log n)
+# 否则按 git 的做法，沿 generation 从大到小同时从两端染色，第一个被两端都染到的节点即为 merge-base
+class MergeBaseIndex(object):
+    def __init__(self, csr: CsrDAG, firstParents: Optional[dict[str, str]] = None):
+        self.csr = csr
+        self.graphVersion: Optional[int] = None # 由 DAG 建立时记录其修改计数，供调用方判断索引是否仍对应当前的图
+        nodeCount = csr.graphSize()
+        inDegrees = csr.inDegrees()
+
+        # 第一父节点，默认取入边中的第一条，有提交顺序信息时以 firstParents 为准
+        firstParent = np.full(nodeCount, -1, dtype=np.int32)
+        hasParent = inDegrees > 0
+        firstParent[hasParent] = csr.inTargets[csr.inOffsets[:-1][hasParent]]
+        for child, parent in (firstParents or {}).items():
+            childId = csr.nodeIndex.get(child)
+            parentId = csr.nodeIndex.get(parent)
+            if childId is not None and parentId is not None:
+                firstParent[childId] = parentId
+
+        # 按拓扑序计算树深度、树根、generation（到根的最长路径）以及祖先中是否含合并提交
+        depth = [0] * nodeCount
+        treeRoot = list(range(nodeCount))
+        generation = [0] * nodeCount
+        pure = [True] * nodeCount
+        fpList = firstParent.tolist()
+        inOffsets = csr.inOffsets.tolist()
+        inTargets = csr.inTargets.tolist()
+        for v in csr.topologicalOrderIds().tolist():
+            parents = inTargets[inOffsets[v]:inOffsets[v + 1]]
+            if not parents:
+                continue
+            fp = fpList[v]
+            depth[v] = depth[fp] + 1
+            treeRoot[v] = treeRoot[fp]
+            generation[v] = max(generation[p] for p in parents) + 1
+            pure[v] = len(parents) == 1 and pure[fp]
+
+        self.depth = np.asarray(depth, dtype=np.int32)
+        self.treeRoot = np.asarray(treeRoot, dtype=np.int32)
+        self.generation: list[int] = generation
+        self.pure = np.asarray(pure, dtype=np.bool_)
+
+        # 倍增表，根节点指向自身
+        up0 = np.where(firstParent >= 0, firstParent, np.arange(nodeCount, dtype=np.int32)).astype(np.int32)
+        self.up: list[np.ndarray] = [up0]
+        for _ in range(1, max(1, int(self.depth.max(initial=0)).bit_length())):
+            prev = self.up[-1]
+            self.up.append(prev[prev])
+
+    @classmethod
+    def fromDAG(cls, dag: DAG, firstParents: Optional[dict[str, str]] = None) -> 'MergeBaseIndex':
+        index = cls(CsrDAG.fromDAG(dag), firstParents)
+        index.graphVersion = dag.version
+        return index
+
+    # first-parent 树上的 LCA，不在同一棵树上时返回 -1
+    def treeLcaId(self, a: int, b: int) -> int:
+        if self.treeRoot[a] != self.treeRoot[b]:
+            return -1
+        if self.depth[a] < self.depth[b]:
+            a, b = b, a
+        diff = int(self.depth[a] - self.depth[b])
+        k = 0
+        while diff:
+            if diff & 1:
+                a = int(self.up[k][a])
+            diff >>= 1
+            k += 1
+        if a == b:
+            return a
+        for k in range(len(self.up) - 1, -1, -1):
+            upA = int(self.up[k][a])
+            upB = int(self.up[k][b])
+            if upA != upB:
+                a, b = upA, upB
+        return int(self.up[0][a])
+
+    # 沿 generation 递减的顺序从 a、b 两端向上染色
+    # 一个节点出队时，它所有可能的后代都已处理过，所以第一个两端颜色都有的节点就是 generation 最大的公共祖先
+    def _paintWalkId(self, a: int, b: int) -> int:
+        generation = self.generation
+        inOffsets = self.csr.inOffsets
+        inTargets = self.csr.inTargets
+        flags: dict[int, int] = {a: 1}
+        flags[b] = flags.get(b, 0) | 2
+        heap = [(-generation[a], a)] if a == b else [(-generation[a], a), (-generation[b], b)]
+        heapq.heapify(heap)
+        while heap:
+            _, v = heapq.heappop(heap)
+            flag = flags[v]
+            if flag == 3:
+                return v
+            for p in inTargets[inOffsets[v]:inOffsets[v + 1]].tolist():
+                oldFlag = flags.get(p)
+                if oldFlag is None:
+                    flags[p] = flag
+                    heapq.heappush(heap, (-generation[p], p))
+                else:
+                    flags[p] = oldFlag | flag
+        return -1
+
+    def mergeBaseId(self, a: int, b: int) -> int:
+        if a == b:
+            return a
+        if self.pure[a] and self.pure[b]:
+            return self.treeLcaId(a, b)
+        return self._paintWalkId(a, b)
+
+    def mergeBase(self, nodeA: str, nodeB: str) -> Optional[str]:
+        a = self.csr.nodeIndex.get(nodeA)
+        b = self.csr.nodeIndex.get(nodeB)
+        if a is None or b is None:
+            raise KeyError('one or more nodes do not exist in graph')
+        base = self.mergeBaseId(a, b)
+        return self.csr.nodeNames[base] if base >= 0 else None
+
+    # 批量查询：对 first-parent 树上的部分一次性向量化倍增，含合并祖先的节点对再逐个染色
+    def batchMergeBase(self, pairs: list[tuple[str, str]]) -> list[Optional[str]]:
+        if not pairs:
+            return []
+        index = self.csr.nodeIndex
+        try:
+            a = np.fromiter((index[x] for x, _ in pairs), dtype=np.int32, count=len(pairs))
+            b = np.fromiter((index[y] for _, y in pairs), dtype=np.int32, count=len(pairs))
+        except KeyError:
+            raise KeyError('one or more nodes do not exist in graph')
+
+        sameTree = self.treeRoot[a] == self.treeRoot[b]
+        swap = self.depth[a] < self.depth[b]
+        a, b = np.where(swap, b, a), np.where(swap, a, b)
+        diff = self.depth[a] - self.depth[b]
+        for k, up in enumerate(self.up):
+            lift = (diff >> k) & 1 == 1
+            a[lift] = up[a[lift]]
+        for up in reversed(self.up):
+            move = up[a] != up[b]
+            a[move] = up[a[move]]
+            b[move] = up[b[move]]
+        lca = np.where(a == b, a, self.up[0][a])
+        lca[~sameTree] = -1
+
+        origA = [index[x] for x, _ in pairs]
+        origB = [index[y] for _, y in pairs]
+        pure = (self.pure[origA] & self.pure[origB]).tolist()
+        names = self.csr.nodeNames
+        result: list[Optional[str]] = []
+        for i, base in enumerate(lca.tolist()):
+            if origA[i] == origB[i]:
+                base = origA[i]
+            elif not pure[i]:
+                base = self._paintWalkId(origA[i], origB[i])
+            result.append(names[base] if base >= 0 else None)
+        return result
+
+    # 所有分支两两之间的分叉点，branchHeads 为 {分支名: 分支头提交}
+    def branchMergeBases(self, branchHeads: dict[str, str]) -> dict[tuple[str, str], Optional[str]]:
+        branchPairs = [
+            (branchA, branchB)
+            for branchA, branchB in combinations(branchHeads.keys(), 2)
+            if branchHeads[branchA] in self.csr.nodeIndex and branchHeads[branchB] in self.csr.nodeIndex
+        ]
+        bases = self.batchMergeBase([(branchHeads[x], branchHeads[y]) for x, y in branchPairs])
+        return dict(zip(branchPairs, bases))
+
+
+if __name__ == '__main__':
+    dag = DAG()
+    dag.from_dict({
+        "a": ["b"],
+        "b": ["c", "d"],
+        "c": ["e"],
+        "d": ["e", "f"],
+        "e": [],
+        "f": [],
+    })
+    mergeBaseIndex = MergeBaseIndex.fromDAG(dag, firstParents={"e": "c"})
+    loggerPrint(f"{mergeBaseIndex.mergeBase("c", "f")}")
+    loggerPrint(f"{mergeBaseIndex.mergeBase("e", "f")}")
+    loggerPrint(f"{mergeBaseIndex.branchMergeBases({"main": "e", "dev": "f", "old": "c"})}")
\ No newline at end of file
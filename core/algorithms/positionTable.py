@@ -0,0 +1,100 @@
+import sys
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from core.tools.utils.simpleLogger import loggerPrint
+
+
+# 节点坐标表：节点名称与坐标分别保存在列表与 NumPy 数组中，不依赖 Qt
+# 场景虚拟化时所有节点的坐标都只保存在这里，按区域查询可见节点是一次向量比较
+# 还没有坐标的节点记为 NaN，查询时不会返回
+# 同时保存节点之间的连线（两端节点的编号），按区域查询连线时两端都使用表中的坐标
+class PositionTable:
+    def __init__(self):
+        self.ids: list[str] = []
+        self.index: dict[str, int] = {}
+        self.xs = np.empty(0, dtype=np.float64)
+        self.ys = np.empty(0, dtype=np.float64)
+        self.edgeIds: list[tuple[str, str]] = []
+        self.edgeFrom = np.empty(0, dtype=np.int64)
+        self.edgeTo = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, nodeId: str) -> bool:
+        return nodeId in self.index
+
+    # 按给定的节点重建坐标表，返回没有坐标的节点（保持给定顺序），之前登记的连线一并清空
+    def reset(self, ids: list[str], positions: dict[str, tuple[float, float]]) -> list[str]:
+        self.ids = list(ids)
+        self.index = {nodeId: i for i, nodeId in enumerate(self.ids)}
+        self.setEdges([])
+        self.xs = np.full(len(self.ids), np.nan)
+        self.ys = np.full(len(self.ids), np.nan)
+        missing: list[str] = []
+        for i, nodeId in enumerate(self.ids):
+            pos = positions.get(nodeId)
+            if pos is None:
+                missing.append(nodeId)
+                continue
+            self.xs[i], self.ys[i] = pos
+        return missing
+
+    def clear(self) -> None:
+        self.reset([], {})
+
+    def get(self, nodeId: str) -> Optional[tuple[float, float]]:
+        i = self.index.get(nodeId)
+        if i is None or np.isnan(self.xs[i]):
+            return None
+        return float(self.xs[i]), float(self.ys[i])
+
+    def set(self, nodeId: str, x: float, y: float) -> None:
+        i = self.index.get(nodeId)
+        if i is None:
+            return
+        self.xs[i] = x
+        self.ys[i] = y
+
+    # 登记节点之间的连线，只保留两端都在表中的连线
+    def setEdges(self, edges: Iterable[tuple[str, str]]) -> None:
+        self.edgeIds = [(a, b) for a, b in edges if a in self.index and b in self.index]
+        self.edgeFrom = np.fromiter((self.index[a] for a, _ in self.edgeIds), dtype=np.int64, count=len(self.edgeIds))
+        self.edgeTo = np.fromiter((self.index[b] for _, b in self.edgeIds), dtype=np.int64, count=len(self.edgeIds))
+
+    # 两端坐标的外接矩形与区域相交的连线，两端都在区域外、只是穿过区域的连线也会返回
+    # 任意一端没有坐标（NaN）的连线不会返回
+    def queryEdges(self, left: float, top: float, right: float, bottom: float) -> list[tuple[str, str]]:
+        x0, x1 = self.xs[self.edgeFrom], self.xs[self.edgeTo]
+        y0, y1 = self.ys[self.edgeFrom], self.ys[self.edgeTo]
+        mask = (np.minimum(x0, x1) <= right) & (np.maximum(x0, x1) >= left) & (np.minimum(y0, y1) <= bottom) & (np.maximum(y0, y1) >= top)
+        edgeIds = self.edgeIds
+        return [edgeIds[i] for i in np.flatnonzero(mask).tolist()]
+
+    # 坐标落在区域内的节点
+    def query(self, left: float, top: float, right: float, bottom: float) -> list[str]:
+        mask = (self.xs >= left) & (self.xs <= right) & (self.ys >= top) & (self.ys <= bottom)
+        ids = self.ids
+        return [ids[i] for i in np.flatnonzero(mask).tolist()]
+
+    def positions(self) -> dict[str, tuple[float, float]]:
+        valid = np.flatnonzero(~np.isnan(self.xs)).tolist()
+        xs = self.xs.tolist()
+        ys = self.ys.tolist()
+        return {self.ids[i]: (xs[i], ys[i]) for i in valid}
+
+
+if __name__ == '__main__':
+    table = PositionTable()
+    missing = table.reset(["a", "b", "c"], {"a": (0.0, 0.0), "b": (500.0, 100.0)})
+    loggerPrint(f"missing: {missing}, in view: {table.query(-10, -10, 100, 100)}")
+    table.set("c", 50.0, 50.0)
+    loggerPrint(f"in view: {table.query(-10, -10, 100, 100)}, {table.positions()}")
+    table.setEdges([("a", "b"), ("b", "c")])
+    loggerPrint(f"edges crossing (200, 0) - (300, 200): {table.queryEdges(200, 0, 300, 200)}")
\ No newline at end of file
@@ -0,0 +1,98 @@
+import sys
+from math import floor
+from pathlib import Path
+from typing import Iterator
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from core.tools.utils.simpleLogger import loggerPrint
+
+
+# 均匀网格空间哈希，用作碰撞检测的粗筛
+# 每个键（节点名称）按外接矩形 (left, top, right, bottom) 登记到覆盖的所有网格中
+# 移动后只在跨越网格时更新网格登记，查询只访问区域覆盖的网格，开销与局部密度成正比
+class SpatialHash:
+    def __init__(self, cellSize: float):
+        if cellSize <= 0:
+            raise ValueError('cellSize must be positive')
+        self.cellSize = cellSize
+        self.cells: dict[tuple[int, int], set[str]] = {}
+        self.bounds: dict[str, tuple[float, float, float, float]] = {}
+        self.cellRanges: dict[str, tuple[int, int, int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.bounds
+
+    def cellRange(self, left: float, top: float, right: float, bottom: float) -> tuple[int, int, int, int]:
+        size = self.cellSize
+        return floor(left / size), floor(top / size), floor(right / size), floor(bottom / size)
+
+    @staticmethod
+    def _cellsOf(cellRange: tuple[int, int, int, int]) -> Iterator[tuple[int, int]]:
+        x0, y0, x1, y1 = cellRange
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                yield (x, y)
+
+    # 登记或更新一个键的外接矩形
+    def update(self, key: str, left: float, top: float, right: float, bottom: float) -> None:
+        newRange = self.cellRange(left, top, right, bottom)
+        oldRange = self.cellRanges.get(key)
+        self.bounds[key] = (left, top, right, bottom)
+        if oldRange == newRange:
+            return
+        if oldRange is not None:
+            for cell in self._cellsOf(oldRange):
+                keys = self.cells.get(cell)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.cells[cell]
+        for cell in self._cellsOf(newRange):
+            self.cells.setdefault(cell, set()).add(key)
+        self.cellRanges[key] = newRange
+
+    def remove(self, key: str) -> None:
+        oldRange = self.cellRanges.pop(key, None)
+        self.bounds.pop(key, None)
+        if oldRange is None:
+            return
+        for cell in self._cellsOf(oldRange):
+            keys = self.cells.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.cells[cell]
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.bounds.clear()
+        self.cellRanges.clear()
+
+    # 外接矩形与给定区域相交的所有键
+    def query(self, left: float, top: float, right: float, bottom: float) -> set[str]:
+        found: set[str] = set()
+        for cell in self._cellsOf(self.cellRange(left, top, right, bottom)):
+            keys = self.cells.get(cell)
+            if keys:
+                found.update(keys)
+        bounds = self.bounds
+        return {
+            key for key in found
+            if bounds[key][0] < right and bounds[key][2] > left and bounds[key][1] < bottom and bounds[key][3] > top
+        }
+
+
+if __name__ == '__main__':
+    spatialHash = SpatialHash(100)
+    spatialHash.update("a", 0, 0, 30, 55)
+    spatialHash.update("b", 20, 10, 60, 65)
+    spatialHash.update("c", 500, 0, 530, 55)
+    loggerPrint(f"{sorted(spatialHash.query(0, 0, 30, 55))}")
+    spatialHash.update("c", 10, 0, 40, 55)
+    spatialHash.remove("b")
+    loggerPrint(f"{sorted(spatialHash.query(0, 0, 30, 55))}, cells: {len(spatialHash.cells)}")
\ No newline at end of file
@@ -2,6 +2,7 @@ import sys
 import os
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 from git import Repo
 from rich import print
 
@@ -9,6 +10,7 @@ rootPath = str(Path(__file__).resolve().parent.parent)
 sys.path.append(rootPath)
 
 from core.algorithms.dag import DAG
+from core.algorithms.mergeBase import MergeBaseIndex
 
 
 class CommitObj:
@@ -46,6 +48,10 @@ class GitRepoInfoMgr(DAG):
     def __init__(self, repoPath: str):
         super().__init__()
 
+        self.mergeBaseIndex: Optional[MergeBaseIndex] = None
+        # 所有分支两两之间的分叉点，页面加载时批量计算
+        self.branchMergeBases: dict[tuple[str, str], Optional[str]] = {}
+
         self.initRepo(repoPath)
 
     def initRepo(self, repoPath: str):
@@ -86,6 +92,9 @@ class GitRepoInfoMgr(DAG):
         repoBranch = [branch.name for branch in self.gitRepo.branches]
         return repoBranch
 
+    def getRepoBranchHeads(self) -> dict[str, str]:
+        return {branch.name: branch.commit.hexsha[:8] for branch in self.gitRepo.branches}
+
     def getCommitHashFromEachBranch(self, branchNameList: list[str]) -> dict[str, list]:
         commitsInEachBranch: dict[str, list] = {}
         for branchName in branchNameList:
@@ -117,12 +126,31 @@ class GitRepoInfoMgr(DAG):
         if repoPath != "":
             self.initRepo(repoPath)
         self.reset_graph()
+        self.mergeBaseIndex = None
         commitInfoDict = self.getBasicRepoCommitInfo()
         branchNameList = self.getRepoBranchInfo()
         commitsInEachBranch = self.getCommitHashFromEachBranch(branchNameList)
         commitInfoDict = self.addBranchInfoToCommitDict(commitInfoDict, commitsInEachBranch)
         return self.addChildInfoToCommitDict(commitInfoDict)
 
+    # 构建 merge-base 索引，第一父节点取提交记录中的父节点顺序
+    def buildMergeBaseIndex(self, commitInfo: dict[str, CommitObj]) -> MergeBaseIndex:
+        firstParents = {commitHash: commitObj.parents[0] for commitHash, commitObj in commitInfo.items() if commitObj.parents}
+        self.mergeBaseIndex = MergeBaseIndex.fromDAG(self, firstParents)
+        return self.mergeBaseIndex
+
+    # 两个提交的分叉点（最近公共祖先），没有公共祖先时返回 None
+    def mergeBase(self, commitA: str, commitB: str) -> Optional[str]:
+        if self.mergeBaseIndex is None:
+            self.mergeBaseIndex = MergeBaseIndex.fromDAG(self)
+        return self.mergeBaseIndex.mergeBase(commitA, commitB)
+
+    # 批量计算所有分支两两之间的分叉点
+    def updateBranchMergeBases(self, commitInfo: dict[str, CommitObj]) -> dict[tuple[str, str], Optional[str]]:
+        mergeBaseIndex = self.buildMergeBaseIndex(commitInfo)
+        self.branchMergeBases = mergeBaseIndex.branchMergeBases(self.getRepoBranchHeads())
+        return self.branchMergeBases
+
     # 通过 mr 节点关系建立有向无环图
     # def createDAG(self, commitInfo: Optional[dict[str, CommitObj]] = None) -> DAG:
     #     commitInfo = self.getRepoRawCommitInfo() if commitInfo is None else commitInfo
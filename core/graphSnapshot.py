@@ -0,0 +1,301 @@
+import os
+import sys
+import mmap
+import time
+import struct
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+rootPath = str(Path(__file__).resolve().parent.parent)
+sys.path.append(rootPath)
+
+from core.algorithms.dag import DAG
+from core.gitManager import CommitObj
+from core.tools.publicDef.levelDefs import LogLevels
+from core.tools.utils.simpleLogger import loggerPrint
+
+# 提交图 + 节点坐标的二进制快照
+# 文件布局：文件头 | 段表 | 各段数据（8 字节对齐）
+#   文件头：magic, 版本号, 段数, 节点数, 父节点引用数, 分支引用数, 坐标数, 字符串数, 仓库路径字符串编号, 创建时间
+#   段表：每段 (标签, 偏移, 字节长度)，读取时按标签查找，新增段不影响旧版本读取
+# 节点的名称、作者、提交信息、日期、分支名都存为字符串表中的编号，父节点按节点编号以 CSR 形式保存（保持父节点顺序）
+# 坐标按显示图中的节点名称单独保存，可以包含链压缩后的超级节点
+SNAPSHOT_MAGIC = b"GGSMSNAP"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_DIR = "cache"
+SNAPSHOT_EXT = "snap"
+
+_HEADER = struct.Struct("<8sHHIIIIIIQ")
+_SECTION = struct.Struct("<4sQQ")
+_ALIGN = 8
+
+# 段标签 -> 数据类型
+_SECTION_DTYPES: dict[bytes, np.dtype] = {
+    b"NODE": np.dtype("<i4"), # 节点名称
+    b"AUTH": np.dtype("<i4"), # 作者
+    b"MESG": np.dtype("<i4"), # 提交信息
+    b"DATE": np.dtype("<i4"), # 提交日期
+    b"POFF": np.dtype("<i8"), # 父节点偏移 [N + 1]
+    b"PARN": np.dtype("<i4"), # 父节点编号
+    b"BOFF": np.dtype("<i8"), # 分支偏移 [N + 1]
+    b"BRCH": np.dtype("<i4"), # 分支名称
+    b"PNAM": np.dtype("<i4"), # 坐标对应的显示节点名称
+    b"POSX": np.dtype("<f8"),
+    b"POSY": np.dtype("<f8"),
+    b"SOFF": np.dtype("<i8"), # 字符串偏移 [S + 1]
+    b"STRS": np.dtype("u1"), # utf-8 字符串数据
+}
+
+
+# 快照对应的缓存文件，按仓库绝对路径区分
+def snapshotPathOf(repoPath: str) -> str:
+    repoKey = hashlib.sha1(os.path.abspath(repoPath).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(SNAPSHOT_DIR, f"{repoKey}.{SNAPSHOT_EXT}")
+
+
+# 字符串表，每个字符串后跟一个 \0，读取时整张表一次解码后切分
+class _StringTable:
+    def __init__(self):
+        self.index: dict[str, int] = {}
+        self.data: list[bytes] = []
+
+    def id(self, text: str) -> int:
+        stringId = self.index.get(text)
+        if stringId is None:
+            stringId = len(self.data)
+            self.index[text] = stringId
+            self.data.append(text.encode("utf-8") + b"\0")
+        return stringId
+
+    def offsets(self) -> np.ndarray:
+        offsets = np.zeros(len(self.data) + 1, dtype="<i8")
+        np.cumsum([len(item) for item in self.data], out=offsets[1:])
+        return offsets
+
+
+# 写入快照，先写临时文件再替换，避免读到写了一半的文件
+def writeSnapshot(
+    path: str,
+    commitInfo: dict[str, CommitObj],
+    positions: dict[str, tuple[float, float]],
+    repoPath: str = "",
+) -> None:
+    strings = _StringTable()
+    names = list(commitInfo.keys())
+    # 节点名称最先写入字符串表，编号与节点编号一致
+    for name in names:
+        strings.id(name)
+    nodeIndex = {name: i for i, name in enumerate(names)}
+    commits = [commitInfo[name] for name in names]
+
+    parentCounts = [0] * len(commits)
+    parentIds: list[int] = []
+    branchCounts = [0] * len(commits)
+    branchIds: list[int] = []
+    for i, commitObj in enumerate(commits):
+        parents = [nodeIndex[parent] for parent in commitObj.parents if parent in nodeIndex]
+        parentCounts[i] = len(parents)
+        parentIds.extend(parents)
+        branchCounts[i] = len(commitObj.branches)
+        branchIds.extend(strings.id(branch) for branch in commitObj.branches)
+
+    def offsetsOf(counts: list[int]) -> np.ndarray:
+        offsets = np.zeros(len(counts) + 1, dtype="<i8")
+        np.cumsum(counts, out=offsets[1:])
+        return offsets
+
+    positionNames = list(positions.keys())
+    sections: dict[bytes, np.ndarray] = {
+        b"NODE": np.fromiter((strings.id(name) for name in names), dtype="<i4", count=len(names)),
+        b"AUTH": np.fromiter((strings.id(commitObj.author or "") for commitObj in commits), dtype="<i4", count=len(commits)),
+        b"MESG": np.fromiter((strings.id(commitObj.message) for commitObj in commits), dtype="<i4", count=len(commits)),
+        b"DATE": np.fromiter((strings.id(commitObj.commitDate) for commitObj in commits), dtype="<i4", count=len(commits)),
+        b"POFF": offsetsOf(parentCounts),
+        b"PARN": np.asarray(parentIds, dtype="<i4"),
+        b"BOFF": offsetsOf(branchCounts),
+        b"BRCH": np.asarray(branchIds, dtype="<i4"),
+        b"PNAM": np.fromiter((strings.id(name) for name in positionNames), dtype="<i4", count=len(positionNames)),
+        b"POSX": np.fromiter((positions[name][0] for name in positionNames), dtype="<f8", count=len(positionNames)),
+        b"POSY": np.fromiter((positions[name][1] for name in positionNames), dtype="<f8", count=len(positionNames)),
+    }
+    repoPathId = strings.id(os.path.abspath(repoPath) if repoPath else "")
+    sections[b"SOFF"] = strings.offsets()
+    sections[b"STRS"] = np.frombuffer(b"".join(strings.data), dtype="u1")
+
+    def aligned(offset: int) -> int:
+        return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+    offset = aligned(_HEADER.size + _SECTION.size * len(sections))
+    table: list[bytes] = []
+    for tag, array in sections.items():
+        table.append(_SECTION.pack(tag, offset, array.nbytes))
+        offset = aligned(offset + array.nbytes)
+
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        len(sections),
+        len(names),
+        len(parentIds),
+        len(branchIds),
+        len(positionNames),
+        len(strings.data),
+        repoPathId,
+        int(time.time()),
+    )
+
+    parentFolder = os.path.dirname(os.path.abspath(path))
+    if not os.path.exists(parentFolder):
+        os.makedirs(parentFolder)
+    tmpPath = f"{path}.tmp"
+    with open(tmpPath, "wb") as f:
+        f.write(header)
+        f.write(b"".join(table))
+        for array in sections.values():
+            f.write(b"\0" * (aligned(f.tell()) - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmpPath, path)
+
+
+# 已打开的快照，各段数组直接映射在文件上，需要时再解码成提交信息与坐标
+class GraphSnapshot:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.buffer) < _HEADER.size:
+            raise ValueError("snapshot file is truncated")
+        (
+            magic,
+            version,
+            sectionCount,
+            self.nodeCount,
+            self.parentCount,
+            self.branchCount,
+            self.positionCount,
+            self.stringCount,
+            repoPathId,
+            self.createdTime,
+        ) = _HEADER.unpack_from(self.buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("not a graph snapshot file")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+
+        self.arrays: dict[bytes, np.ndarray] = {}
+        for i in range(sectionCount):
+            tag, offset, length = _SECTION.unpack_from(self.buffer, _HEADER.size + _SECTION.size * i)
+            dtype = _SECTION_DTYPES.get(tag)
+            if dtype is None:
+                continue
+            if offset + length > len(self.buffer) or length % dtype.itemsize:
+                raise ValueError(f"snapshot section {tag!r} is out of range")
+            self.arrays[tag] = np.frombuffer(self.buffer, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+        missing = [tag for tag in _SECTION_DTYPES if tag not in self.arrays]
+        if missing:
+            raise ValueError(f"snapshot sections missing: {missing}")
+
+        self.strings = self._decodeStrings()
+        self.repoPath = self.strings[repoPathId]
+        self.nodeNames: list[str] = self._lookup(b"NODE")
+
+    def close(self) -> None:
+        self.arrays.clear()
+        self.buffer.close()
+
+    # 整体解码后按 \0 切分，字符串本身含有 \0 时退回逐个解码
+    def _decodeStrings(self) -> list[str]:
+        offsets = self.arrays[b"SOFF"].tolist()
+        data = self.arrays[b"STRS"].tobytes()
+        if self.stringCount == 0:
+            return []
+        strings = data[:-1].decode("utf-8").split("\0")
+        if len(strings) != self.stringCount:
+            strings = [data[offsets[i]:offsets[i + 1] - 1].decode("utf-8") for i in range(self.stringCount)]
+        return strings
+
+    def _lookup(self, tag: bytes) -> list[str]:
+        strings = self.strings
+        return [strings[i] for i in self.arrays[tag].tolist()]
+
+    # 按 CSR 偏移把扁平数组切分为每个节点的列表
+    @staticmethod
+    def _split(offsets: np.ndarray, values: list) -> list[list]:
+        bounds = offsets.tolist()
+        return [values[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+    # 直接写入 dag 的邻接表（父节点 -> 子节点）
+    def fillDAG(self, dag: DAG) -> None:
+        names = self.nodeNames
+        dag.reset_graph()
+        graph = dag.graph
+        for name in names:
+            graph[name] = set()
+        childIds = np.repeat(np.arange(self.nodeCount), np.diff(self.arrays[b"POFF"])).tolist()
+        for parent, child in zip(self.arrays[b"PARN"].tolist(), childIds):
+            graph[names[parent]].add(names[child])
+        dag.version += 1
+
+    def commitInfo(self) -> dict[str, CommitObj]:
+        names = self.nodeNames
+        parentIds = self.arrays[b"PARN"].tolist()
+        parentsOf = [[names[parent] for parent in parents] for parents in self._split(self.arrays[b"POFF"], parentIds)]
+        childrenOf: dict[str, list[str]] = {name: [] for name in names}
+        for child, parents in zip(names, parentsOf):
+            for parent in parents:
+                childrenOf[parent].append(child)
+
+        commitInfo: dict[str, CommitObj] = {}
+        for name, author, message, date, parents, branches in zip(
+            names,
+            self._lookup(b"AUTH"),
+            self._lookup(b"MESG"),
+            self._lookup(b"DATE"),
+            parentsOf,
+            self._split(self.arrays[b"BOFF"], self._lookup(b"BRCH")),
+        ):
+            commitInfo[name] = CommitObj(
+                hexSha=name,
+                author=author,
+                message=message,
+                parents=parents,
+                children=childrenOf[name],
+                branches=branches,
+                commitDate=date,
+            )
+        return commitInfo
+
+    def positions(self) -> dict[str, tuple[float, float]]:
+        return dict(zip(self._lookup(b"PNAM"), zip(self.arrays[b"POSX"].tolist(), self.arrays[b"POSY"].tolist())))
+
+
+# 读取快照，文件不存在、版本不符或内容损坏时返回 None
+def loadSnapshot(path: str) -> Optional[GraphSnapshot]:
+    if not os.path.isfile(path):
+        return None
+    try:
+        return GraphSnapshot(path)
+    except (OSError, ValueError, UnicodeDecodeError) as e:
+        loggerPrint(f"快照无法读取: {path}, {e}", level=LogLevels.WARNING)
+        return None
+
+
+if __name__ == '__main__':
+    commitInfo = {
+        "a": CommitObj(hexSha="a", author="x", message="init", parents=[], children=["b", "c"], branches=["main", "dev"], commitDate="2025-05-03 10:00:00"),
+        "b": CommitObj(hexSha="b", author="x", message="save 1", parents=["a"], children=[], branches=["main"], commitDate="2025-05-03 11:00:00"),
+        "c": CommitObj(hexSha="c", author="y", message="save 2", parents=["a"], children=[], branches=["dev"], commitDate="2025-05-03 12:00:00"),
+    }
+    path = os.path.join(SNAPSHOT_DIR, "demo.snap")
+    writeSnapshot(path, commitInfo, {"a": (0.0, 0.0), "b": (-65.0, 100.0), "c": (65.0, 100.0)}, "demo")
+    snapshot = loadSnapshot(path)
+    if snapshot is not None:
+        dag = DAG()
+        snapshot.fillDAG(dag)
+        loggerPrint(f"{snapshot.repoPath} {dag.graph} {snapshot.positions()}")
+        loggerPrint(f"{[(k, v.parents, v.children, v.branches) for k, v in snapshot.commitInfo().items()]}")
+        snapshot.close()
\ No newline at end of file
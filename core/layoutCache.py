@@ -0,0 +1,100 @@
+import os
+import sys
+import struct
+import hashlib
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+rootPath = str(Path(__file__).resolve().parent.parent)
+sys.path.append(rootPath)
+
+from core.tools.publicDef.levelDefs import LogLevels
+from core.tools.utils.simpleLogger import loggerPrint
+
+# 节点坐标缓存，每个仓库一个文件，按显示图中的节点名称（提交 id 或链压缩后的超级节点）保存坐标
+# 与快照分开保存：拖动节点后只需要重写坐标，不需要重写整个提交图
+# 文件布局：文件头 | xs | ys | 节点名称（utf-8，以 \0 分隔）
+#   文件头：magic, 版本号, 节点数, 节点集合哈希, 布局模式
+# 节点集合哈希与当前显示图的节点集合一致时缓存完整有效，否则只有仍存在的节点的坐标可用
+LAYOUT_CACHE_MAGIC = b"GGSMLAYT"
+LAYOUT_CACHE_VERSION = 1
+LAYOUT_CACHE_DIR = "cache"
+LAYOUT_CACHE_EXT = "layout"
+
+_HEADER = struct.Struct("<8sHxxI20s16s")
+
+
+# 坐标缓存对应的文件，按仓库绝对路径区分
+def layoutCachePathOf(repoPath: str) -> str:
+    repoKey = hashlib.sha1(os.path.abspath(repoPath).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(LAYOUT_CACHE_DIR, f"{repoKey}.{LAYOUT_CACHE_EXT}")
+
+
+# 节点集合的哈希，与节点顺序无关
+def commitSetHash(nodeIds: Iterable[str]) -> bytes:
+    return hashlib.sha1("\n".join(sorted(nodeIds)).encode("utf-8")).digest()
+
+
+class LayoutCache:
+    def __init__(self, setHash: bytes, mode: str, positions: dict[str, tuple[float, float]]):
+        self.setHash = setHash
+        self.mode = mode
+        self.positions = positions
+
+
+# 写入坐标缓存，先写临时文件再替换，避免读到写了一半的文件
+def writeLayoutCache(path: str, setHash: bytes, mode: str, positions: dict[str, tuple[float, float]]) -> None:
+    names = list(positions.keys())
+    xs = np.fromiter((positions[name][0] for name in names), dtype="<f8", count=len(names))
+    ys = np.fromiter((positions[name][1] for name in names), dtype="<f8", count=len(names))
+    header = _HEADER.pack(LAYOUT_CACHE_MAGIC, LAYOUT_CACHE_VERSION, len(names), setHash, mode.encode("utf-8"))
+
+    parentFolder = os.path.dirname(os.path.abspath(path))
+    if not os.path.exists(parentFolder):
+        os.makedirs(parentFolder)
+    tmpPath = f"{path}.tmp"
+    with open(tmpPath, "wb") as f:
+        f.write(header)
+        f.write(xs.tobytes())
+        f.write(ys.tobytes())
+        f.write("\0".join(names).encode("utf-8"))
+    os.replace(tmpPath, path)
+
+
+# 读取坐标缓存，文件不存在、版本不符或内容损坏时返回 None
+def loadLayoutCache(path: str) -> Optional[LayoutCache]:
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ValueError("layout cache file is truncated")
+        magic, version, count, setHash, mode = _HEADER.unpack_from(data, 0)
+        if magic != LAYOUT_CACHE_MAGIC:
+            raise ValueError("not a layout cache file")
+        if version != LAYOUT_CACHE_VERSION:
+            raise ValueError(f"unsupported layout cache version {version}")
+        namesOffset = _HEADER.size + count * 16
+        if len(data) < namesOffset:
+            raise ValueError("layout cache file is truncated")
+        xs = np.frombuffer(data, dtype="<f8", count=count, offset=_HEADER.size).tolist()
+        ys = np.frombuffer(data, dtype="<f8", count=count, offset=_HEADER.size + count * 8).tolist()
+        names = data[namesOffset:].decode("utf-8").split("\0") if count else []
+        if len(names) != count:
+            raise ValueError("layout cache names do not match positions")
+    except (OSError, ValueError, UnicodeDecodeError) as e:
+        loggerPrint(f"坐标缓存无法读取: {path}, {e}", level=LogLevels.WARNING)
+        return None
+    return LayoutCache(setHash, mode.rstrip(b"\0").decode("utf-8"), dict(zip(names, zip(xs, ys))))
+
+
+if __name__ == '__main__':
+    path = os.path.join(LAYOUT_CACHE_DIR, "demo.layout")
+    positions = {"a": (0.0, 0.0), "b": (-65.0, 100.0), "c": (65.0, 100.0)}
+    writeLayoutCache(path, commitSetHash(positions), "layered", positions)
+    cache = loadLayoutCache(path)
+    if cache is not None:
+        loggerPrint(f"{cache.mode} {cache.setHash == commitSetHash(['c', 'b', 'a'])} {cache.positions}")
\ No newline at end of file
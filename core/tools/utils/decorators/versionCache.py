@@ -0,0 +1,43 @@
+import inspect
+from collections import OrderedDict
+from functools import wraps
+from typing import Optional
+
+# 按对象的修改版本号（obj.version）缓存方法结果，版本号变化后该方法的缓存整体失效
+# 只缓存针对对象自身图的查询：被装饰方法若有 graph 参数，传入其他图时直接计算不缓存
+# maxSize 为按参数区分的缓存条目上限，超出后淘汰最久未使用的条目，为 None 时不限制
+# 结果为 list 时返回副本，避免调用方修改缓存内容
+def versionCached(maxSize: Optional[int] = None):
+    def decorator(func):
+        params = list(inspect.signature(func).parameters)
+        graphPos = params.index('graph') - 1 if 'graph' in params else -1
+        cacheName = func.__name__
+
+        @wraps(func)
+        def wrap(self, *args, **kwargs):
+            if 0 <= graphPos < len(args):
+                graph = args[graphPos]
+                args = args[:graphPos] + args[graphPos + 1:]
+            else:
+                graph = kwargs.pop('graph', None)
+            if graph is not None and graph is not self.graph:
+                return func(self, *args, graph=graph, **kwargs)
+
+            caches: dict[str, tuple[int, OrderedDict]] = self.__dict__.setdefault('_versionCaches', {})
+            version, cache = caches.get(cacheName, (-1, None))
+            if cache is None or version != self.version:
+                cache = OrderedDict()
+                caches[cacheName] = (self.version, cache)
+
+            key = args + tuple(sorted(kwargs.items())) if kwargs else args
+            if key in cache:
+                cache.move_to_end(key)
+                res = cache[key]
+            else:
+                res = func(self, *args, **kwargs)
+                cache[key] = res
+                if maxSize is not None and len(cache) > maxSize:
+                    cache.popitem(last=False)
+            return list(res) if isinstance(res, list) else res
+        return wrap
+    return decorator
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+from pathlib import Path
+
+# 无界面运行，必须在导入 Qt 之前设置
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt5.QtCore import QPointF, QT_VERSION_STR
+from PyQt5.QtWidgets import QApplication
+
+rootPath = str(Path(__file__).resolve().parent.parent)
+sys.path.append(rootPath)
+
+from core.gitManager import CommitObj
+from core.algorithms.overlapRemoval import countOverlaps
+from core.tools.utils.simpleLogger import loggerPrint
+
+# 碰撞处理的无界面压力测试
+# 在临时目录中用空仓库创建 ColliDetectSmartScene，按密集或稀疏的方式生成节点，
+# 按固定随机种子回放拖动路径：每一步移动拖动项（触发与真实拖动相同的碰撞事件）后立即执行一次碰撞处理并计时
+# 输出 JSON：每次处理耗时的 p50 / p99、迭代次数、推动的节点数以及拖动前后残留的重叠数，用于比较碰撞算法的改动
+#   QT_QPA_PLATFORM=offscreen python lab/collisionBenchmark.py --nodes 2000 --pattern both --output bench.json
+PATTERNS = ("dense", "sparse")
+NODE_SIZE = 30
+
+
+# 密集：网格排列，间距略大于节点宽度；稀疏：随机散布在节点总面积约 50 倍的区域内
+def generatePositions(pattern: str, nodeCount: int, rng: np.random.Generator) -> np.ndarray:
+    if pattern == "dense":
+        columns = max(1, int(np.ceil(np.sqrt(nodeCount))))
+        index = np.arange(nodeCount)
+        return np.stack((index % columns * NODE_SIZE * 3.0, index // columns * NODE_SIZE * 2.5), axis=1)
+    side = np.sqrt(nodeCount * 50.0) * NODE_SIZE * 2
+    return rng.uniform(0, side, size=(nodeCount, 2))
+
+
+def nodeRects(scene) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    rects = [node.sceneBoundingRect() for node in scene.nodes.values()]
+    return (
+        np.array([rect.left() for rect in rects]),
+        np.array([rect.top() for rect in rects]),
+        np.array([rect.width() for rect in rects]),
+        np.array([rect.height() for rect in rects]),
+    )
+
+
+def percentile(values: list[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+# 单个场景的测试：drags 次拖动，每次沿直线走 steps 步到随机目标点
+def runPattern(pattern: str, nodeCount: int, drags: int, steps: int, dragDistance: float, seed: int) -> dict:
+    from ui.components.widgets.layouts.gridScene import ColliDetectSmartScene
+
+    rng = np.random.default_rng(seed)
+    scene = ColliDetectSmartScene()
+    for i, (x, y) in enumerate(generatePositions(pattern, nodeCount, rng).tolist()):
+        scene.createDragableNode(x=x, y=y, r=NODE_SIZE, commitObj=CommitObj(hexSha=f"n{i}", message=f"n{i}"), level=0)
+    initialOverlaps = countOverlaps(*nodeRects(scene))
+
+    solveMs: list[float] = []
+    iterations: list[int] = []
+    pushed: list[int] = []
+    nodes = list(scene.nodes.values())
+    for _ in range(drags):
+        node = nodes[int(rng.integers(len(nodes)))]
+        start = node.pos()
+        angle = rng.uniform(0, 2 * np.pi)
+        end = start + QPointF(np.cos(angle) * dragDistance, np.sin(angle) * dragDistance)
+        node.isDragging = True
+        for step in range(1, steps + 1):
+            node.setPos(start + (end - start) * (step / steps))
+            scene.collisionTimer.stop()
+            begin = time.perf_counter()
+            pushed.append(scene.solvePendingCollision())
+            solveMs.append((time.perf_counter() - begin) * 1000)
+            iterations.append(scene.lastCollisionIterations)
+        node.isDragging = False
+
+    residualOverlaps = countOverlaps(*nodeRects(scene))
+    scene.destroyAll()
+    return {
+        "pattern": pattern,
+        "nodes": nodeCount,
+        "drags": drags,
+        "stepsPerDrag": steps,
+        "events": len(solveMs),
+        "solveMs": {
+            "p50": percentile(solveMs, 50),
+            "p99": percentile(solveMs, 99),
+            "max": max(solveMs, default=0.0),
+            "mean": float(np.mean(solveMs)) if solveMs else 0.0,
+        },
+        "iterations": {
+            "mean": float(np.mean(iterations)) if iterations else 0.0,
+            "max": max(iterations, default=0),
+            "histogram": {str(k): int(v) for k, v in zip(*np.unique(iterations, return_counts=True))},
+        },
+        "pushedNodes": {
+            "mean": float(np.mean(pushed)) if pushed else 0.0,
+            "max": max(pushed, default=0),
+        },
+        "initialOverlaps": initialOverlaps,
+        "residualOverlaps": residualOverlaps,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="collision solver benchmark")
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--pattern", choices=PATTERNS + ("both",), default="both")
+    parser.add_argument("--drags", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--distance", type=float, default=300.0, help="length of each drag path")
+    parser.add_argument("--seed", type=int, default=0)
+    # 日志也输出到标准输出，结果单独写入文件
+    parser.add_argument("--output", default="collisionBenchmark.json", help="JSON result file")
+    args = parser.parse_args()
+
+    outputPath = os.path.abspath(args.output)
+    app = QApplication(sys.argv)
+
+    # 场景从配置中读取仓库路径，在临时目录中准备配置与空仓库
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workDir:
+        repoPath = os.path.join(workDir, "repo")
+        os.makedirs(os.path.join(workDir, "config"))
+        os.makedirs(repoPath)
+        with open(os.path.join(workDir, "config", "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"repo": repoPath}, f)
+        os.chdir(workDir)
+        try:
+            patterns = PATTERNS if args.pattern == "both" else (args.pattern,)
+            results = [runPattern(pattern, args.nodes, args.drags, args.steps, args.distance, args.seed) for pattern in patterns]
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "benchmark": "collision",
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(outputPath, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    for result in results:
+        loggerPrint(f"{result['pattern']}: p50 {result['solveMs']['p50']:.3f} ms, p99 {result['solveMs']['p99']:.3f} ms, residual overlaps {result['residualOverlaps']}")
+    loggerPrint(f"collision benchmark written to {outputPath}")
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -1,5 +1,9 @@
+import multiprocessing
+
 from ui.app import start
 
 
 if __name__ == "__main__":
+    # 布局计算的子进程以 spawn 方式启动，打包后需要此调用
+    multiprocessing.freeze_support()
     start()
\ No newline at end of file
@@ -1,7 +1,8 @@
 import sys
 import uuid
-from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QFrame, QBoxLayout
-from PyQt5.QtCore import pyqtSlot
+from typing import Optional
+from PyQt5.QtWidgets import QApplication, QVBoxLayout, QHBoxLayout, QFrame, QBoxLayout
+from PyQt5.QtCore import pyqtSlot, QTimer
 from pathlib import Path
 
 from qfluentwidgets import PrimaryPushButton
@@ -11,11 +12,13 @@ rootPath = str(Path(__file__).resolve().parent.parent.parent.parent)
 sys.path.append(rootPath)
 
 from core.gitManager import CommitObj
+from core.tools.publicDef.levelDefs import LogLevels
+from core.tools.utils.simpleLogger import loggerPrint
 from ui.components.utils.eventManager import EventEnum
 from ui.components.utils.uiFunctionBase import UIFunctionBase, MsgBoxLevels
 from ui.components.widgets.layouts.infiniteCanvasView import InfiniteCanvasView
 from ui.components.widgets.layouts.gridScene import ColliDetectSmartScene
-from ui.publicDefs.styleDefs import NODE_VERTICAL_SPACING
+from ui.publicDefs.styleDefs import NODE_VERTICAL_SPACING, STRUCTURE_WARNING_MAX_ENTRIES
 
 
 class EventGraphPage(QFrame, UIFunctionBase):
@@ -39,17 +42,98 @@ class EventGraphPage(QFrame, UIFunctionBase):
 
     @pyqtSlot(EventEnum, dict)
     def _uiEvt_nodeMgrRefreshCommits(self, event: EventEnum = EventEnum.EVENT_INVALID, data: dict = {}) -> None:
+        # 正在逐帧创建的节点依赖当前的显示图，创建完成后再刷新
+        if self.scene.isPopulating():
+            self.scene.afterPopulated(lambda: self._uiEvt_nodeMgrRefreshCommits(event, data))
+            return
         commitDict: dict[str, CommitObj] = self.scene.getRepoRawCommitInfo(self.uiGetConfig("repo") if event != EventEnum.EVENT_INVALID else "")
+        branchMergeBases = self.scene.updateBranchMergeBases(commitDict)
+        loggerPrint(f"branch merge bases: {branchMergeBases}", level=LogLevels.DEBUG)
+        self.scene.updateDisplayGraph(commitDict)
+        self.populateScene()
+
+    # 按当前的显示图（可能经过链压缩）重建场景中的节点与边
+    # 节点坐标优先取坐标缓存（包含用户拖动的结果），其次取 positions（快照中的坐标）
+    # 坐标覆盖所有节点时不再整理；只缺少少数节点时只给这些节点增量布局；否则在子线程中重新整理节点
+    # 节点较多时虚拟化场景，只为视口附近的节点创建图形项，缺少坐标时整体重新整理
+    # 场景中已有节点时只更新变化的部分，已有节点保持当前坐标；否则逐帧创建图形项，创建完成后再放置缺少坐标的节点
+    def populateScene(self, positions: Optional[dict[str, tuple[float, float]]] = None, useCache: bool = True) -> None:
+        knownPositions = dict(positions) if positions is not None else {}
+        if useCache:
+            cachedPositions, isFresh = self.scene.loadCachedPositions()
+            knownPositions.update(cachedPositions)
+            if cachedPositions and not isFresh:
+                loggerPrint("坐标缓存与当前提交不一致，只使用仍存在的节点的坐标")
+
+        if self.scene.shouldVirtualize():
+            if self.scene.populateVirtual(knownPositions):
+                self.scene.requestArrange()
+            return
+
+        if useCache and self.scene.canReconcile():
+            self.reconcileScene(knownPositions)
+            return
+
         self.scene.destroyAll()
-        for k in reversed(self.scene.graph.keys()):
-            self.addNodeFromRelations(commitDict[k])
-        self.addConnectionFromGitInfo()
-        self.scene._logicEvt_arrangeNodeGraphics()
+        order = self.scene.displayGraph.topological_sort()
+        missing = [k for k in order if k not in knownPositions]
+        self.scene.populateProgressive(knownPositions)
+        self.scene.afterPopulated(lambda: self.placeMissingNodes(missing, len(order)))
+
+    # 缺少坐标的节点超过一半时整体重新整理，否则只给它们增量布局
+    def placeMissingNodes(self, missing: list[str], nodeCount: int) -> None:
+        if len(missing) * 2 > nodeCount:
+            self.scene.requestArrange()
+            return
+        if missing:
+            self.scene.placeAppendedNodes(missing)
+            self.scene.saveLayoutCache()
 
-    def addConnectionFromGitInfo(self) -> None:
-        edges = self.scene.get_all_edges()
-        for edge in edges:
-            self.scene.createConnections(edge[0], edge[1])
+    # 增量更新场景，新节点有坐标时直接放置，否则像追加节点一样找位置；新节点过多时整体重新整理
+    def reconcileScene(self, knownPositions: dict[str, tuple[float, float]]) -> None:
+        added = self.scene.reconcileScene()
+        for k in added:
+            pos = knownPositions.get(k)
+            node = self.scene.getNode(k)
+            if pos is not None and node is not None:
+                node.setPos(pos[0], pos[1])
+        missing = [k for k in added if k not in knownPositions]
+        if len(missing) * 2 > len(self.scene.nodes):
+            self.scene.requestArrange()
+            return
+        if missing:
+            self.scene.placeAppendedNodes(missing)
+        self.scene.saveSnapshot()
+        self.scene.saveLayoutCache()
+
+    # 冷启动时先显示快照中上次的提交图，返回是否成功恢复
+    def restoreFromSnapshot(self) -> bool:
+        positions = self.scene.restoreSnapshot()
+        if positions is None:
+            return False
+        self.populateScene(positions)
+        return True
+
+    def initialRefresh(self) -> None:
+        if self.scene.isPopulating():
+            self.scene.afterPopulated(self.initialRefresh)
+            return
+        self._uiEvt_nodeMgrRefreshCommits()
+        self.warnGraphStructure()
+
+    # 双击节点展开/折叠提交链，节点会在重建场景时被移除，所以推迟到当前鼠标事件处理完之后
+    @pyqtSlot(EventEnum, dict)
+    def _uiEvt_toggleChain(self, _: EventEnum, data: dict) -> None:
+        hexSha: Optional[str] = data.get("hexSha")
+        if hexSha is None or not self.scene.toggleChain(hexSha):
+            return
+        # 展开的链需要插入到原有节点之间，缓存中的旧坐标不再适用，整体重新整理
+        QTimer.singleShot(0, lambda: self.populateScene(useCache=False))
+
+    # 只去除重叠，不改变其余节点（包括拖动过的节点）的位置
+    def tidyNodes(self) -> None:
+        if self.scene.tidyNodes() > 0:
+            self.scene.saveLayoutCache()
 
     def createUI(self) -> None:
         container = QVBoxLayout()
@@ -73,27 +157,74 @@ class EventGraphPage(QFrame, UIFunctionBase):
                 text="整理节点",
                 icon=FluentIcon.ROTATE,
             )
-            btn3.clicked.connect(lambda: self.uiEmit(EventEnum.LOGIC_GRAPHIC_MANAGER_ARRANGE_NODES, {}))
+            btn3.clicked.connect(lambda: self.scene.requestArrange())
+
+            btn4 = PrimaryPushButton(
+                text="切换布局",
+                icon=FluentIcon.LAYOUT,
+            )
+            btn4.clicked.connect(lambda: self.scene.toggleLayoutMode())
+
+            btn5 = PrimaryPushButton(
+                text="去除重叠",
+                icon=FluentIcon.ALIGNMENT,
+            )
+            btn5.clicked.connect(self.tidyNodes)
 
             btnContainer.addWidget(btn1, 1)
             btnContainer.addWidget(btn2, 1)
             btnContainer.addWidget(btn3, 1)
+            btnContainer.addWidget(btn4, 1)
+            btnContainer.addWidget(btn5, 1)
 
             container.addLayout(btnContainer)
 
         addCtrlBtn(container)
         self.addScene(container)
-        self._uiEvt_nodeMgrRefreshCommits()
-        hasCircle = self.scene.isGraphHasCircle()
-        if hasCircle:
-            self.uiShowMsgBox(
-                level=MsgBoxLevels.WARNING,
-                msg="当前事件图中出现环，合并分支会导致不可预料的问题",
-                acptCbk=None,
-                rjctCbk=None,
-            )
+        # 退出前保存还没写入的拖动结果
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.scene.flushLayoutCache)
+        # 有快照时 git 查询推迟到界面显示之后
+        if self.restoreFromSnapshot():
+            QTimer.singleShot(0, self.initialRefresh)
+        else:
+            self.initialRefresh()
         self.setLayout(container)
 
+    # 按照存档管理的特点，存档之间不应出现环或合并分支，发现时提示用户
+    # 完整的列表只写到日志，弹窗中每一项只列出前几个提交
+    def warnGraphStructure(self) -> None:
+        report = self.scene.analyzeGraphStructure()
+        details: list[str] = []
+        warnings: list[str] = []
+
+        def addWarning(title: str, entries: list[str], sep: str = ", ") -> None:
+            details.append(f"{title}: {sep.join(entries)}")
+            shown = sep.join(entries[:STRUCTURE_WARNING_MAX_ENTRIES])
+            if len(entries) > STRUCTURE_WARNING_MAX_ENTRIES:
+                shown += f"{sep}...（共 {len(entries)} 个，完整列表见日志）"
+            warnings.append(f"{title}: {shown}")
+
+        for cycle in report.cycles:
+            addWarning("当前事件图中出现环", cycle, sep=" -> ")
+        if report.hasMerge():
+            addWarning(f"当前事件图中有 {len(report.merges)} 个合并提交，合并分支会导致不可预料的问题", report.merges)
+        if report.hasDiamond():
+            addWarning(f"其中 {len(report.diamonds)} 处分叉后又合并", [f"{fork} -> {merge}" for fork, merge in report.diamonds])
+        if report.hasMultipleRoots():
+            addWarning(f"当前事件图中有 {len(report.roots)} 个根节点", report.roots)
+        if not warnings:
+            return
+
+        loggerPrint("\n".join(details), level=LogLevels.WARNING)
+        self.uiShowMsgBox(
+            level=MsgBoxLevels.WARNING,
+            msg="\n".join(warnings),
+            acptCbk=None,
+            rjctCbk=None,
+        )
+
     def addStandardNode(self) -> None:
         # 触发创建 commit 事件，并获取返回的 commitObj 数据
         return
@@ -130,31 +261,6 @@ class EventGraphPage(QFrame, UIFunctionBase):
                 level=self.distance("root", str(uuid.uuid4())),
             )
 
-    def addNodeFromRelations(self, commitObj: CommitObj):
-        parentNodes: list[str] = commitObj.parents
-        if len(parentNodes) == 0:
-            self.scene.createDragableNode(
-                x=-100,
-                y=-100,
-                r=30,
-                commitObj=commitObj,
-                level=0,
-            )
-        else:
-            rootNode = self.scene.getRootNode()
-            if not rootNode:
-                return
-            pos = self.scene.getNodePosition(parentNodes[0])
-            if pos is None:
-                return
-            self.scene.createDragableNode(
-                x=pos.x(),
-                y=pos.y() + NODE_VERTICAL_SPACING,
-                r=30,
-                commitObj=commitObj,
-                level=self.scene.distance(rootNode.hexSha(), commitObj.hexSha),
-            )
-
     def removeSelectedNode(self) -> None:
         selectedNode = self.scene.getSelected()
         if not selectedNode:
@@ -162,4 +268,5 @@ class EventGraphPage(QFrame, UIFunctionBase):
         self.scene.removeGraphic(selectedNode.hexSha())
 
     def subscribeEvt(self):
-        self.uiSubscribe(EventEnum.UI_GIT_MANAGER_REFRESH_COMMIT_INFO, self._uiEvt_nodeMgrRefreshCommits)
\ No newline at end of file
+        self.uiSubscribe(EventEnum.UI_GIT_MANAGER_REFRESH_COMMIT_INFO, self._uiEvt_nodeMgrRefreshCommits)
+        self.uiSubscribe(EventEnum.UI_GRAPHIC_MGR_TOGGLE_CHAIN, self._uiEvt_toggleChain)
\ No newline at end of file
@@ -1,4 +1,6 @@
 import sys
+import time
+import threading
 
 from typing import Optional
 from enum import IntEnum
@@ -18,6 +20,7 @@ from qfluentwidgets.components.dialog_box import MessageBox
 from core.tools.publicDef.levelDefs import MsgBoxLevels
 from core.tools.utils.simpleLogger import loggerPrint
 from core.tools.publicDef.levelDefs import LogLevels
+from ui.components.utils.renderStats import RenderStats
 
 
 class EventEnum(IntEnum):
@@ -33,9 +36,12 @@ class EventEnum(IntEnum):
     # UI 绘制相关事件，不能在子线程中执行
     UI_EVENT_START = 0x1000
     UI_GRAPHIC_MGR_MOVE_NODE = 0x1001 # 图形管理移动节点图形
-    UI_GRAPHIC_MGR_MOUSE_MOVE_NODE = 0x1002 # 鼠标移动节点图形（由于图形管理维护所有的节点和边，所以在此进行处理）
     UI_COLLISION_SCENE_PROC_DETECT = 0x1003 # 场景处理节点碰撞
     UI_GIT_MANAGER_REFRESH_COMMIT_INFO = 0x1004 # git 管理刷新提交节点记录
+    UI_GRAPHIC_MGR_TOGGLE_CHAIN = 0x1005 # 展开/折叠压缩的线性提交链
+    UI_GRAPHIC_MGR_APPLY_LAYOUT = 0x1006 # 应用子线程计算好的节点布局
+    UI_GRAPHIC_MGR_NODE_DRAG_FINISHED = 0x1007 # 用户拖动节点结束
+    UI_GRAPHIC_MGR_LAYOUT_CHANGED = 0x1008 # 场景中节点的布局发生变化（整理、追加、拖动结束等）
     UI_EVENT_END = 0x1FFF
 
 
@@ -55,6 +61,8 @@ class EventTask(QRunnable):
                 str(sys.exc_info()[2].tb_lineno),  # type: ignore
                 str(e),
             )
+        finally:
+            EventManager.getSingleton().taskFinished()
 
 
 class EventManager(QObject):
@@ -77,6 +85,10 @@ class EventManager(QObject):
     # 主窗口
     _mainWindow: Optional[QWidget] = None
 
+    # 已提交到线程池但还没执行完的逻辑事件数
+    _pendingTasks = 0
+    _pendingLock = threading.Lock()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._signal.connect(self.processEvent)
@@ -91,8 +103,12 @@ class EventManager(QObject):
 
         return EventManager._singleton
 
-    # 处理事件
+    # 处理事件，开启性能统计时记录处理耗时（逻辑事件只计提交到线程池的耗时）
     def processEvent(self, event: EventEnum, data: dict):
+        begin = 0.0
+        if RenderStats.enabled:
+            begin = time.perf_counter()
+            RenderStats.getSingleton().enterEvent()
         if event in self._eventCallbacks.keys():
             isUiEvent = event > EventEnum.UI_EVENT_START.value and event < EventEnum.UI_EVENT_END.value
             for handler in self._eventCallbacks[event]:
@@ -100,7 +116,18 @@ class EventManager(QObject):
                     handler(event, data)
                 else:
                     task = EventTask(handler, event, data)
+                    with self._pendingLock:
+                        EventManager._pendingTasks += 1
                     QThreadPool.globalInstance().start(task)  # type: ignore
+        if begin:
+            RenderStats.getSingleton().exitEvent(event.name, begin, time.perf_counter() - begin)
+
+    def taskFinished(self) -> None:
+        with self._pendingLock:
+            EventManager._pendingTasks -= 1
+
+    def pendingTaskCount(self) -> int:
+        return EventManager._pendingTasks
 
     @pyqtSlot(MsgBoxLevels, str, object, object)
     def processMsgBox(self, level: MsgBoxLevels, msg: str, acptCbk: Optional[Callable] = None, rejtCbk: Optional[Callable] = None):
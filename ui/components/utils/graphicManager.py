@@ -1,23 +1,57 @@
+import os
 import sys
+import time
+import zlib
+from collections import deque
 from pathlib import Path
+
+import numpy as np
 from PyQt5.QtGui import QPen, QColor, QBrush
-from PyQt5.QtWidgets import QGraphicsScene
-from PyQt5.QtCore import QRectF, QPointF, QSizeF, pyqtSlot
-from typing import Optional
+from PyQt5.QtWidgets import QGraphicsScene, QGraphicsItem
+from PyQt5.QtCore import QRectF, QPointF, QSizeF, QTimer, pyqtSlot
+from typing import Callable, Iterable, Optional
 
 rootPath = str(Path(__file__).resolve().parent.parent.parent.parent)
 sys.path.append(rootPath)
 
 from core.tools.publicDef.levelDefs import LogLevels
-from core.tools.utils.dataStructTools import listDedup
+from core.tools.utils.decorators.execTimer import timer
 from core.gitManager import CommitObj, GitRepoInfoMgr
+from core.algorithms.dag import DAG
+from core.algorithms.chainCompress import ChainCompressedDAG
+from core.algorithms.graphAnalysis import GraphStructureReport, analyzeStructure
+from core.algorithms.overlapRemoval import removeOverlaps
+from core.algorithms.positionTable import PositionTable
+from core.algorithms.layoutCore import LayoutRequest, LayoutResult, computeLayout, computeLayoutInProcess, LAYOUT_MODE_LAYERED, LAYOUT_MODE_LANES, LAYOUT_MODES
+from core.graphSnapshot import loadSnapshot, snapshotPathOf, writeSnapshot
+from core.layoutCache import commitSetHash, layoutCachePathOf, loadLayoutCache, writeLayoutCache
 from core.tools.utils.simpleLogger import loggerPrint
 
 from ui.components.widgets.graphics.gCommitNode import GLabeledCommitNode, GLabeledColliDetectCommitNode
 from ui.components.widgets.graphics.gEdgeLine import EdgeLineGraphic
+from ui.components.widgets.graphics.gEdgeBatch import EdgeBatch, BatchedEdge
 from ui.components.utils.eventManager import EventEnum
 from ui.components.utils.uiFunctionBase import UIFunctionBase
-from ui.publicDefs.styleDefs import NODE_BORDER_DEFAULT_PEN, NODE_FILL_DEFAULT_BRUSH, NODE_HORIZONTAL_SPACING, NODE_VERTICAL_SPACING
+from ui.publicDefs.styleDefs import (
+    NODE_BORDER_DEFAULT_PEN,
+    NODE_FILL_DEFAULT_BRUSH,
+    NODE_CHAIN_FILL_BRUSH,
+    NODE_DIAMETER,
+    NODE_LANE_FILL_BRUSHES,
+    NODE_HORIZONTAL_SPACING,
+    NODE_VERTICAL_SPACING,
+    NODE_LANE_SPACING,
+    NODE_LANE_ROW_SPACING,
+    NODE_OVERLAP_GAP,
+    CHAIN_COMPRESS_NODE_THRESHOLD,
+    LAYOUT_PROCESS_NODE_THRESHOLD,
+    LAYOUT_CACHE_SAVE_DELAY_MS,
+    VIRTUALIZE_NODE_THRESHOLD,
+    VIRTUAL_VIEWPORT_MARGIN_RATIO,
+    EDGE_BATCH_NODE_THRESHOLD,
+    POPULATE_PROGRESSIVE_NODE_THRESHOLD,
+    POPULATE_FRAME_BUDGET_MS,
+)
 
 
 class NodeManager(GitRepoInfoMgr, UIFunctionBase):
@@ -25,11 +59,51 @@ class NodeManager(GitRepoInfoMgr, UIFunctionBase):
         GitRepoInfoMgr.__init__(self, repoPath)
 
         self.nodes: dict[str, GLabeledCommitNode] = {}
-        self.edges: dict[str, EdgeLineGraphic] = {}
+        self.edges: dict[str, EdgeLineGraphic | BatchedEdge] = {}
         self.selected: Optional[GLabeledCommitNode] = None # 当前认为一个 scene 内任意时刻有且仅有一个节点会被选中
 
+        # 场景中实际显示的图与提交信息：未压缩时就是提交图本身，否则为线性链压缩后的视图
+        self.commitInfo: dict[str, CommitObj] = {}
+        self.chainView: Optional[ChainCompressedDAG] = None
+        self.displayGraph: DAG = self
+        self.displayCommits: dict[str, CommitObj] = {}
+
+        # 每次发起布局加一，子线程返回的结果与当前值不一致时说明场景已经变化，直接丢弃
+        self.layoutGeneration = 0
+
+        # 拖动节点后等待保存坐标缓存
+        self.layoutCacheSavePending = False
+
+        # 场景虚拟化：所有节点的坐标保存在坐标表中，nodes / edges 只包含视口附近实际存在的图形项
+        # 离开视口的图形项隐藏后放回对象池，进入视口的节点优先从对象池中取出重新设置
+        self.isVirtual = False
+        self.positionTable = PositionTable()
+        self.nodePool: list[GLabeledCommitNode] = []
+        self.edgePool: list[EdgeLineGraphic | BatchedEdge] = []
+        self.viewportRect = QRectF()
+        self.populatedRect = QRectF()
+        self.virtualLevels: dict[str, int] = {}
+        self.virtualColorKeys: dict[str, str] = {}
+        self.estimatedRects: dict[str, QRectF] = {}
+
+        # 边较多时不再为每条边创建图形项，按网格合并绘制
+        self.edgeBatch: Optional[EdgeBatch] = None
+        self.batchEdges = False
+
+        # 逐帧创建图形项：等待创建的节点、它们的坐标与层级，以及全部创建完成后的回调
+        # 每次开始或取消创建加一，已经排队的定时器发现不一致时直接退出
+        self.populateQueue: deque[str] = deque()
+        self.populatePositions: dict[str, tuple[float, float]] = {}
+        self.populateLevels: dict[str, int] = {}
+        self.populateCallbacks: list[Callable[[], None]] = []
+        self.populateGeneration = 0
+
+        # 可选：节点按设备坐标缓存绘制结果，平移时直接贴图，缩放或节点内容变化时重画
+        self.cacheNodeItems = bool(self.uiGetConfig("cacheNodes", ""))
+
     def boundToScene(self, scene: QGraphicsScene) -> None:
         self.scene = scene
+        self.edgeBatch = EdgeBatch(scene)
 
     def setSelected(self, graphicHash: str, isSelected: bool):
         if isSelected:
@@ -42,6 +116,159 @@ class NodeManager(GitRepoInfoMgr, UIFunctionBase):
     def getSelected(self) -> Optional[GLabeledCommitNode]:
         return self.selected
 
+    # 根据最新的提交信息更新显示图，配置 compressChains 为 auto 时提交数量达到阈值才压缩线性提交链
+    # branchHeads 为压缩时需要保留的分支头，为 None 时从仓库读取
+    def updateDisplayGraph(self, commitInfo: dict[str, CommitObj], branchHeads: Optional[Iterable[str]] = None) -> None:
+        self.commitInfo = commitInfo
+        self.batchEdges = self.shouldBatchEdges()
+        compress = self.uiGetConfig("compressChains", "auto")
+        if compress == "auto":
+            compress = self.graphSize() >= CHAIN_COMPRESS_NODE_THRESHOLD
+        if not compress:
+            self.chainView = None
+            self.displayGraph = self
+            self.displayCommits = commitInfo
+            return
+
+        expanded = self.chainView.expanded if self.chainView is not None else ()
+        if branchHeads is None:
+            branchHeads = self.getRepoBranchHeads().values()
+        self.chainView = ChainCompressedDAG(self, keepNodes=branchHeads, expanded=expanded)
+        self.displayGraph = self.chainView
+        self.displayCommits = self.chainView.displayCommits(commitInfo)
+        loggerPrint(f"compress {self.graphSize()} commits into {self.chainView.graphSize()} nodes")
+
+    # 配置 batchEdges 为 auto 时按提交数量决定是否合并绘制边
+    def shouldBatchEdges(self) -> bool:
+        batchEdges = self.uiGetConfig("batchEdges", "auto")
+        if batchEdges == "auto":
+            return self.graphSize() >= EDGE_BATCH_NODE_THRESHOLD
+        return bool(batchEdges)
+
+    # 展开折叠的提交链，或把已展开的链重新折叠，显示图发生变化时返回 True
+    def toggleChain(self, hexSha: str) -> bool:
+        if self.chainView is None or not self.chainView.toggle(hexSha):
+            return False
+        # 还没创建的节点属于旧的显示图
+        self.cancelPopulation()
+        self.displayCommits = self.chainView.displayCommits(self.commitInfo)
+        return True
+
+    def isChainNode(self, hexSha: str) -> bool:
+        return self.chainView is not None and self.chainView.isSuperNode(hexSha)
+
+    # 当前仓库的快照文件
+    def snapshotPath(self) -> str:
+        return snapshotPathOf(self.gitRepo.working_dir)
+
+    # 从快照恢复提交图与显示图（不查询 git 历史），返回快照中保存的节点坐标，没有可用的快照时返回 None
+    def restoreSnapshot(self) -> Optional[dict[str, tuple[float, float]]]:
+        snapshot = loadSnapshot(self.snapshotPath())
+        if snapshot is None:
+            return None
+        try:
+            if snapshot.repoPath != os.path.abspath(self.gitRepo.working_dir):
+                return None
+            snapshot.fillDAG(self)
+            self.mergeBaseIndex = None
+            commitInfo = snapshot.commitInfo()
+            self.updateDisplayGraph(commitInfo, branchHeads=self.branchHeadsOf(commitInfo).keys())
+            loggerPrint(f"restore {snapshot.nodeCount} commits from snapshot: {snapshot.path}")
+            return snapshot.positions()
+        finally:
+            snapshot.close()
+
+    # 所有节点当前的坐标，虚拟化时取自坐标表，逐帧创建时包括还没创建的节点
+    def currentPositions(self) -> dict[str, tuple[float, float]]:
+        if self.isVirtual:
+            return self.positionTable.positions()
+        positions = {hexSha: self.populatePositions[hexSha] for hexSha in self.populateQueue if hexSha in self.populatePositions}
+        positions.update({hexSha: (node.scenePos().x(), node.scenePos().y()) for hexSha, node in self.nodes.items()})
+        return positions
+
+    # 所有节点当前的坐标，N x 2 数组，逐帧创建时包括还没创建的节点
+    def currentPositionArray(self) -> np.ndarray:
+        if self.isVirtual:
+            table = self.positionTable
+            valid = ~np.isnan(table.xs)
+            return np.stack((table.xs[valid], table.ys[valid]), axis=1)
+        positions = [(node.scenePos().x(), node.scenePos().y()) for node in self.nodes.values()]
+        positions.extend(self.populatePositions[hexSha] for hexSha in self.populateQueue if hexSha in self.populatePositions)
+        return np.array(positions, dtype=np.float64).reshape(-1, 2)
+
+    # 节点布局整体发生变化后通知小地图等关心全局布局的部件，拖动过程中的单个节点移动不通知
+    def notifyLayoutChanged(self) -> None:
+        self.uiEmit(EventEnum.UI_GRAPHIC_MGR_LAYOUT_CHANGED, { "scene": self })
+
+    # 保存当前的提交图与场景中节点的坐标
+    def saveSnapshot(self) -> None:
+        positions = self.currentPositions()
+        try:
+            writeSnapshot(self.snapshotPath(), self.commitInfo, positions, self.gitRepo.working_dir)
+        except OSError as e:
+            loggerPrint(f"快照保存失败: {e}", level=LogLevels.WARNING)
+
+    # 当前仓库的坐标缓存文件
+    def layoutCachePath(self) -> str:
+        return layoutCachePathOf(self.gitRepo.working_dir)
+
+    # 读取坐标缓存，返回 (坐标, 缓存的节点集合是否与当前显示图一致)，缓存的布局模式与当前不同时坐标不可用
+    def loadCachedPositions(self) -> tuple[dict[str, tuple[float, float]], bool]:
+        cache = loadLayoutCache(self.layoutCachePath())
+        if cache is None or cache.mode != self.layoutMode():
+            return {}, False
+        return cache.positions, cache.setHash == commitSetHash(self.displayCommits.keys())
+
+    # 保存场景中所有节点当前的坐标，包括用户拖动过的节点
+    def saveLayoutCache(self) -> None:
+        self.layoutCacheSavePending = False
+        positions = self.currentPositions()
+        if not positions:
+            return
+        try:
+            writeLayoutCache(self.layoutCachePath(), commitSetHash(positions.keys()), self.layoutMode(), positions)
+        except OSError as e:
+            loggerPrint(f"坐标缓存保存失败: {e}", level=LogLevels.WARNING)
+
+    # 有尚未保存的拖动结果时立即保存，退出程序前调用
+    def flushLayoutCache(self) -> None:
+        if self.layoutCacheSavePending:
+            self.saveLayoutCache()
+
+    # 由提交记录的分支信息推出各分支头：提交属于某分支而它的子提交都不属于该分支
+    # 返回 分支头提交 -> 分支名，一个提交是多个分支的头时取名称最小的一个
+    @staticmethod
+    def branchHeadsOf(commitInfo: dict[str, CommitObj]) -> dict[str, str]:
+        heads: dict[str, str] = {}
+        for commitHash, commitObj in commitInfo.items():
+            childBranches: set[str] = set()
+            for child in commitObj.children:
+                childBranches.update(commitInfo[child].branches)
+            headOf = [branch for branch in commitObj.branches if branch not in childBranches]
+            if headOf:
+                heads[commitHash] = min(headOf)
+        return heads
+
+    # 节点在分层布局下的填充色，折叠的提交链使用单独的颜色
+    def nodeFill(self, hexSha: str) -> QBrush:
+        return NODE_CHAIN_FILL_BRUSH if self.isChainNode(hexSha) else NODE_FILL_DEFAULT_BRUSH
+
+    # 泳道布局中按分支名取颜色，同一个分支每次都得到同一个颜色
+    @staticmethod
+    def laneFill(colorKey: str) -> QBrush:
+        return NODE_LANE_FILL_BRUSHES[zlib.crc32(colorKey.encode("utf-8")) % len(NODE_LANE_FILL_BRUSHES)]
+
+    def layoutMode(self) -> str:
+        mode = self.uiGetConfig("layoutMode", LAYOUT_MODE_LAYERED)
+        return mode if mode in LAYOUT_MODES else LAYOUT_MODE_LAYERED
+
+    # 在分层布局与泳道布局之间切换，并重新整理节点
+    def toggleLayoutMode(self) -> None:
+        mode = LAYOUT_MODE_LANES if self.layoutMode() == LAYOUT_MODE_LAYERED else LAYOUT_MODE_LAYERED
+        self.uiSetConfig("layoutMode", mode)
+        loggerPrint(f"layout mode: {mode}")
+        self.requestArrange()
+
     def isEmpty(self):
         return len(self.nodes) == 0
 
@@ -64,9 +291,12 @@ class NodeManager(GitRepoInfoMgr, UIFunctionBase):
             rect=QRectF(0, 0, r, r),
             selectCb=self.setSelected,
             level=level,
+            moveCb=self.nodeMoved,
         )
         round.setCommitInfo(commitObj)
         round.setPos(x, y)
+        if self.cacheNodeItems:
+            round.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
 
         # 设置图形样式
         pen: QPen = QPen()
@@ -95,6 +325,282 @@ class NodeManager(GitRepoInfoMgr, UIFunctionBase):
 
         return round
 
+    # 节点位置变化后的回调，虚拟化时同步到坐标表，需要跟踪节点位置的场景可以重写
+    def nodeMoved(self, node: GLabeledCommitNode) -> None:
+        if self.isVirtual:
+            pos = node.scenePos()
+            self.positionTable.set(node.hexSha(), pos.x(), pos.y())
+
+    # 节点圆心，没有图形项时按坐标表推算
+    def nodeCenter(self, hexSha: str) -> Optional[QPointF]:
+        node = self.nodes.get(hexSha)
+        if node is not None:
+            return node.getNodeGraphicCenter()
+        pos = self.positionTable.get(hexSha)
+        if pos is None:
+            return None
+        return QPointF(pos[0] + NODE_DIAMETER / 2, pos[1] + NODE_DIAMETER / 2)
+
+    # 节点在自身坐标系中的外接矩形，没有图形项时按提交信息计算
+    def nodeBoundingRect(self, hexSha: str) -> QRectF:
+        node = self.nodes.get(hexSha)
+        if node is not None:
+            return node.boundingRect()
+        rect = self.estimatedRects.get(hexSha)
+        if rect is None:
+            rect = GLabeledCommitNode.boundingRectOf(self.displayCommits[hexSha].message, NODE_DIAMETER, NODE_BORDER_DEFAULT_PEN.widthF())
+            self.estimatedRects[hexSha] = rect
+        return rect
+
+    # 显示的节点较多时虚拟化场景，配置 virtualizeScene 为 auto 时按节点数量决定
+    def shouldVirtualize(self) -> bool:
+        virtualize = self.uiGetConfig("virtualizeScene", "auto")
+        if virtualize == "auto":
+            return self.displayGraph.graphSize() >= VIRTUALIZE_NODE_THRESHOLD
+        return bool(virtualize)
+
+    # 以虚拟化方式重建场景：只建立坐标表，图形项在视口变化时按需创建，返回没有坐标的节点
+    def populateVirtual(self, positions: dict[str, tuple[float, float]]) -> list[str]:
+        self.destroyAll()
+        self.isVirtual = True
+        missing = self.positionTable.reset(self.displayGraph.topological_sort(), positions)
+        self.positionTable.setEdges((parent, hexSha) for hexSha, commitObj in self.displayCommits.items() for parent in commitObj.parents)
+        self.refreshViewport(force=True)
+        self.notifyLayoutChanged()
+        return missing
+
+    # 配置 progressivePopulate 为 auto 时节点数量达到阈值才逐帧创建图形项
+    def shouldPopulateProgressively(self, nodeCount: int) -> bool:
+        progressive = self.uiGetConfig("progressivePopulate", "auto")
+        if progressive == "auto":
+            return nodeCount >= POPULATE_PROGRESSIVE_NODE_THRESHOLD
+        return bool(progressive)
+
+    # 为显示图中的所有节点创建图形项：有坐标的节点按与视口中心的距离由近到远创建，没有坐标的节点最后按拓扑序放到第一父节点下方
+    # 节点较多时每帧最多占用 POPULATE_FRAME_BUDGET_MS，剩余的节点留到之后的事件循环中继续创建，界面保持响应
+    # 全部创建完成后依次调用 afterPopulated 登记的回调
+    def populateProgressive(self, positions: dict[str, tuple[float, float]]) -> None:
+        self.cancelPopulation()
+        order = self.displayGraph.topological_sort()
+        levels: dict[str, int] = {}
+        for hexSha in order:
+            levels[hexSha] = max((levels[parent] for parent in self.displayCommits[hexSha].parents if parent in levels), default=-1) + 1
+        # 视图显示时以原点为中心
+        center = self.viewportRect.center() if not self.viewportRect.isEmpty() else QPointF(0, 0)
+        cx, cy = center.x(), center.y()
+        placed = [hexSha for hexSha in order if hexSha in positions]
+        placed.sort(key=lambda hexSha: (positions[hexSha][0] - cx) ** 2 + (positions[hexSha][1] - cy) ** 2)
+        self.populateQueue = deque(placed)
+        self.populateQueue.extend(hexSha for hexSha in order if hexSha not in positions)
+        self.populatePositions = positions
+        self.populateLevels = levels
+        self.notifyLayoutChanged()
+        budgetMs = POPULATE_FRAME_BUDGET_MS if self.shouldPopulateProgressively(len(order)) else None
+        self.populateStep(self.populateGeneration, budgetMs)
+
+    def isPopulating(self) -> bool:
+        return len(self.populateQueue) > 0
+
+    # 图形项全部创建完成后调用 callback，没有正在进行的创建时立即调用
+    def afterPopulated(self, callback: Callable[[], None]) -> None:
+        if self.isPopulating():
+            self.populateCallbacks.append(callback)
+        else:
+            callback()
+
+    # 在时间预算内创建排队的节点，预算为 None 时一次创建完
+    def populateStep(self, generation: int, budgetMs: Optional[float]) -> None:
+        if generation != self.populateGeneration:
+            return
+        deadline = time.perf_counter() + budgetMs / 1000 if budgetMs is not None else None
+        queue = self.populateQueue
+        while queue:
+            self.populateNode(queue.popleft())
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        if queue:
+            QTimer.singleShot(0, lambda: self.populateStep(generation, budgetMs))
+            return
+        callbacks, self.populateCallbacks = self.populateCallbacks, []
+        self.populatePositions = {}
+        self.populateLevels = {}
+        for callback in callbacks:
+            callback()
+
+    # 立即创建剩余的节点，需要完整场景的操作（如整理节点）之前调用
+    def finishPopulation(self) -> None:
+        if self.isPopulating():
+            self.populateStep(self.populateGeneration, None)
+
+    # 放弃还没创建的节点与回调，已经创建的图形项保留
+    def cancelPopulation(self) -> None:
+        self.populateGeneration += 1
+        self.populateQueue.clear()
+        self.populatePositions = {}
+        self.populateLevels = {}
+        self.populateCallbacks = []
+
+    # 创建一个节点，并连上两端都已存在的边
+    def populateNode(self, hexSha: str) -> None:
+        commitObj = self.displayCommits[hexSha]
+        pos = self.populatePositions.get(hexSha)
+        if pos is None:
+            parent = next((self.nodes[parent] for parent in commitObj.parents if parent in self.nodes), None)
+            if parent is None:
+                pos = (-100.0, -100.0)
+            else:
+                parentPos = parent.scenePos()
+                pos = (parentPos.x(), parentPos.y() + NODE_VERTICAL_SPACING)
+        self.createDragableNode(x=pos[0], y=pos[1], r=NODE_DIAMETER, commitObj=commitObj, level=self.populateLevels.get(hexSha, 0), fill=self.nodeFill(hexSha))
+        for parent in commitObj.parents:
+            if parent in self.nodes and self.getEdge(parent, hexSha) is None:
+                self.createConnections(parent, hexSha)
+        for child in commitObj.children:
+            if child in self.nodes and self.getEdge(hexSha, child) is None:
+                self.createConnections(hexSha, child)
+
+    # 虚拟化时是否为视口内的节点创建图形项，缩小到只画密度图时不需要
+    def virtualNodesVisible(self) -> bool:
+        return True
+
+    # 视口变化后调用：视口仍在已创建图形项的范围内时不做任何事，否则按视口加边距重新确定需要的节点与边
+    def refreshViewport(self, viewRect: Optional[QRectF] = None, force: bool = False) -> None:
+        if viewRect is not None:
+            self.viewportRect = viewRect
+        if not self.isVirtual:
+            return
+        if not force and self.populatedRect.contains(self.viewportRect):
+            return
+
+        if force:
+            for hexSha in list(self.nodes.keys()):
+                self.releaseNode(hexSha)
+            for key in list(self.edges.keys()):
+                self.releaseEdge(key)
+
+        visible: set[str] = set()
+        wantedEdges: set[tuple[str, str]] = set()
+        if self.virtualNodesVisible() and not self.viewportRect.isEmpty():
+            margin = max(self.viewportRect.width(), self.viewportRect.height()) * VIRTUAL_VIEWPORT_MARGIN_RATIO
+            area = self.viewportRect.adjusted(-margin, -margin, margin, margin)
+            self.populatedRect = area
+            # 坐标为节点左上角，向左上多取一个节点的范围，保证与区域相交的节点都被包含
+            visible = set(self.positionTable.query(area.left() - NODE_HORIZONTAL_SPACING, area.top() - NODE_VERTICAL_SPACING, area.right(), area.bottom()))
+            # 连线连接两个圆心，按左上角坐标查询时区域向左上平移半个节点；两端都在区域外但穿过区域的长连线也要创建
+            halfNode = NODE_DIAMETER / 2
+            wantedEdges.update(self.positionTable.queryEdges(area.left() - halfNode, area.top() - halfNode, area.right() - halfNode, area.bottom() - halfNode))
+        else:
+            self.populatedRect = QRectF()
+
+        for hexSha in [hexSha for hexSha in self.nodes if hexSha not in visible]:
+            self.releaseNode(hexSha)
+        for hexSha in visible:
+            if hexSha not in self.nodes:
+                self.acquireNode(hexSha)
+
+        for hexSha in visible:
+            commitObj = self.displayCommits[hexSha]
+            wantedEdges.update((parent, hexSha) for parent in commitObj.parents)
+            wantedEdges.update((hexSha, child) for child in commitObj.children)
+        wantedKeys = {f"{fromHash}->{toHash}" for fromHash, toHash in wantedEdges}
+        for key in [key for key in self.edges if key not in wantedKeys]:
+            self.releaseEdge(key)
+        for fromHash, toHash in wantedEdges:
+            edge = self.getEdge(fromHash, toHash)
+            if edge is None:
+                self.acquireEdge(fromHash, toHash)
+            else:
+                start, end = self.nodeCenter(fromHash), self.nodeCenter(toHash)
+                if start is not None and end is not None:
+                    edge.updatePosition(start, end)
+
+    # 取出或新建节点的图形项并按坐标表放置
+    def acquireNode(self, hexSha: str) -> Optional[GLabeledCommitNode]:
+        pos = self.positionTable.get(hexSha)
+        if pos is None:
+            return None
+        commitObj = self.displayCommits[hexSha]
+        colorKey = self.virtualColorKeys.get(hexSha)
+        fill = self.laneFill(colorKey) if colorKey else self.nodeFill(hexSha)
+        level = self.virtualLevels.get(hexSha, 0)
+        if not self.nodePool:
+            node = self.createDragableNode(x=pos[0], y=pos[1], r=NODE_DIAMETER, commitObj=commitObj, level=level, fill=fill)
+        else:
+            node = self.nodePool.pop()
+            node.setCommitInfo(commitObj)
+            node.setLevel(level)
+            node.setBrush(fill)
+            node.setPos(pos[0], pos[1])
+            node.show()
+            self.nodes[hexSha] = node
+        if node is not None:
+            self.attachNodeEdges(node)
+        return node
+
+    # 节点离开视口，隐藏后放回对象池
+    def releaseNode(self, hexSha: str) -> None:
+        node = self.nodes.pop(hexSha, None)
+        if node is None:
+            return
+        if self.selected is node:
+            self.selected = None
+        if node.isSelected():
+            node.setSelected(False)
+        node.clearIncidentEdges()
+        node.hide()
+        self.nodePool.append(node)
+
+    def acquireEdge(self, fromNodeHash: str, toNodeHash: str) -> Optional[EdgeLineGraphic | BatchedEdge]:
+        start, end = self.nodeCenter(fromNodeHash), self.nodeCenter(toNodeHash)
+        if start is None or end is None:
+            return None
+        if self.edgePool:
+            edge = self.edgePool.pop()
+            edge.updatePosition(start, end)
+            edge.show()
+        else:
+            edge = self.newEdgeItem(start, end)
+        self.edges[f"{fromNodeHash}->{toNodeHash}"] = edge
+        self.attachEdge(fromNodeHash, toNodeHash, edge)
+        return edge
+
+    def releaseEdge(self, key: str) -> None:
+        edge = self.edges.pop(key, None)
+        if edge is None:
+            return
+        fromNodeHash, toNodeHash = key.split("->")
+        for hexSha in (fromNodeHash, toNodeHash):
+            node = self.nodes.get(hexSha)
+            if node is not None:
+                node.removeIncidentEdge(edge)
+        edge.hide()
+        self.edgePool.append(edge)
+
+    # 把边登记到两端已有图形项的节点上，节点移动时直接刷新
+    def attachEdge(self, fromNodeHash: str, toNodeHash: str, edge: EdgeLineGraphic | BatchedEdge) -> None:
+        fromNode = self.nodes.get(fromNodeHash)
+        if fromNode is not None:
+            fromNode.addIncidentEdge(edge, True)
+        toNode = self.nodes.get(toNodeHash)
+        if toNode is not None:
+            toNode.addIncidentEdge(edge, False)
+
+    # 把已有的、与节点相连的边登记到节点上，通过提交记录中的父子关系查找
+    def attachNodeEdges(self, node: GLabeledCommitNode) -> None:
+        hexSha = node.hexSha()
+        commitObj = self.displayCommits.get(hexSha)
+        if commitObj is None:
+            return
+        for parent in commitObj.parents:
+            edge = self.getEdge(parent, hexSha)
+            if edge is not None:
+                node.addIncidentEdge(edge, False)
+        for child in commitObj.children:
+            edge = self.getEdge(hexSha, child)
+            if edge is not None:
+                node.addIncidentEdge(edge, True)
+        node.updateIncidentEdges()
+
     def createConnections(
             self,
             fromNodeHash: str,
@@ -105,9 +611,24 @@ class NodeManager(GitRepoInfoMgr, UIFunctionBase):
         if fromNode is None or toNode is None:
             return
 
-        edge = EdgeLineGraphic(fromNode.getNodeGraphicCenter(), toNode.getNodeGraphicCenter())
+        edge = self.newEdgeItem(fromNode.getNodeGraphicCenter(), toNode.getNodeGraphicCenter())
         self.edges[f"{fromNodeHash}->{toNodeHash}"] = edge
+        fromNode.addIncidentEdge(edge, True)
+        toNode.addIncidentEdge(edge, False)
+
+    # 新建一条边，合并绘制时只登记到所在的网格
+    def newEdgeItem(self, start: QPointF, end: QPointF) -> EdgeLineGraphic | BatchedEdge:
+        if self.batchEdges and self.edgeBatch is not None:
+            return self.edgeBatch.createEdge(start, end)
+        edge = EdgeLineGraphic(start, end)
         self.scene.addItem(edge)
+        return edge
+
+    def removeEdgeItem(self, edge: EdgeLineGraphic | BatchedEdge) -> None:
+        if isinstance(edge, BatchedEdge):
+            edge.batch.removeEdge(edge)
+        else:
+            self.scene.removeItem(edge)
 
     def getNode(self, hexSha: str) -> Optional[GLabeledCommitNode]:
         node = self.nodes.get(hexSha)
@@ -117,7 +638,7 @@ class NodeManager(GitRepoInfoMgr, UIFunctionBase):
         node = self.nodes.get(self.rootNode)
         return node
 
-    def getEdge(self, startNode: str, endNode: str) -> Optional[EdgeLineGraphic]:
+    def getEdge(self, startNode: str, endNode: str) -> Optional[EdgeLineGraphic | BatchedEdge]:
         key: str = f"{startNode}->{endNode}"
         return self.edges.get(key)
 
@@ -142,66 +663,105 @@ class NodeManager(GitRepoInfoMgr, UIFunctionBase):
             return None
 
         loggerPrint(f"remove node '{hexSha}' graphic, pos: ({node.pos().x()}, {node.pos().y()}), radius: {node.rect().width()}")
+        if self.selected is node:
+            self.selected = None
+        node.clearIncidentEdges()
         node.hide()
         self.scene.removeItem(node)
         _ = self.nodes.pop(hexSha)
 
+    # 删除一条边，同时从两端节点的边列表中去掉
+    def removeConnection(self, key: str) -> None:
+        edge = self.edges.pop(key, None)
+        if edge is None:
+            return
+        fromNodeHash, toNodeHash = key.split("->")
+        for hexSha in (fromNodeHash, toNodeHash):
+            node = self.nodes.get(hexSha)
+            if node is not None:
+                node.removeIncidentEdge(edge)
+        self.removeEdgeItem(edge)
+
+    # 场景中已有非虚拟化的图形项、且边的绘制方式没有变化时，刷新可以只更新变化的部分
+    def canReconcile(self) -> bool:
+        if self.isVirtual or self.isEmpty():
+            return False
+        edge = next(iter(self.edges.values()), None)
+        return edge is None or isinstance(edge, BatchedEdge) == self.batchEdges
+
+    # 按新的显示图增量更新场景：只删除消失的节点与边、新建新出现的节点与边
+    # 仍存在的节点保留坐标与选中状态，只刷新提交信息与层级，返回新建的节点（拓扑序）
+    def reconcileScene(self) -> list[str]:
+        # 还没逐帧创建完的节点先全部创建，再与新的显示图比较
+        self.finishPopulation()
+        order = self.displayGraph.topological_sort()
+        wantedNodes = set(order)
+        wantedEdges = {f"{fromHash}->{toHash}" for fromHash, toHash in self.displayGraph.get_all_edges()}
+        for key in [key for key in self.edges if key not in wantedEdges]:
+            self.removeConnection(key)
+        removed = [hexSha for hexSha in self.nodes if hexSha not in wantedNodes]
+        for hexSha in removed:
+            self.removeGraphic(hexSha)
+
+        # 泳道布局的颜色来自布局结果，已有节点保持不变
+        isLayered = self.layoutMode() == LAYOUT_MODE_LAYERED
+        added: list[str] = []
+        for hexSha in order:
+            commitObj = self.displayCommits[hexSha]
+            parents = [self.nodes[parent] for parent in commitObj.parents if parent in self.nodes]
+            level = max((parent.level() for parent in parents), default=-1) + 1
+            node = self.nodes.get(hexSha)
+            if node is not None:
+                node.setCommitInfo(commitObj)
+                node.setLevel(level)
+                fill = self.nodeFill(hexSha)
+                if isLayered and node.brush().color() != fill.color():
+                    node.setBrush(fill)
+                continue
+            pos = parents[0].scenePos() + QPointF(0, NODE_VERTICAL_SPACING) if parents else QPointF(-100, -100)
+            self.createDragableNode(x=pos.x(), y=pos.y(), r=NODE_DIAMETER, commitObj=commitObj, level=level, fill=self.nodeFill(hexSha))
+            added.append(hexSha)
+
+        for key in [key for key in wantedEdges if key not in self.edges]:
+            fromHash, toHash = key.split("->")
+            self.createConnections(fromHash, toHash)
+        loggerPrint(f"reconcile scene: {len(added)} nodes added, {len(removed)} nodes removed")
+        self.notifyLayoutChanged()
+        return added
+
     def destroyAll(self) -> None:
+        self.cancelPopulation()
         for node in self.nodes.values():
             self.scene.removeItem(node)
         self.nodes.clear()
 
-        for edge in self.edges.values():
-            self.scene.removeItem(edge)
+        for edge in list(self.edges.values()) + self.edgePool:
+            self.removeEdgeItem(edge)
         self.edges.clear()
 
+        for node in self.nodePool:
+            self.scene.removeItem(node)
+        self.nodePool.clear()
+        self.edgePool.clear()
+        self.isVirtual = False
+        self.positionTable.clear()
+        self.populatedRect = QRectF()
+        self.virtualLevels.clear()
+        self.virtualColorKeys.clear()
+        self.estimatedRects.clear()
+
         self.selected = None
+        self.notifyLayoutChanged()
 
     def clearAllSelectedGraphic(self) -> None:
         for node in self.nodes.values():
             if node.isSelected():
                 node.setSelected(False)
 
-    def getNodesByLevel(self, level: int) -> list[str]:
-        nodeList: list[str] = []
-        for node in self.nodes.values():
-            if node.level() == level:
-                nodeList.append(node.hexSha())
-        return nodeList
-
-    def nodeMaxLevel(self) -> int:
-        leafNodeList: list[str] = self.all_leaves()
-        maxLevel = 0
-        for nodeHash in leafNodeList:
-            node = self.getNode(nodeHash)
-            if not node:
-                continue
-            maxLevel = max(maxLevel, node.level())
-
-        return maxLevel
-
-    # 判断图中是否有环，按照存档管理的特点，存档之间是不可能合并分支的
-    def isGraphHasCircle(self):
-        visitedNodes: list[str] = []
-        hasCircle: bool = False
-
-        def dfsCheckCircle(node: str):
-            nonlocal hasCircle, visitedNodes
-            if node in visitedNodes:
-                hasCircle = True
-                return
-
-            visitedNodes.append(node)
-            downstreamNodes: list[str] = self.downstream(node)
-            for downNode in downstreamNodes:
-                dfsCheckCircle(downNode)
-
-        rootNode: Optional[GLabeledCommitNode] = self.getRootNode()
-        if rootNode is None:
-            return
-
-        dfsCheckCircle(rootNode.hexSha())
-        return hasCircle
+    # 对整个提交图做结构分析，分别给出环、合并提交、多个根节点与菱形结构
+    # 刷新时 updateBranchMergeBases 已为当前的图建立过 merge-base 索引，直接复用
+    def analyzeGraphStructure(self) -> GraphStructureReport:
+        return analyzeStructure(self, self.mergeBaseIndex)
 
     # dict.values: node, posX, posY
     @pyqtSlot(EventEnum, dict)
@@ -217,176 +777,283 @@ class NodeManager(GitRepoInfoMgr, UIFunctionBase):
             return
 
         node.setPos(posX, posY)
-        data = { "nodeToMove": node }
-        self.uiEmit(EventEnum.UI_GRAPHIC_MGR_MOUSE_MOVE_NODE, data)
-
-    @pyqtSlot(EventEnum, dict)
-    def _logicEvt_arrangeNodeGraphics(self, _: EventEnum = EventEnum.EVENT_INVALID, data: dict = {}):
-        def haveSameParent(nodeAHash: str, nodeBHash: str):
-            nodeA = self.getNode(nodeAHash)
-            nodeB = self.getNode(nodeBHash)
-            if not nodeA or not nodeB:
-                return False, None
-            for nodeAParent in nodeA.parents():
-                if nodeAParent in nodeB.parents():
-                    return True, nodeAParent
-            return False, None
-
-        def groupByParent(sameLevelNodes: list[str]) -> dict:
-            nodeDict: dict[str, list[str]] = {}
-            for nodeA in sameLevelNodes:
-                for nodeB in sameLevelNodes:
-                    isHaveSameParent, parent = haveSameParent(nodeA, nodeB)
-                    if isHaveSameParent and parent is not None:
-                        if not nodeDict.get(parent):
-                            nodeDict[parent] = [nodeA, nodeB]
-                        else:
-                            nodeDict[parent].extend([nodeA, nodeB])
-
-            for parent, grp in nodeDict.items():
-                nodeDict[parent] = listDedup(grp)
-
-            return nodeDict
-
-        def moveNodeList(nodeList: list[str], alphaX: float, alphaY: float):
-            for nodeHash in nodeList:
-                node = self.getNode(nodeHash)
-                if not node:
-                    continue
-                data = {
-                    "node": node,
-                    "posX": node.scenePos().x() + alphaX,
-                    "posY": node.scenePos().y() + alphaY,
-                }
-                self.uiEmit(EventEnum.UI_GRAPHIC_MGR_MOVE_NODE, data)
-
-        def arrangeNodeList(nodeList: list[str]):
-            baseNode = self.getNode(nodeList[0])
-            baseNodePos = self.getNodePosition(nodeList[0])
-            baseNodeSize = self.getNodeGraphicSize(nodeList[0])
-            if baseNode is None or baseNodePos is None or baseNodeSize is None:
-                return
-
-            offsetX = baseNodePos.x() + baseNodeSize.width()
-            for i, nodeHash in enumerate(nodeList[1:]):
-                node = self.getNode(nodeHash)
-                nodeSize = self.getNodeGraphicSize(nodeHash)
-                if node is None or nodeSize is None:
-                    continue
-                data = {
-                    "node": node,
-                    "posX": offsetX + NODE_HORIZONTAL_SPACING * (i + 1),
-                    "posY": baseNode.scenePos().y(),
-                }
-                offsetX += nodeSize.width()
-                self.uiEmit(EventEnum.UI_GRAPHIC_MGR_MOVE_NODE, data)
-
-        # 获取一组节点的外接矩形
-        def getNodeListBoundingRect(nodeList: list[str]) -> QRectF:
-            maxY = -1e6
-            minY = 1e6
-            maxX = -1e6
-            minX = 1e6
-
-            for nodeHash in nodeList:
-                nodePos = self.getNodePosition(nodeHash)
-                nodeSize = self.getNodeGraphicSize(nodeHash)
-                if nodePos is None or nodeSize is None:
-                    continue
-
-                maxX = max(maxX, nodePos.x())
-                minX = min(minX, nodePos.x())
-                maxY = max(maxY, nodePos.y())
-                minY = min(minY, nodePos.y())
-
-            return QRectF(minX, maxY, maxX - minX, maxY - minY)
-
-        # 将一个组内的节点进行排列
-        def arrangeNodeInGroup(grpNodeDict: dict[str, list[str]]) -> QRectF:
-            for parent, grp in grpNodeDict.items():
-                parentNodePos = self.getNodePosition(parent)
-                if parentNodePos is None:
-                    continue
-
-                arrangeNodeList(grp)
-                boundingRect = getNodeListBoundingRect(grp)
-                loggerPrint(f"parent: '{parent}', pos: ({parentNodePos.x()}, {parentNodePos.y()})", level=LogLevels.DEBUG)
-                loggerPrint(f"xRange: ({boundingRect.x()}, {boundingRect.x() + boundingRect.width()}), yRange: ({boundingRect.y()}, {boundingRect.y() + boundingRect.height()}), children: {grp}", level=LogLevels.DEBUG)
-                centerX = (boundingRect.x() + boundingRect.x() + boundingRect.width()) / 2
-                alphaX = parentNodePos.x() - centerX
-                alphaY = parentNodePos.y() + NODE_VERTICAL_SPACING - boundingRect.y()
-                moveNodeList(grp, alphaX, alphaY)
 
-                return getNodeListBoundingRect([node for node in grp] + [parent])
-
-            raise RuntimeError("一个节点不能有两个直接上游节点!")
-
-        # 将根节点与他的每一个子节点都移动相同的位移
-        def moveNodeGroup(grpNodeDict: dict[str, list[str]], alphaX: float, alphaY: float):
-            for parent, grp in grpNodeDict.items():
-                moveNodeList(grp + [parent], alphaX, alphaY)
-                return
+    # 在 UI 线程中把场景中的节点整理成布局计算需要的普通列表，虚拟化时包括没有图形项的节点
+    def buildLayoutRequest(self) -> Optional[LayoutRequest]:
+        self.finishPopulation()
+        nodeHashes = [nodeHash for nodeHash in self.displayGraph.topological_sort() if self.isVirtual or nodeHash in self.nodes]
+        if not nodeHashes:
+            return None
+        index = {nodeHash: i for i, nodeHash in enumerate(nodeHashes)}
+        commits = [self.displayCommits[nodeHash] for nodeHash in nodeHashes]
+        parents = [[index[parent] for parent in commitObj.parents if parent in index] for commitObj in commits]
+        boundingRects = [self.nodeBoundingRect(nodeHash) for nodeHash in nodeHashes]
+        widths = [rect.width() for rect in boundingRects]
+        if self.layoutMode() == LAYOUT_MODE_LAYERED:
+            return LayoutRequest(
+                nodeIds=nodeHashes,
+                parents=parents,
+                widths=widths,
+                horizontalSpacing=NODE_HORIZONTAL_SPACING,
+                verticalSpacing=NODE_VERTICAL_SPACING,
+                generation=self.layoutGeneration,
+            )
 
-            raise RuntimeError("一个节点不能有两个直接上游节点!")
+        branchHeads = self.branchHeadsOf(self.displayCommits)
+        return LayoutRequest(
+            nodeIds=nodeHashes,
+            parents=parents,
+            widths=widths,
+            horizontalSpacing=NODE_LANE_SPACING,
+            verticalSpacing=NODE_LANE_ROW_SPACING,
+            generation=self.layoutGeneration,
+            mode=LAYOUT_MODE_LANES,
+            centers=[NODE_DIAMETER / 2 - rect.x() for rect in boundingRects],
+            sortKeys=[commitObj.commitDate for commitObj in commits],
+            colorKeys=[branchHeads.get(nodeHash, "") for nodeHash in nodeHashes],
+        )
 
-        def arrangeNodeGrps(grpNodeDict: dict[str, list[str]]):
-            for parent, _ in grpNodeDict.items():
-                parentNode = self.getNode(parent)
-                parentNodePos = self.getNodePosition(parent)
-                if parentNode is None or parentNodePos is None:
-                    continue
-                if len(parentNode.parents()) == 0:
-                    continue
-                grandParent = parentNode.parents()[0]
-                grandParentNodePos = self.getNodePosition(grandParent)
-                if grandParentNodePos is None:
-                    continue
-                alphaY = grandParentNodePos.y() + NODE_VERTICAL_SPACING - parentNodePos.y()
-                moveNodeGroup(grpNodeDict, 0, alphaY)
-                break
+    # 在子线程中整理节点，结果通过 UI_GRAPHIC_MGR_APPLY_LAYOUT 回到 UI 线程应用
+    def requestArrange(self) -> None:
+        self.layoutGeneration += 1
+        request = self.buildLayoutRequest()
+        if request is None:
+            return
+        self.uiEmit(EventEnum.LOGIC_GRAPHIC_MANAGER_ARRANGE_NODES, { "request": request })
 
-        maxLevel = self.nodeMaxLevel()
-        # 节点组居中对齐
-        # TODO: 细节待优化，节点移动与边移动不同步
-        for level in range(1, maxLevel + 1):
-            levelNodes: list[str] = self.getNodesByLevel(level)
-            levelGrpNodes = groupByParent(levelNodes)
-            grpBoundingRect = arrangeNodeInGroup(levelGrpNodes)
-            arrangeNodeGrps(levelGrpNodes)
-            loggerPrint(
-                msg=f"level: {level} - {levelGrpNodes} - left: {grpBoundingRect.x()}, right: {grpBoundingRect.x() + grpBoundingRect.width()}, top: {grpBoundingRect.y()}, bottom: {grpBoundingRect.y() + grpBoundingRect.height()}",
-                level=LogLevels.DEBUG,
-            )
+    # 在当前线程中同步整理节点
+    def arrangeNodes(self) -> None:
+        self.layoutGeneration += 1
+        request = self.buildLayoutRequest()
+        if request is None:
+            return
+        self.applyLayoutResult(computeLayout(request))
 
-    # dict: GLabeledColliDetectCommitNode
+    # 把所有节点放到新位置，边随节点移动刷新，第一个节点（根节点）的位置保持不变
+    def applyLayoutResult(self, result: LayoutResult) -> None:
+        if self.isVirtual:
+            self.applyVirtualLayoutResult(result)
+            return
+        nodes = [self.nodes.get(nodeHash) for nodeHash in result.nodeIds]
+        if not nodes or nodes[0] is None:
+            return
+        firstPos = nodes[0].scenePos()
+        offsetX = firstPos.x() + nodes[0].boundingRect().x() - result.xs[0]
+        offsetY = firstPos.y() - result.ys[0]
+        for node, x, y, level in zip(nodes, result.xs, result.ys, result.levels):
+            if node is None:
+                continue
+            node.setLevel(level)
+            node.setPos(x + offsetX - node.boundingRect().x(), y + offsetY)
+        for i, node in enumerate(nodes):
+            if node is None:
+                continue
+            node.setBrush(self.laneFill(result.colorKeys[i]) if result.colorKeys else self.nodeFill(node.hexSha()))
+        self.tidyNodes()
+        self.notifyLayoutChanged()
+        loggerPrint(f"arrange {len(nodes)} nodes into {max(result.levels) + 1} levels, crossings: {result.crossings}", level=LogLevels.DEBUG)
+
+    # 虚拟化时布局结果只写入坐标表，再按视口重新放置图形项
+    def applyVirtualLayoutResult(self, result: LayoutResult) -> None:
+        if not result.nodeIds:
+            return
+        table = self.positionTable
+        firstPos = table.get(result.nodeIds[0])
+        offsetX, offsetY = 0.0, 0.0
+        if firstPos is not None:
+            offsetX = firstPos[0] + self.nodeBoundingRect(result.nodeIds[0]).x() - result.xs[0]
+            offsetY = firstPos[1] - result.ys[0]
+        for hexSha, x, y, level in zip(result.nodeIds, result.xs, result.ys, result.levels):
+            table.set(hexSha, x + offsetX - self.nodeBoundingRect(hexSha).x(), y + offsetY)
+            self.virtualLevels[hexSha] = level
+        self.virtualColorKeys = dict(zip(result.nodeIds, result.colorKeys)) if result.colorKeys else {}
+        self.tidyNodes()
+        self.refreshViewport(force=True)
+        self.notifyLayoutChanged()
+        loggerPrint(f"arrange {len(result.nodeIds)} virtual nodes into {max(result.levels) + 1} levels, crossings: {result.crossings}", level=LogLevels.DEBUG)
+
+    # 去除节点之间的重叠（包括文字标签），只横向移动重叠的节点，返回移动的节点数
+    def tidyNodes(self) -> int:
+        if self.isVirtual:
+            return self.tidyVirtualNodes()
+        hashes = list(self.nodes.keys())
+        if len(hashes) < 2:
+            return 0
+        rects = [self.nodes[hexSha].sceneBoundingRect() for hexSha in hashes]
+        lefts = np.fromiter((rect.left() for rect in rects), dtype=np.float64, count=len(rects))
+        tops = np.fromiter((rect.top() for rect in rects), dtype=np.float64, count=len(rects))
+        widths = np.fromiter((rect.width() for rect in rects), dtype=np.float64, count=len(rects))
+        heights = np.fromiter((rect.height() for rect in rects), dtype=np.float64, count=len(rects))
+        shifts = removeOverlaps(lefts, tops, widths, heights, gap=NODE_OVERLAP_GAP) - lefts
+
+        moved = np.flatnonzero(np.abs(shifts) > 1e-6).tolist()
+        for i in moved:
+            node = self.nodes[hashes[i]]
+            node.setPos(node.scenePos().x() + shifts[i], node.scenePos().y())
+        if moved:
+            self.notifyLayoutChanged()
+            loggerPrint(f"tidy {len(moved)} overlapping nodes")
+        return len(moved)
+
+    # 在坐标表上去除重叠，节点大小使用估算值
+    def tidyVirtualNodes(self) -> int:
+        table = self.positionTable
+        valid = np.flatnonzero(~np.isnan(table.xs))
+        if len(valid) < 2:
+            return 0
+        rects = [self.nodeBoundingRect(table.ids[i]) for i in valid.tolist()]
+        lefts = table.xs[valid] + np.fromiter((rect.x() for rect in rects), dtype=np.float64, count=len(rects))
+        tops = table.ys[valid] + np.fromiter((rect.y() for rect in rects), dtype=np.float64, count=len(rects))
+        widths = np.fromiter((rect.width() for rect in rects), dtype=np.float64, count=len(rects))
+        heights = np.fromiter((rect.height() for rect in rects), dtype=np.float64, count=len(rects))
+        shifts = removeOverlaps(lefts, tops, widths, heights, gap=NODE_OVERLAP_GAP) - lefts
+
+        moved = np.abs(shifts) > 1e-6
+        table.xs[valid[moved]] += shifts[moved]
+        movedCount = int(np.count_nonzero(moved))
+        if movedCount:
+            self.refreshViewport(force=True)
+            self.notifyLayoutChanged()
+            loggerPrint(f"tidy {movedCount} overlapping nodes")
+        return movedCount
+
+    # 运行在子线程中，只处理普通数据，不能访问任何图形项
     @pyqtSlot(EventEnum, dict)
-    def _uiEvt_mouseMoveNode(self, _: EventEnum = EventEnum.EVENT_INVALID, data: dict = {}):
-        nodeToProc = self.selected
-        if data != {}:
-            nodeToProc = data.get("nodeToMove")
-
-        if nodeToProc is None:
+    @timer
+    def _logicEvt_arrangeNodeGraphics(self, _: EventEnum = EventEnum.EVENT_INVALID, data: dict = {}):
+        request: Optional[LayoutRequest] = data.get("request")
+        if request is None:
             return
+        if len(request.nodeIds) >= LAYOUT_PROCESS_NODE_THRESHOLD:
+            result = computeLayoutInProcess(request)
+        else:
+            result = computeLayout(request)
+        self.uiEmit(EventEnum.UI_GRAPHIC_MGR_APPLY_LAYOUT, { "result": result })
 
-        nodeToProcHash = nodeToProc.hexSha()
-        # 找到该节点涉及的所有边，并使这些边更新位置
-        upstreamNodeHash: list[str] = self.upstream(nodeToProcHash)
-        for nodeHash in upstreamNodeHash:
-            inEdge = self.getEdge(nodeHash, nodeToProcHash)
-            upNode = self.getNode(nodeHash)
-            if inEdge is None or upNode is None:
-                continue
-            inEdge.updatePosition(upNode.getNodeGraphicCenter(), nodeToProc.getNodeGraphicCenter())
+    @pyqtSlot(EventEnum, dict)
+    def _uiEvt_applyLayout(self, _: EventEnum, data: dict):
+        result: Optional[LayoutResult] = data.get("result")
+        if result is None or result.generation != self.layoutGeneration:
+            return
+        self.applyLayoutResult(result)
+        self.saveSnapshot()
+        self.saveLayoutCache()
 
-        downstreamNodeHash: list[str] = self.downstream(nodeToProcHash)
-        for nodeHash in downstreamNodeHash:
-            outEdge = self.getEdge(nodeToProcHash, nodeHash)
-            downNode = self.getNode(nodeHash)
-            if outEdge is None or downNode is None:
+    # 拖动结束后延迟保存坐标缓存，拖动引起的碰撞推开的节点也一起保存
+    @pyqtSlot(EventEnum, dict)
+    def _uiEvt_nodeDragFinished(self, _: EventEnum, data: dict):
+        self.notifyLayoutChanged()
+        if self.layoutCacheSavePending:
+            return
+        self.layoutCacheSavePending = True
+        QTimer.singleShot(LAYOUT_CACHE_SAVE_DELAY_MS, self.flushLayoutCache)
+
+    # 增量布局：只给新追加的节点找位置，已有节点保持原坐标，只有被新节点挤到的子树整体右移
+    # nodeHashes 需按拓扑序排列，节点已经创建并连好边
+    def placeAppendedNodes(self, nodeHashes: list[str]) -> None:
+        # 还没返回的整体布局结果已经过期
+        self.layoutGeneration += 1
+        moved: set[str] = set()
+        isLanes = self.layoutMode() == LAYOUT_MODE_LANES
+        newHashes = set(nodeHashes)
+        bottom = max((node.scenePos().y() for hexSha, node in self.nodes.items() if hexSha not in newHashes), default=0.0)
+        for hexSha in nodeHashes:
+            node = self.nodes.get(hexSha)
+            if node is None:
                 continue
-            outEdge.updatePosition(nodeToProc.getNodeGraphicCenter(), downNode.getNodeGraphicCenter())
+            if isLanes:
+                bottom += NODE_LANE_ROW_SPACING
+                self.placeInLane(node, bottom)
+                moved.add(hexSha)
+            else:
+                self.placeUnderParent(node)
+                moved.update(self.pushOverlappingNodes(node))
+        loggerPrint(f"append {len(nodeHashes)} nodes, {len(moved)} nodes moved")
+        self.notifyLayoutChanged()
+
+    # 分层布局中新节点放在第一父节点下一层，父节点已有其他子节点时放在最右边的子节点右侧
+    def placeUnderParent(self, node: GLabeledCommitNode) -> None:
+        parents = [self.nodes[parent] for parent in node.parents() if parent in self.nodes]
+        if not parents:
+            return
+        parent = parents[0]
+        nodeRect = node.boundingRect()
+        y = parent.scenePos().y() + NODE_VERTICAL_SPACING
+        siblings = [
+            self.nodes[child] for child in self.displayCommits[parent.hexSha()].children
+            if child != node.hexSha() and child in self.nodes
+        ]
+        siblings = [sibling for sibling in siblings if sibling.scenePos().y() == y]
+        if siblings:
+            right = max(sibling.sceneBoundingRect().right() for sibling in siblings)
+            x = right + NODE_HORIZONTAL_SPACING - nodeRect.x()
+        else:
+            x = parent.getNodeGraphicCenter().x() - node.rect().width() / 2
+        node.setLevel(max(p.level() for p in parents) + 1)
+        node.setPos(x, y)
+        node.setBrush(self.nodeFill(node.hexSha()))
+
+    # 把与 node 重叠的节点连同其所有下游整体右移，被移动的节点继续检查，返回所有移动过的节点
+    def pushOverlappingNodes(self, node: GLabeledCommitNode, maxChecks: int = 10000) -> set[str]:
+        moved: set[str] = {node.hexSha()}
+        queue: deque[GLabeledCommitNode] = deque([node])
+        checks = 0
+        while queue and checks < maxChecks:
+            current = queue.popleft()
+            checks += 1
+            rect = current.sceneBoundingRect()
+            area = rect.adjusted(-NODE_HORIZONTAL_SPACING / 2, 0, NODE_HORIZONTAL_SPACING / 2, 0)
+            for item in self.scene.items(area):
+                if not isinstance(item, GLabeledCommitNode) or item is current:
+                    continue
+                otherRect = item.sceneBoundingRect()
+                if otherRect.center().x() < rect.center().x():
+                    # 左侧的节点挡住了当前节点，当前节点自己右移后重新检查
+                    if current is not node:
+                        continue
+                    dx = otherRect.right() + NODE_HORIZONTAL_SPACING - rect.left()
+                    if dx > 0:
+                        node.setPos(node.scenePos().x() + dx, node.scenePos().y())
+                        queue.append(node)
+                        break
+                    continue
+                dx = rect.right() + NODE_HORIZONTAL_SPACING - otherRect.left()
+                if dx <= 0:
+                    continue
+                subtree = [item.hexSha()] + self.displayGraph.all_downstreams(item.hexSha())
+                for hexSha in subtree:
+                    subNode = self.nodes.get(hexSha)
+                    if subNode is None or subNode is node:
+                        continue
+                    subNode.setPos(subNode.scenePos().x() + dx, subNode.scenePos().y())
+                    moved.add(hexSha)
+                    queue.append(subNode)
+        return moved
+
+    # 泳道布局中新节点放在最下面的新行，父节点没有其他子节点时沿用父节点的泳道，否则取右侧第一条在这段行之间空闲的泳道
+    def placeInLane(self, node: GLabeledCommitNode, y: float) -> None:
+        parents = [self.nodes[parent] for parent in node.parents() if parent in self.nodes]
+        centerX = self.nodes[next(iter(self.nodes))].getNodeGraphicCenter().x()
+        brush = self.laneFill(self.branchHeadsOf(self.displayCommits).get(node.hexSha(), f"lane-{node.hexSha()}"))
+        if parents:
+            parent = parents[0]
+            centerX = parent.getNodeGraphicCenter().x()
+            otherChildren = [child for child in self.displayCommits[parent.hexSha()].children if child != node.hexSha() and child in self.nodes]
+            if not otherChildren:
+                brush = parent.brush()
+            else:
+                top = parent.sceneBoundingRect().bottom()
+                while True:
+                    centerX += NODE_LANE_SPACING
+                    column = QRectF(centerX - NODE_LANE_SPACING / 4, top, NODE_LANE_SPACING / 2, y - top)
+                    if not any(isinstance(item, GLabeledCommitNode) and item is not node for item in self.scene.items(column)):
+                        break
+            node.setLevel(max(p.level() for p in parents) + 1)
+        node.setPos(centerX - node.rect().width() / 2, y)
+        node.setBrush(brush)
 
     def subscribeEvt(self):
         self.uiSubscribe(EventEnum.LOGIC_GRAPHIC_MANAGER_ARRANGE_NODES, self._logicEvt_arrangeNodeGraphics)
         self.uiSubscribe(EventEnum.UI_GRAPHIC_MGR_MOVE_NODE, self._uiEvt_moveNode)
-        self.uiSubscribe(EventEnum.UI_GRAPHIC_MGR_MOUSE_MOVE_NODE, self._uiEvt_mouseMoveNode)
\ No newline at end of file
+        self.uiSubscribe(EventEnum.UI_GRAPHIC_MGR_APPLY_LAYOUT, self._uiEvt_applyLayout)
+        self.uiSubscribe(EventEnum.UI_GRAPHIC_MGR_NODE_DRAG_FINISHED, self._uiEvt_nodeDragFinished)
\ No newline at end of file
@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent.parent)
+sys.path.append(rootPath)
+
+
+# 由 (行, 列, 4) 的 RGBA 数组生成图片，颜色需已乘上透明度
+# Format_RGBA8888_Premultiplied 的字节顺序固定为 R G B A，与机器的字节序无关
+# 生成后转换为绘制最快的 Format_ARGB32_Premultiplied，转换结果持有自己的数据，不再引用数组
+def imageFromRgba(pixels: np.ndarray) -> QImage:
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    rows, cols = pixels.shape[:2]
+    image = QImage(pixels.tobytes(), cols, rows, cols * 4, QImage.Format.Format_RGBA8888_Premultiplied)
+    return image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
\ No newline at end of file
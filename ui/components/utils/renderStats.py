@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Optional
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent.parent)
+sys.path.append(rootPath)
+
+from core.tools.utils.simpleLogger import loggerPrint
+from core.tools.utils.timeTools import getCurrTimeInFmt
+from ui.publicDefs.styleDefs import RENDER_STATS_FRAME_HISTORY, RENDER_TRACE_MAX_EVENTS
+
+
+# 视图一次重绘的统计：重绘耗时、其中各类图形项的绘制耗时与次数，以及上一帧之后处理的事件
+class FrameStats:
+    def __init__(
+        self,
+        begin: float,
+        duration: float,
+        paintTimes: dict[str, float],
+        paintCounts: dict[str, int],
+        eventTimes: dict[str, float],
+        eventCounts: dict[str, int],
+        queueDepth: int,
+    ):
+        self.begin = begin
+        self.duration = duration
+        self.paintTimes = paintTimes
+        self.paintCounts = paintCounts
+        self.eventTimes = eventTimes
+        self.eventCounts = eventCounts
+        self.queueDepth = queueDepth
+
+
+# 渲染相关的计时：节点绘制、网格背景与事件处理处只在启用时计时，未启用时只多一次属性判断
+# 启用期间保存最近的帧统计供 HUD 显示，同时按 Chrome Trace Event 格式记录，可导出后在 chrome://tracing 或 Perfetto 中查看
+class RenderStats:
+    _singleton = None
+    enabled = False
+    BACKGROUND = "grid background" # 网格背景的绘制耗时与其他图形项记在一起，统计绘制的节点数时排除
+
+    @staticmethod
+    def getSingleton() -> 'RenderStats':
+        if RenderStats._singleton is None:
+            RenderStats._singleton = RenderStats()
+        return RenderStats._singleton
+
+    def __init__(self):
+        self.frames: deque[FrameStats] = deque(maxlen=RENDER_STATS_FRAME_HISTORY)
+        self.traceEvents: list[dict] = []
+        self.origin = time.perf_counter()
+        self.frameBegin: Optional[float] = None
+        self.paintTimes: defaultdict[str, float] = defaultdict(float)
+        self.paintCounts: defaultdict[str, int] = defaultdict(int)
+        self.eventTimes: defaultdict[str, float] = defaultdict(float)
+        self.eventCounts: defaultdict[str, int] = defaultdict(int)
+        self.eventDepth = 0 # 事件处理中再触发的事件，耗时已包含在外层事件中
+
+    # 开启时清空之前的记录
+    def setEnabled(self, enabled: bool) -> None:
+        RenderStats.enabled = enabled
+        if enabled:
+            self.frames.clear()
+            self.traceEvents = []
+            self.origin = time.perf_counter()
+            self.frameBegin = None
+            self.eventTimes.clear()
+            self.eventCounts.clear()
+            self.eventDepth = 0
+
+    def beginFrame(self) -> None:
+        self.frameBegin = time.perf_counter()
+        self.paintTimes.clear()
+        self.paintCounts.clear()
+
+    # queueDepth 为帧结束时还没执行完的后台事件数
+    def endFrame(self, queueDepth: int) -> None:
+        if self.frameBegin is None:
+            return
+        frame = FrameStats(
+            begin=self.frameBegin,
+            duration=time.perf_counter() - self.frameBegin,
+            paintTimes=dict(self.paintTimes),
+            paintCounts=dict(self.paintCounts),
+            eventTimes=dict(self.eventTimes),
+            eventCounts=dict(self.eventCounts),
+            queueDepth=queueDepth,
+        )
+        self.frameBegin = None
+        self.eventTimes.clear()
+        self.eventCounts.clear()
+        self.frames.append(frame)
+        self.traceFrame(frame)
+
+    def addPaint(self, itemClass: str, seconds: float) -> None:
+        self.paintTimes[itemClass] += seconds
+        self.paintCounts[itemClass] += 1
+
+    def enterEvent(self) -> None:
+        self.eventDepth += 1
+
+    # 嵌套的事件只记录到导出的记录中，不重复计入帧统计
+    def exitEvent(self, name: str, begin: float, seconds: float) -> None:
+        self.eventDepth = max(0, self.eventDepth - 1)
+        if self.eventDepth == 0:
+            self.eventTimes[name] += seconds
+            self.eventCounts[name] += 1
+        self.addTraceEvent({ "name": name, "cat": "event", "ph": "X", "ts": self.traceTime(begin), "dur": seconds * 1e6 })
+
+    def traceTime(self, moment: float) -> float:
+        return (moment - self.origin) * 1e6
+
+    # 记录数达到上限后不再记录，避免长时间开启时占用过多内存
+    def addTraceEvent(self, traceEvent: dict) -> None:
+        if len(self.traceEvents) >= RENDER_TRACE_MAX_EVENTS:
+            return
+        traceEvent.setdefault("pid", 0)
+        traceEvent.setdefault("tid", 0)
+        self.traceEvents.append(traceEvent)
+
+    # 一帧中绘制的节点数，不含网格背景；使用设备坐标缓存的节点没有重画时不计入
+    @staticmethod
+    def paintedNodesOf(frame: FrameStats) -> int:
+        return sum(count for itemClass, count in frame.paintCounts.items() if itemClass != RenderStats.BACKGROUND)
+
+    # 一帧记为一段耗时，各类图形项的绘制耗时与数量、后台事件数记为计数器
+    def traceFrame(self, frame: FrameStats) -> None:
+        ts = self.traceTime(frame.begin)
+        self.addTraceEvent({ "name": "frame", "cat": "paint", "ph": "X", "ts": ts, "dur": frame.duration * 1e6, "args": frame.paintCounts })
+        self.addTraceEvent({ "name": "paint ms", "ph": "C", "ts": ts, "args": { k: v * 1000 for k, v in frame.paintTimes.items() } })
+        self.addTraceEvent({ "name": "painted nodes", "ph": "C", "ts": ts, "args": { "nodes": self.paintedNodesOf(frame) } })
+        self.addTraceEvent({ "name": "event queue", "ph": "C", "ts": ts, "args": { "pending": frame.queueDepth } })
+
+    # 最近一段时间的统计，供 HUD 显示
+    def summary(self) -> dict:
+        frames = list(self.frames)
+        if not frames:
+            return {}
+        last = frames[-1]
+        span = last.begin + last.duration - frames[0].begin
+        paintTimes: defaultdict[str, float] = defaultdict(float)
+        eventCount = 0
+        eventTime = 0.0
+        for frame in frames:
+            for itemClass, seconds in frame.paintTimes.items():
+                paintTimes[itemClass] += seconds
+            eventCount += sum(frame.eventCounts.values())
+            eventTime += sum(frame.eventTimes.values())
+        durations = [frame.duration for frame in frames]
+        return {
+            "frameMs": sum(durations) / len(frames) * 1000,
+            "maxFrameMs": max(durations) * 1000,
+            "fps": (len(frames) - 1) / span if len(frames) > 1 and span > 0 else 0.0,
+            "paintMs": { itemClass: seconds / len(frames) * 1000 for itemClass, seconds in paintTimes.items() },
+            "paintCounts": last.paintCounts,
+            "paintedNodes": self.paintedNodesOf(last),
+            "queueDepth": last.queueDepth,
+            "events": eventCount,
+            "eventMs": eventTime * 1000,
+        }
+
+    # 导出记录，默认写到日志目录，返回文件路径
+    def exportTrace(self, path: Optional[str] = None) -> str:
+        if path is None:
+            path = os.path.join('logs', f"renderTrace-{getCurrTimeInFmt(fmt='%y%m%d-%H%M%S')}.json")
+        parentFolder = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(parentFolder):
+            os.makedirs(parentFolder)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({ "traceEvents": self.traceEvents, "displayTimeUnit": "ms" }, f)
+        loggerPrint(f"render trace written to {os.path.abspath(path)}, {len(self.traceEvents)} events")
+        return path
\ No newline at end of file
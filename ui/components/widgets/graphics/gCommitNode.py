@@ -1,9 +1,10 @@
 import sys
+import time
 from pathlib import Path
-from PyQt5.QtWidgets import QGraphicsItem, QGraphicsTextItem, QGraphicsItemGroup, QGraphicsEllipseItem
+from PyQt5.QtWidgets import QGraphicsItem, QStyle
 from PyQt5.QtCore import QRectF, QPointF, Qt
-from PyQt5.QtGui import QBrush, QPen, QColor, QFont, QPainter
-from typing import Callable, override, Any, no_type_check
+from PyQt5.QtGui import QBrush, QPen, QColor, QFont, QFontMetricsF, QPainter, QStaticText, QTransform
+from typing import Callable, Optional, override, Any
 
 rootPath = str(Path(__file__).resolve().parent.parent.parent)
 sys.path.append(rootPath)
@@ -11,50 +12,116 @@ sys.path.append(rootPath)
 from core.tools.utils.simpleLogger import loggerPrint
 from core.gitManager import CommitObj
 from ui.components.utils.uiFunctionBase import UIFunctionBase, EventEnum
+from ui.components.utils.renderStats import RenderStats
+from ui.publicDefs.styleDefs import LOD_DENSITY, LOD_DOT, LOD_KEY_LABELS, LOD_FULL, NODE_LABEL_MAX_WIDTH, NODE_BORDER_DEFAULT_PEN
 
 
-class GCommitNode(QGraphicsEllipseItem, CommitObj):
-    def __init__(self, rect: QRectF, selectCb: Callable, level: int):
-        QGraphicsEllipseItem.__init__(self, rect)
-        CommitObj.__init__(self)
-
-        self.selectCb: Callable = selectCb
-        self.level = level # 表示从根节点到本节点的距离
+# 提交节点：一个图形项在 paint() 中画出圆与下方居中的文字
+# 文字只取提交信息的第一行，过长时省略中间部分，排版结果缓存在 QStaticText 中；外接矩形在内容变化时计算一次
+# 提交信息直接引用 CommitObj，不再逐项复制
+class GLabeledCommitNode(QGraphicsItem):
+    LABEL_MARGIN = 4 # 文字四周的留白
+    _labelFont: Optional[QFont] = None
+    _labelMetrics: Optional[QFontMetricsF] = None
 
-    def setCommitInfo(self, commitObj: CommitObj):
-        for k, v in commitObj.__dict__.items():
-            self.setItem(k, v)
-
-
-class GLabeledCommitNode(QGraphicsItemGroup):
     def __init__(self, rect: QRectF, selectCb: Callable, level: int):
         super().__init__()
 
-        # 创建图形项（例如一个矩形）
-        self.rectItem = GCommitNode(rect, selectCb, level)
-        self.rectItem.setBrush(QBrush(QColor(200, 200, 255)))
+        self.circleRect = QRectF(rect)
+        self.selectCb: Callable = selectCb
+        self._level = level # 表示从根节点到本节点的距离
+        self.commit = CommitObj()
+        self._brush = QBrush(QColor(200, 200, 255))
+        self._pen = QPen(NODE_BORDER_DEFAULT_PEN)
+
+        self.staticText = QStaticText()
+        self.staticText.setTextFormat(Qt.TextFormat.PlainText)
+        self.labelPos = QPointF()
+        self._boundingRect = QRectF()
 
-        # 创建文本项
-        self.font = QFont("微软雅黑")
-        self.textItem = QGraphicsTextItem()
-        self.textItem.setFont(self.font)
-        self.textItem.setDefaultTextColor(QColor("#000"))
-        self.textItem.show()
+        # 细节级别
+        self.drawAsDot = False # 缩小到一定程度后只画不带边框的小方块
+        self.showLabel = True
 
-        # 将两者添加到组中
-        self.addToGroup(self.rectItem)
-        self.addToGroup(self.textItem)
+        # 与本节点相连的边，以及本节点是否为边的起点；节点移动时直接刷新这些边
+        self.incidentEdges: list[tuple[Any, bool]] = []
 
         # 设置可移动
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, True)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable, True)
+        # 设置发送图形变化消息
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges)
+        self.updateGeometry()
+
+    @classmethod
+    def labelFont(cls) -> QFont:
+        if cls._labelFont is None:
+            cls._labelFont = QFont("微软雅黑")
+            cls._labelMetrics = QFontMetricsF(cls._labelFont)
+        return cls._labelFont
+
+    @classmethod
+    def labelMetrics(cls) -> QFontMetricsF:
+        cls.labelFont()
+        assert cls._labelMetrics is not None
+        return cls._labelMetrics
+
+    # 节点上显示的文字：提交信息的第一行，超过最大宽度时省略中间部分
+    @classmethod
+    def labelTextOf(cls, message: str) -> str:
+        return cls.labelMetrics().elidedText(message.split("\n", 1)[0], Qt.TextElideMode.ElideMiddle, NODE_LABEL_MAX_WIDTH)
+
+    # 不创建图形项，按提交信息计算节点在自身坐标系中的外接矩形：圆在上，文字居中放在圆下方
+    @classmethod
+    def boundingRectOf(cls, message: str, diameter: float, penWidth: float = 1.0) -> QRectF:
+        return cls.labelRectOf(cls.labelTextOf(message), diameter).united(QRectF(0, 0, diameter, diameter).adjusted(-penWidth / 2, -penWidth / 2, penWidth / 2, penWidth / 2))
+
+    @classmethod
+    def labelRectOf(cls, text: str, diameter: float) -> QRectF:
+        metrics = cls.labelMetrics()
+        margin = cls.LABEL_MARGIN
+        textWidth = metrics.horizontalAdvance(text)
+        return QRectF((diameter - textWidth) / 2 - margin, diameter, textWidth + 2 * margin, metrics.height() + 2 * margin)
+
+    # 文字或边框变化后重新计算文字位置与外接矩形
+    def updateGeometry(self) -> None:
+        self.prepareGeometryChange()
+        labelRect = self.labelRectOf(self.staticText.text(), self.circleRect.width())
+        self.labelPos = labelRect.topLeft() + QPointF(self.LABEL_MARGIN, self.LABEL_MARGIN)
+        halfPen = self._pen.widthF() / 2
+        self._boundingRect = labelRect.united(self.circleRect.adjusted(-halfPen, -halfPen, halfPen, halfPen))
+
+    @override
+    def boundingRect(self) -> QRectF:
+        return self._boundingRect
+
+    # 开启性能统计时按类记录绘制耗时
+    @override
+    def paint(self, painter: QPainter, option, widget=None):
+        begin = time.perf_counter() if RenderStats.enabled else 0.0
+        if self.drawAsDot:
+            painter.fillRect(self.circleRect, self._brush)
+        else:
+            painter.setPen(self._pen)
+            painter.setBrush(self._brush)
+            painter.drawEllipse(self.circleRect)
+            if self.showLabel:
+                painter.setFont(self.labelFont())
+                painter.setPen(QColor("#000"))
+                painter.drawStaticText(self.labelPos, self.staticText)
+            if option.state & QStyle.StateFlag.State_Selected:
+                painter.setPen(QPen(QColor("#000"), 0, Qt.PenStyle.DashLine))
+                painter.setBrush(Qt.BrushStyle.NoBrush)
+                painter.drawRect(self._boundingRect)
+        if begin:
+            RenderStats.getSingleton().addPaint(type(self).__name__, time.perf_counter() - begin)
 
     @override
     def mousePressEvent(self, event):
         super().mousePressEvent(event)
 
-        if self.isSelected() and self.rectItem.selectCb:
-            self.rectItem.selectCb(self.hexSha(), True)
+        if self.isSelected() and self.selectCb:
+            self.selectCb(self.hexSha(), True)
         if not event:
             return
         self.posBeforeMove = self.scenePos()
@@ -66,97 +133,124 @@ class GLabeledCommitNode(QGraphicsItemGroup):
         if not event:
             return
         loggerPrint(f"move '{self.hexSha()}': ({self.posBeforeMove.x():.1f}, {self.posBeforeMove.y():.1f}) -> ({self.scenePos().x():.1f}, {self.scenePos().y():.1f}), parent: {self.parents()}")
+        if self.scenePos() != self.posBeforeMove:
+            self.uiEmit(EventEnum.UI_GRAPHIC_MGR_NODE_DRAG_FINISHED, { "hexSha": self.hexSha() })
 
     @override
     def setSelected(self, selected: bool) -> None:
         super().setSelected(selected)
-        if self.rectItem.selectCb:
-            self.rectItem.selectCb(self.hexSha(), selected)
+        if self.selectCb:
+            self.selectCb(self.hexSha(), selected)
 
     @override
     def mouseMoveEvent(self, event):
         super().mouseMoveEvent(event)
 
+    # 双击展开/折叠提交链
     @override
-    def boundingRect(self):
-        # 获取所有子项的边界矩形(在组坐标系中)
-        children_rect = QRectF()
-        for child in self.childItems():
-            # 将子项的边界矩形映射到组坐标系
-            child_rect = child.mapRectToParent(child.boundingRect())
-            children_rect = children_rect.united(child_rect)
-        return children_rect
+    def mouseDoubleClickEvent(self, event):
+        super().mouseDoubleClickEvent(event)
+        self.uiEmit(EventEnum.UI_GRAPHIC_MGR_TOGGLE_CHAIN, { "hexSha": self.hexSha() })
+
+    # 分叉、合并、根节点与末端节点，缩小时优先显示它们的文字
+    def isKeyNode(self) -> bool:
+        return len(self.commit.parents) != 1 or len(self.commit.children) != 1
+
+    # 按场景的细节级别切换节点的绘制方式
+    def applyDetailLevel(self, detailLevel: int) -> None:
+        self.setVisible(detailLevel > LOD_DENSITY)
+        drawAsDot = detailLevel <= LOD_DOT
+        showLabel = detailLevel >= LOD_FULL or (detailLevel == LOD_KEY_LABELS and self.isKeyNode())
+        if drawAsDot != self.drawAsDot or showLabel != self.showLabel:
+            self.drawAsDot = drawAsDot
+            self.showLabel = showLabel
+            self.update()
 
     @override
-    def paint(self, painter: QPainter, option, widget=None):
-        # 调用父类绘制
-        super().paint(painter, option, widget)
-
-        # 调试绘制边界矩形(可选)
-        painter.setPen(Qt.GlobalColor.red)
-        painter.drawRect(self.boundingRect())
-
-    @no_type_check
-    def setPos(self, *args):
-        if len(args) == 1:
-            super().setPos(args[0])
-        elif len(args) == 2:
-            super().setPos(QPointF(args[0], args[1]))
-        else:
-            raise TypeError("setPos() takes 1 or 2 arguments")
-        self.uiEmit(EventEnum.UI_GRAPHIC_MGR_MOUSE_MOVE_NODE, {})
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged:
+            self.updateIncidentEdges()
+        return super().itemChange(change, value)
+
+    def addIncidentEdge(self, edge: Any, isStart: bool) -> None:
+        self.incidentEdges.append((edge, isStart))
 
-    def updateTextPosition(self):
-        # 获取当前尺寸
-        rect = self.rectItem.rect()
-        text_rect = self.textItem.boundingRect()
+    def removeIncidentEdge(self, edge: Any) -> None:
+        self.incidentEdges = [(other, isStart) for other, isStart in self.incidentEdges if other is not edge]
 
-        # 计算居中位置
-        x = (rect.width() - text_rect.width()) / 2
-        # y = (rect.height() - text_rect.height()) / 2
-        y = rect.height()
+    def clearIncidentEdges(self) -> None:
+        self.incidentEdges.clear()
 
-        self.textItem.setPos(x, y)
+    # 只移动相连的边在本节点的一端，开销与节点的度数成正比
+    def updateIncidentEdges(self) -> None:
+        if not self.incidentEdges:
+            return
+        center = self.getNodeGraphicCenter()
+        for edge, isStart in self.incidentEdges:
+            line = edge.line()
+            if isStart:
+                edge.updatePosition(center, line.p2())
+            else:
+                edge.updatePosition(line.p1(), center)
 
     def setCommitInfo(self, commitObj: CommitObj):
-        self.rectItem.setCommitInfo(commitObj)
-        self.textItem.setPlainText(commitObj.message)
-        self.updateTextPosition()
+        # 刷新时提交信息是新的对象，文字没有变化时只替换引用
+        isSameMessage = self.commit.message == commitObj.message
+        self.commit = commitObj
+        if isSameMessage:
+            return
+        text = self.labelTextOf(commitObj.message)
+        if text != self.staticText.text():
+            self.staticText.setText(text)
+            self.staticText.prepare(QTransform(), self.labelFont())
+            self.updateGeometry()
+        self.setToolTip(commitObj.message)
+        self.update()
 
     def setBrush(self, brush: QBrush):
-        self.rectItem.setBrush(brush)
+        self._brush = QBrush(brush)
+        self.update()
+
+    def brush(self) -> QBrush:
+        return self._brush
 
     def setPen(self, pen: QPen):
-        self.rectItem.setPen(pen)
+        self._pen = QPen(pen)
+        self.updateGeometry()
+        self.update()
 
     def parents(self) -> list:
-        return self.rectItem.parents
+        return self.commit.parents
 
     def hexSha(self) -> str:
-        return self.rectItem.hexSha
+        return self.commit.hexSha
 
     def level(self) -> int:
-        return self.rectItem.level
+        return self._level
+
+    def setLevel(self, level: int) -> None:
+        self._level = level
 
     def message(self) -> str:
-        return self.rectItem.message
+        return self.commit.message
+
+    def commitDate(self) -> str:
+        return self.commit.commitDate
 
     def rect(self) -> QRectF:
-        return self.rectItem.rect()
+        return self.circleRect
 
     # 获取节点图形的中心
     def getNodeGraphicCenter(self) -> QPointF:
-        x = self.rectItem.scenePos().x() + self.rectItem.boundingRect().width() / 2
-        y = self.rectItem.scenePos().y() + self.rectItem.boundingRect().height() / 2
-        return QPointF(x, y)
+        return self.mapToScene(self.circleRect.center())
 
 
 class GLabeledColliDetectCommitNode(GLabeledCommitNode, UIFunctionBase):
-    def __init__(self, rect: QRectF, selectCb: Callable[..., Any], level: int):
+    def __init__(self, rect: QRectF, selectCb: Callable[..., Any], level: int, moveCb: Optional[Callable[..., Any]] = None):
         super().__init__(rect, selectCb, level)
 
-        # 设置发送图形变化消息
-        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges)
+        # 位置变化后回调，用于场景维护碰撞检测的空间索引
+        self.moveCb = moveCb
 
         # 状态信息
         self.originalPos = self.pos()
@@ -186,6 +280,8 @@ class GLabeledColliDetectCommitNode(GLabeledCommitNode, UIFunctionBase):
                     "newPos": newPos,
                 }
                 self.uiEmit(EventEnum.UI_COLLISION_SCENE_PROC_DETECT, data)
+        elif change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged and self.moveCb:
+            self.moveCb(self)
 
         # 始终按正常方式更新位置
         return super().itemChange(change, value)
\ No newline at end of file
@@ -0,0 +1,135 @@
+import sys
+from math import floor
+from pathlib import Path
+from typing import Optional
+from PyQt5.QtCore import QLineF, QPointF, QTimer
+from PyQt5.QtGui import QColor, QPen, QPainterPath
+from PyQt5.QtWidgets import QGraphicsPathItem, QGraphicsScene
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from ui.publicDefs.styleDefs import EDGE_TILE_SIZE
+
+
+# 合并绘制的一条边：只记录线段，不是图形项，接口与 EdgeLineGraphic 一致
+# 线段变化后所在的网格标记为需要重建
+class BatchedEdge:
+    def __init__(self, batch: 'EdgeBatch', start: QPointF, end: QPointF) -> None:
+        self.batch = batch
+        self._line = QLineF(start, end)
+        self._visible = True
+        self.tileKey: Optional[tuple[int, int]] = None
+
+    def line(self) -> QLineF:
+        return QLineF(self._line)
+
+    def updatePosition(self, start: QPointF, end: QPointF):
+        line = QLineF(start, end)
+        if line == self._line:
+            return
+        self._line = line
+        self.batch.placeEdge(self)
+
+    def isVisible(self) -> bool:
+        return self._visible
+
+    def setVisible(self, visible: bool) -> None:
+        if visible == self._visible:
+            return
+        self._visible = visible
+        self.batch.markDirty(self.tileKey)
+
+    def show(self) -> None:
+        self.setVisible(True)
+
+    def hide(self) -> None:
+        self.setVisible(False)
+
+
+# 一个网格内所有边合成的路径
+class EdgeTileGraphic(QGraphicsPathItem):
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.edges: set[BatchedEdge] = set()
+        self.setPen(QPen(QColor("#000")))
+        self.setZValue(-1)
+
+
+# 按边的起点（父节点）把边分到固定大小的网格中，每个网格只有一个路径图形项
+# 节点移动时只重建相关边所在的网格，同一轮事件循环中的多次移动合并为一次重建
+class EdgeBatch:
+    def __init__(self, scene: QGraphicsScene, tileSize: float = EDGE_TILE_SIZE) -> None:
+        self.scene = scene
+        self.tileSize = tileSize
+        self.tiles: dict[tuple[int, int], EdgeTileGraphic] = {}
+        self.dirtyTiles: set[tuple[int, int]] = set()
+        self.flushScheduled = False
+
+    def __len__(self) -> int:
+        return sum(len(tile.edges) for tile in self.tiles.values())
+
+    def createEdge(self, start: QPointF, end: QPointF) -> BatchedEdge:
+        edge = BatchedEdge(self, start, end)
+        self.placeEdge(edge)
+        return edge
+
+    def removeEdge(self, edge: BatchedEdge) -> None:
+        tile = self.tiles.get(edge.tileKey) if edge.tileKey is not None else None
+        if tile is not None:
+            tile.edges.discard(edge)
+            self.markDirty(edge.tileKey)
+        edge.tileKey = None
+
+    def tileKeyOf(self, point: QPointF) -> tuple[int, int]:
+        return floor(point.x() / self.tileSize), floor(point.y() / self.tileSize)
+
+    # 边的线段变化后重新确定所在的网格，原网格与新网格都需要重建
+    def placeEdge(self, edge: BatchedEdge) -> None:
+        tileKey = self.tileKeyOf(edge.line().p1())
+        if tileKey != edge.tileKey:
+            self.removeEdge(edge)
+            tile = self.tiles.get(tileKey)
+            if tile is None:
+                tile = EdgeTileGraphic()
+                self.tiles[tileKey] = tile
+                self.scene.addItem(tile)
+            tile.edges.add(edge)
+            edge.tileKey = tileKey
+        self.markDirty(tileKey)
+
+    def markDirty(self, tileKey: Optional[tuple[int, int]]) -> None:
+        if tileKey is None:
+            return
+        self.dirtyTiles.add(tileKey)
+        if not self.flushScheduled:
+            self.flushScheduled = True
+            QTimer.singleShot(0, self.flush)
+
+    # 重建所有需要重建的网格，空网格的图形项从场景中移除
+    def flush(self) -> None:
+        self.flushScheduled = False
+        dirtyTiles, self.dirtyTiles = self.dirtyTiles, set()
+        for tileKey in dirtyTiles:
+            tile = self.tiles.get(tileKey)
+            if tile is None:
+                continue
+            if not tile.edges:
+                self.scene.removeItem(tile)
+                del self.tiles[tileKey]
+                continue
+            path = QPainterPath()
+            for edge in tile.edges:
+                if not edge.isVisible():
+                    continue
+                line = edge._line
+                path.moveTo(line.p1())
+                path.lineTo(line.p2())
+            tile.setPath(path)
+
+    def clear(self) -> None:
+        for tile in self.tiles.values():
+            self.scene.removeItem(tile)
+        self.tiles.clear()
+        self.dirtyTiles.clear()
\ No newline at end of file
@@ -1,17 +1,39 @@
 import sys
-from PyQt5.QtWidgets import QGraphicsScene, QGraphicsItem
-from PyQt5.QtGui import QPen, QColor
-from PyQt5.QtCore import Qt, QLineF, QPointF, pyqtSlot, QRectF
+import time
+from math import ceil, log2
+import numpy as np
+from PyQt5.QtWidgets import QGraphicsScene
+from PyQt5.QtGui import QPen, QColor, QImage, QPixmap, QPainter
+from PyQt5.QtCore import Qt, QLineF, QPointF, QTimer, pyqtSlot, QRectF
 from pathlib import Path
 from typing import Optional
 
 rootPath = str(Path(__file__).resolve().parent.parent.parent)
 sys.path.append(rootPath)
 
+from core.algorithms.spatialHash import SpatialHash
 from core.tools.utils.simpleLogger import loggerPrint
 from ui.components.utils.graphicManager import NodeManager
 from ui.components.utils.uiFunctionBase import UIFunctionBase, EventEnum
-from ui.components.widgets.graphics.gCommitNode import GLabeledColliDetectCommitNode
+from ui.components.utils.renderStats import RenderStats
+from ui.components.utils.imageTools import imageFromRgba
+from ui.components.widgets.graphics.gCommitNode import GLabeledCommitNode, GLabeledColliDetectCommitNode
+from ui.components.widgets.graphics.gEdgeLine import EdgeLineGraphic
+from ui.components.widgets.graphics.gEdgeBatch import BatchedEdge
+from ui.publicDefs.styleDefs import (
+    COLLISION_CELL_SIZE,
+    COLLISION_FRAME_INTERVAL_MS,
+    LOD_DENSITY,
+    LOD_FULL,
+    LOD_KEY_LABELS,
+    LOD_SCALE_THRESHOLDS,
+    LOD_DENSITY_CELL_SIZE,
+    LOD_DENSITY_COLOR,
+    GRID_ZOOM_BUCKETS_PER_OCTAVE,
+    GRID_TILE_MIN_PIXELS,
+    GRID_TILE_MAX_PIXELS,
+    GRID_TILE_CACHE_SIZE,
+)
 
 
 class GridScene(NodeManager, QGraphicsScene, UIFunctionBase):
@@ -50,39 +72,201 @@ class SmartGridScene(GridScene):
     def __init__(self, parent=None):
         super().__init__(parent)
 
+        # 细节级别由视图按缩放比例设置
+        self.detailLevel = LOD_FULL
+        # 密度图缓存，节点移动后重新生成
+        self.densityImage: Optional[QImage] = None
+        self.densityRect = QRectF()
+        # 网格背景图块，按缩放档位缓存
+        self.gridTiles: dict[tuple[int, int], QPixmap] = {}
+
+    # 缩放比例对应的细节级别
+    @staticmethod
+    def detailLevelOf(scale: float) -> int:
+        for detailLevel, minScale in LOD_SCALE_THRESHOLDS:
+            if scale >= minScale:
+                return detailLevel
+        return LOD_DENSITY
+
+    # 视图缩放后调用，只有级别变化时才更新各个节点
+    def setViewScale(self, scale: float) -> None:
+        detailLevel = self.detailLevelOf(scale)
+        if detailLevel == self.detailLevel:
+            return
+        self.detailLevel = detailLevel
+        for node in self.nodes.values():
+            node.applyDetailLevel(detailLevel)
+        for edge in self.edges.values():
+            edge.setVisible(detailLevel > LOD_DENSITY)
+        # 虚拟化时进出密度图级别需要释放或重新创建图形项
+        if self.isVirtual:
+            self.refreshViewport(force=True)
+        self.update()
+
+    def nodeMoved(self, node: GLabeledCommitNode) -> None:
+        super().nodeMoved(node)
+        self.densityImage = None
+
+    # 整理、去除重叠与创建节点等布局变化在虚拟化时直接改写坐标表，没有图形项移动，需要在这里让密度图失效
+    def notifyLayoutChanged(self) -> None:
+        self.densityImage = None
+        if self.detailLevel == LOD_DENSITY:
+            self.update()
+        super().notifyLayoutChanged()
+
+    # 只画密度图时不需要任何图形项
+    def virtualNodesVisible(self) -> bool:
+        return self.detailLevel > LOD_DENSITY
+
+    def acquireNode(self, hexSha: str) -> Optional[GLabeledCommitNode]:
+        node = super().acquireNode(hexSha)
+        if node is not None:
+            node.applyDetailLevel(self.detailLevel)
+        return node
+
+    def acquireEdge(self, fromNodeHash: str, toNodeHash: str) -> Optional[EdgeLineGraphic | BatchedEdge]:
+        edge = super().acquireEdge(fromNodeHash, toNodeHash)
+        if edge is not None:
+            edge.setVisible(self.detailLevel > LOD_DENSITY)
+        return edge
+
+    def createDragableNode(self, *args, **kwargs) -> Optional[GLabeledCommitNode]:
+        node = super().createDragableNode(*args, **kwargs)
+        if node is not None and self.detailLevel != LOD_FULL:
+            node.applyDetailLevel(self.detailLevel)
+        return node
+
+    # 子节点变化可能改变节点是否为关键节点
+    def reconcileScene(self) -> list[str]:
+        added = super().reconcileScene()
+        if self.detailLevel == LOD_KEY_LABELS:
+            for node in self.nodes.values():
+                node.applyDetailLevel(self.detailLevel)
+        return added
+
+    def createConnections(self, fromNodeHash: str, toNodeHash: str):
+        super().createConnections(fromNodeHash, toNodeHash)
+        edge = self.getEdge(fromNodeHash, toNodeHash)
+        if edge is not None and self.detailLevel == LOD_DENSITY:
+            edge.hide()
+
+    # 按节点位置统计每个格子中的节点数，生成半透明的密度图，颜色深浅按数量的平方根
+    def buildDensityImage(self) -> None:
+        self.densityImage = None
+        positions = self.currentPositionArray()
+        if not len(positions):
+            return
+        cell = LOD_DENSITY_CELL_SIZE
+        origin = np.floor(positions.min(axis=0) / cell) * cell
+        cols, rows = (np.floor((positions.max(axis=0) - origin) / cell).astype(int) + 1).tolist()
+        counts = np.zeros((rows, cols), dtype=np.float64)
+        cellIndex = np.floor((positions - origin) / cell).astype(int)
+        np.add.at(counts, (cellIndex[:, 1], cellIndex[:, 0]), 1)
+
+        alpha = np.sqrt(counts / counts.max())
+        pixels = np.zeros((rows, cols, 4), dtype=np.uint8)
+        pixels[..., 0] = LOD_DENSITY_COLOR.red() * alpha
+        pixels[..., 1] = LOD_DENSITY_COLOR.green() * alpha
+        pixels[..., 2] = LOD_DENSITY_COLOR.blue() * alpha
+        pixels[..., 3] = 255 * alpha
+        self.densityImage = imageFromRgba(pixels)
+        self.densityRect = QRectF(origin[0], origin[1], cols * cell, rows * cell)
+
+    def drawForeground(self, painter, rect):
+        if not painter or self.detailLevel != LOD_DENSITY:
+            return
+        if self.densityImage is None:
+            self.buildDensityImage()
+        if self.densityImage is not None:
+            painter.drawImage(self.densityRect, self.densityImage)
+
+    # 缩放比例所在的档位，同一档位的网格线宽相同
+    @staticmethod
+    def gridBucketOf(scale: float) -> int:
+        return round(log2(scale) * GRID_ZOOM_BUCKETS_PER_OCTAVE)
+
+    # 把网格画到设备像素的图块中，period 为网格周期（两条主网格线）的像素数，图块包含整数个周期
+    def buildGridTile(self, period: int, bucket: int) -> QPixmap:
+        scale = 2 ** (bucket / GRID_ZOOM_BUCKETS_PER_OCTAVE)
+        size = period * max(1, ceil(GRID_TILE_MIN_PIXELS / period))
+        tile = QPixmap(size, size)
+        tile.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(tile)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # 图块边缘的线只画出一半，另一半由相邻图块的对边补齐
+        self.paintGrid(painter, QRectF(0, 0, size, size), period, scale, scale > 5, inclusive=True)
+        painter.end()
+        return tile
+
+    # 画网格：周期内两条主网格线，subGrid 时额外画五条更密的次级网格线，lineWidth 为主网格线宽
+    def paintGrid(self, painter: QPainter, rect: QRectF, period: float, lineWidth: float, subGrid: bool, inclusive: bool = False) -> None:
+        if subGrid:
+            painter.setPen(QPen(self.grid_color.lighter(120), lineWidth / 2))
+            self._drawGrid(painter, rect, period / 5, inclusive)
+
+        # 主网格
+        painter.setPen(QPen(self.grid_color, lineWidth))
+        self._drawGrid(painter, rect, period / 2, inclusive)
+
+    # 开启性能统计时记录网格背景的绘制耗时
     def drawBackground(self, painter, rect):
-        # 根据视图缩放级别动态调整网格密度
-        views = self.views()
-        if views:
-            view = views[0]  # 获取第一个关联视图
-            transform = view.transform()
-            scale_x = transform.m11()  # 获取水平缩放因子
-
-            # 动态调整网格大小（缩放时网格不会太密或太疏）
-            effective_size = max(20, self.grid_size * (1.0 / scale_x))
-            if scale_x > 5:  # 放大时显示更密的次级网格
-                painter.setPen(QPen(self.grid_color.lighter(120), 0.5))
-                sub_size = effective_size / 5
-                self._drawGrid(painter, rect, sub_size)
-
-            # 主网格
-            painter.setPen(QPen(self.grid_color, 1))
-            self._drawGrid(painter, rect, effective_size / 2)
-
-    # 通用网格绘制方法
-    def _drawGrid(self, painter, rect, size):
+        if not painter:
+            return
+        if not RenderStats.enabled:
+            self.paintBackground(painter, rect)
+            return
+        begin = time.perf_counter()
+        self.paintBackground(painter, rect)
+        RenderStats.getSingleton().addPaint(RenderStats.BACKGROUND, time.perf_counter() - begin)
+
+    # 网格周期随缩放变化（缩放时网格不会太密或太疏），放大时显示更密的次级网格
+    # 网格按设备像素缓存成图块，重绘时直接平铺，每帧的开销与网格密度无关
+    # 使用绘制时实际的缩放比例，导出整个场景时同样适用
+    def paintBackground(self, painter: QPainter, rect: QRectF) -> None:
+        transform = painter.worldTransform()
+        scale = abs(transform.m11())
+        if scale <= 0:
+            return
+        effectiveSize = max(20, self.grid_size * (1.0 / scale))
+        # 周期取整数像素，平铺时图块之间没有接缝
+        period = max(2, round(effectiveSize * scale))
+        if period > GRID_TILE_MAX_PIXELS:
+            self.paintGrid(painter, rect, effectiveSize, 1, scale > 5)
+            return
+
+        key = (period, self.gridBucketOf(scale))
+        tile = self.gridTiles.get(key)
+        if tile is None:
+            if len(self.gridTiles) >= GRID_TILE_CACHE_SIZE:
+                self.gridTiles.clear()
+            tile = self.buildGridTile(*key)
+            self.gridTiles[key] = tile
+
+        deviceRect = QRectF(transform.mapRect(rect).toAlignedRect())
+        origin = transform.map(QPointF(0, 0))
+        size = tile.width()
+        offset = QPointF(round(deviceRect.left() - origin.x()) % size, round(deviceRect.top() - origin.y()) % size)
+        painter.save()
+        painter.resetTransform()
+        painter.drawTiledPixmap(deviceRect, tile, offset)
+        painter.restore()
+
+    # 通用网格绘制方法，inclusive 时也画落在区域右边与下边上的线
+    def _drawGrid(self, painter, rect, size, inclusive: bool = False):
         left = int(rect.left()) - (int(rect.left()) % size)
         top = int(rect.top()) - (int(rect.top()) % size)
+        right = rect.right() + size / 2 if inclusive else rect.right()
+        bottom = rect.bottom() + size / 2 if inclusive else rect.bottom()
 
         lines = []
         # 垂直线
         x = left
-        while x < rect.right():
+        while x < right:
             lines.append(QLineF(x, rect.top(), x, rect.bottom()))
             x += size
         # 水平线
         y = top
-        while y < rect.bottom():
+        while y < bottom:
             lines.append(QLineF(rect.left(), y, rect.right(), y))
             y += size
 
@@ -93,9 +277,54 @@ class ColliDetectSmartScene(SmartGridScene):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.isProcessingCollision = False
+        # 碰撞检测的粗筛：节点外接矩形的空间哈希，节点移动时更新
+        self.spatialHash = SpatialHash(COLLISION_CELL_SIZE)
+
+        # 拖动时的碰撞处理合并到定时器中，每帧最多处理一次，只使用最新的拖动位置
+        self.pendingDraggedItem: Optional[GLabeledColliDetectCommitNode] = None
+        self.collisionTimer = QTimer(self)
+        self.collisionTimer.setSingleShot(True)
+        self.collisionTimer.setInterval(COLLISION_FRAME_INTERVAL_MS)
+        self.collisionTimer.timeout.connect(self.solvePendingCollision)
+        self.lastCollisionIterations = 0 # 最近一次碰撞处理用掉的迭代次数
         self.subscribeEvt()
 
-    # 处理拖动项的碰撞
+    def nodeMoved(self, node: GLabeledCommitNode) -> None:
+        super().nodeMoved(node)
+        rect = node.sceneBoundingRect()
+        self.spatialHash.update(node.hexSha(), rect.left(), rect.top(), rect.right(), rect.bottom())
+
+    def removeGraphic(self, hexSha: str) -> None:
+        super().removeGraphic(hexSha)
+        self.spatialHash.remove(hexSha)
+
+    # 对象池中的节点不参与碰撞检测
+    def releaseNode(self, hexSha: str) -> None:
+        super().releaseNode(hexSha)
+        self.spatialHash.remove(hexSha)
+
+    # 复用的节点位置可能没有变化，不会触发 nodeMoved，主动登记
+    def acquireNode(self, hexSha: str) -> Optional[GLabeledCommitNode]:
+        node = super().acquireNode(hexSha)
+        if node is not None:
+            rect = node.sceneBoundingRect()
+            self.spatialHash.update(hexSha, rect.left(), rect.top(), rect.right(), rect.bottom())
+        return node
+
+    def destroyAll(self) -> None:
+        super().destroyAll()
+        self.spatialHash.clear()
+
+    # 与给定矩形相交的其他节点
+    def collisionCandidates(self, rect: QRectF, node: GLabeledColliDetectCommitNode) -> list[GLabeledColliDetectCommitNode]:
+        candidates: list[GLabeledColliDetectCommitNode] = []
+        for hexSha in self.spatialHash.query(rect.left(), rect.top(), rect.right(), rect.bottom()):
+            other = self.nodes.get(hexSha)
+            if other is not None and other is not node and isinstance(other, GLabeledColliDetectCommitNode):
+                candidates.append(other)
+        return candidates
+
+    # 处理拖动项的碰撞：只记录拖动项，等定时器到期时按它届时的位置统一处理
     @pyqtSlot(EventEnum, dict)
     def _uiEvt_handleCollisionForDraggedItem(self, _: EventEnum, data: dict):
         if self.isProcessingCollision:
@@ -110,20 +339,25 @@ class ColliDetectSmartScene(SmartGridScene):
         if draggedItem is None or newPos is None:
             return
 
-        self.isProcessingCollision = True
-        try:
-            # 保存原始位置并模拟移动
-            originalPos = draggedItem.pos()
-            draggedItem.setPos(newPos)
+        self.pendingDraggedItem = draggedItem
+        if not self.collisionTimer.isActive():
+            self.collisionTimer.start()
 
-            # 一次性处理所有碰撞
-            self.resolveAllCollisions(draggedItem)
-
-            # 还原拖动项的位置，让系统继续处理正常的拖动
-            draggedItem.setPos(originalPos)
+    # 按拖动项当前的位置解决碰撞，推动结果一次性应用，返回被推动的节点数
+    def solvePendingCollision(self) -> int:
+        draggedItem = self.pendingDraggedItem
+        self.pendingDraggedItem = None
+        if draggedItem is None or draggedItem.scene() is not self:
+            return 0
 
+        self.isProcessingCollision = True
+        try:
+            targets = self.resolveAllCollisions(draggedItem)
+            for hexSha, pos in targets.items():
+                self.nodes[hexSha].setPos(pos)
         finally:
             self.isProcessingCollision = False
+        return len(targets)
 
     def distanceSquare(self, node: GLabeledColliDetectCommitNode, draggedNode: GLabeledColliDetectCommitNode):
         node1Center = node.sceneBoundingRect().center()
@@ -131,60 +365,66 @@ class ColliDetectSmartScene(SmartGridScene):
 
         return int(node1Center.x() - node2Center.x()) ** 2 + int(node1Center.y() - node2Center.y()) ** 2
 
-    # 迭代解决场景中所有碰撞
-    def resolveAllCollisions(self, draggedNode):
+    # 迭代解决拖动引起的碰撞，返回被推动的节点 -> 目标位置，不直接移动节点
+    # 只检查拖动项与上一轮被推动的节点周围的节点，候选节点由空间哈希筛出，开销与局部密度成正比
+    # 计算过程中被推动的节点使用暂定的外接矩形，空间哈希同步登记暂定位置
+    def resolveAllCollisions(self, draggedNode) -> dict[str, QPointF]:
         maxIterations = 3  # 限制最大迭代次数
 
-        # 创建要处理的项列表
-        nodesToCheck: list[QGraphicsItem] = list(self.items())
-        nodesToCheck = [node for node in nodesToCheck if isinstance(node, GLabeledColliDetectCommitNode)]
+        rects: dict[str, QRectF] = {}
+        targets: dict[str, QPointF] = {}
+
+        def rectOf(node: GLabeledColliDetectCommitNode) -> QRectF:
+            rect = rects.get(node.hexSha())
+            if rect is None:
+                rect = node.sceneBoundingRect()
+                rects[node.hexSha()] = rect
+            return rect
+
+        nodesToCheck: list[GLabeledColliDetectCommitNode] = [draggedNode]
 
         # 主循环
         for iteration in range(maxIterations):
+            self.lastCollisionIterations = iteration + 1
             collisionFound = False
+            pushedNodes: dict[str, GLabeledColliDetectCommitNode] = {}
 
             # 检查每个项的碰撞
-            for i, node1 in enumerate(nodesToCheck):
-                # 只检查可移动的矩形项
-                if not isinstance(node1, GLabeledColliDetectCommitNode):
-                    continue
-
-                # 跳过被拖动的项（它不应该被推动）
-                if node1 == draggedNode:
-                    continue
-
+            for node1 in nodesToCheck:
                 # 找出碰撞
-                collidingNodes = []
-                for node2 in nodesToCheck:
-                    if (node2 != node1 and isinstance(node2, GLabeledColliDetectCommitNode) and node1.collidesWithItem(node2)):
-                        collidingNodes.append(node2)
-
-                if not collidingNodes:
-                    continue
+                for node2 in self.collisionCandidates(rectOf(node1), node1):
+                    if not rectOf(node1).intersects(rectOf(node2)):
+                        continue
 
-                collisionFound = True
+                    collisionFound = True
 
-                # 对于每个碰撞，计算和应用推动向量
-                for node2 in collidingNodes:
                     # 确定哪一个是固定的，哪一个应该移动
                     nodeToMove, nodeToFixed = self.determineMoveAndFixedNodes(node1, node2, draggedNode)
                     if nodeToMove is None or nodeToFixed is None:
                         continue
 
                     # 计算推动向量
-                    pushVector = self.calculatePushVector(nodeToMove, nodeToFixed)
-                    if pushVector is not None:
-                        # 应用推动向量
-                        targetPos = nodeToMove.pos() + pushVector
-                        nodeToMove.setPos(targetPos)
-                        data = { "nodeToMove": nodeToMove }
-                        self.uiEmit(EventEnum.UI_GRAPHIC_MGR_MOUSE_MOVE_NODE, data)
+                    pushVector = self.calculatePushVector(rectOf(nodeToMove), rectOf(nodeToFixed))
+                    if pushVector is None:
+                        continue
+
+                    # 记录推动结果
+                    hexSha = nodeToMove.hexSha()
+                    rect = rectOf(nodeToMove).translated(pushVector)
+                    rects[hexSha] = rect
+                    targets[hexSha] = targets.get(hexSha, nodeToMove.pos()) + pushVector
+                    self.spatialHash.update(hexSha, rect.left(), rect.top(), rect.right(), rect.bottom())
+                    pushedNodes[hexSha] = nodeToMove
 
             # 如果没有找到碰撞，可以提前退出
             if not collisionFound:
                 break
 
+            # 下一轮只检查被推动的节点
+            nodesToCheck = list(pushedNodes.values())
+
         # 结束处理
+        return targets
 
     # 确定哪个项应该移动，哪个应该保持固定
     def determineMoveAndFixedNodes(self, node1: GLabeledColliDetectCommitNode, node2: GLabeledColliDetectCommitNode, draggedNode: GLabeledColliDetectCommitNode):
@@ -217,10 +457,8 @@ class ColliDetectSmartScene(SmartGridScene):
         else:
             return node1, node2
 
-    # 计算推动向量
-    def calculatePushVector(self, nodeToMove: GLabeledColliDetectCommitNode, nodeToFixed: GLabeledColliDetectCommitNode):
-        nodeToMoveRect = nodeToMove.sceneBoundingRect()
-        nodeToFixedRect = nodeToFixed.sceneBoundingRect()
+    # 由两个节点的外接矩形计算推动向量
+    def calculatePushVector(self, nodeToMoveRect: QRectF, nodeToFixedRect: QRectF):
 
         # 确保矩形实际重叠
         if not nodeToMoveRect.intersects(nodeToFixedRect):
@@ -3,17 +3,23 @@ from pathlib import Path
 from PyQt5.QtWidgets import QGraphicsView, QGraphicsItem, QGraphicsScene
 from PyQt5.QtGui import QPainter
 from PyQt5.QtCore import Qt, QRectF, QPoint
-from typing import override
+from typing import Optional, override
 
 rootPath = str(Path(__file__).resolve().parent.parent.parent)
 sys.path.append(rootPath)
 
 from ui.components.widgets.layouts.gridScene import SmartGridScene
-from ui.components.utils.uiFunctionBase import UIFunctionBase, EventEnum
+from ui.components.widgets.layouts.minimapOverlay import MinimapOverlay
+from ui.components.widgets.layouts.renderHud import RenderHud
+from ui.components.utils.uiFunctionBase import UIFunctionBase
+from ui.components.utils.eventManager import EventManager
+from ui.components.utils.renderStats import RenderStats
 
 class InfiniteCanvasView(QGraphicsView, UIFunctionBase):
     def __init__(self, scene: QGraphicsScene, parent=None):
         super().__init__(parent)
+        self.minimap: Optional[MinimapOverlay] = None
+        self.hud: Optional[RenderHud] = None
         self.setScene(scene)
         self.setRenderHints(QPainter.RenderHint(QPainter.RenderHint.Antialiasing | QPainter.RenderHint.SmoothPixmapTransform))
 
@@ -35,11 +41,55 @@ class InfiniteCanvasView(QGraphicsView, UIFunctionBase):
             }
         """)
 
+        # 可选：视图缓存已画好的背景，平移时只补画新露出的部分，缩放时整体重画
+        if self.uiGetConfig("cacheBackground", ""):
+            self.setCacheMode(QGraphicsView.CacheModeFlag.CacheBackground)
+
+        # 右下角的小地图，配置 hideMinimap 可关闭
+        if not self.uiGetConfig("hideMinimap", ""):
+            self.minimap = MinimapOverlay(self)
+
+        # 左上角的性能信息，F3 切换显示，Shift+F3 导出记录；配置 renderHud 时启动后直接显示
+        if self.uiGetConfig("renderHud", ""):
+            self.setHudVisible(True)
+
         # 初始场景范围
         if not scene:
             return
         scene.setSceneRect(QRectF(-1e6, -1e6, 2e6, 2e6))
 
+    # 显示 HUD 时才开启性能统计
+    def setHudVisible(self, visible: bool) -> None:
+        if visible and self.hud is None:
+            self.hud = RenderHud(self)
+        RenderStats.getSingleton().setEnabled(visible)
+        if self.hud is not None:
+            self.hud.setVisible(visible)
+        self.viewport().update()
+
+    @override
+    def keyPressEvent(self, event):
+        if event and event.key() == Qt.Key.Key_F3:
+            if event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
+                if RenderStats.enabled:
+                    RenderStats.getSingleton().exportTrace()
+            else:
+                self.setHudVisible(not RenderStats.enabled)
+            event.accept()
+            return
+        super().keyPressEvent(event)
+
+    # 开启性能统计时记录每次重绘的耗时
+    @override
+    def paintEvent(self, event):
+        if not RenderStats.enabled:
+            super().paintEvent(event)
+            return
+        stats = RenderStats.getSingleton()
+        stats.beginFrame()
+        super().paintEvent(event)
+        stats.endFrame(EventManager.getSingleton().pendingTaskCount())
+
     @override
     def wheelEvent(self, event):
         # 缩放控制（保持之前实现）
@@ -54,6 +104,34 @@ class InfiniteCanvasView(QGraphicsView, UIFunctionBase):
         self.scale(zoom_factor, zoom_factor)
         self.scale_factor *= zoom_factor
 
+        # 按缩放比例切换节点的细节级别
+        self.notifyViewportChanged()
+        scene = self.scene()
+        if isinstance(scene, SmartGridScene):
+            scene.setViewScale(self.scale_factor)
+
+    # 把当前可见的场景区域告诉场景，虚拟化的场景据此创建或回收图形项
+    def notifyViewportChanged(self) -> None:
+        scene = self.scene()
+        viewport = self.viewport()
+        if isinstance(scene, SmartGridScene) and viewport:
+            scene.refreshViewport(self.mapToScene(viewport.rect()).boundingRect())
+        # 小地图只需要重画视口方框
+        if self.minimap is not None:
+            self.minimap.update()
+
+    @override
+    def scrollContentsBy(self, dx: int, dy: int) -> None:
+        super().scrollContentsBy(dx, dy)
+        self.notifyViewportChanged()
+
+    @override
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        if self.minimap is not None:
+            self.minimap.placeInView()
+        self.notifyViewportChanged()
+
     def procItemPress(self, event):
         super().mousePressEvent(event)
         # 如果点击了可移动项，交给默认处理
@@ -102,8 +180,6 @@ class InfiniteCanvasView(QGraphicsView, UIFunctionBase):
 
     def procItemMove(self, event):
         super().mouseMoveEvent(event)
-        if self._draggingItem:
-            self.uiEmit(EventEnum.UI_GRAPHIC_MGR_MOUSE_MOVE_NODE, {})
 
     @override
     def mouseMoveEvent(self, event):
@@ -0,0 +1,145 @@
+import sys
+from pathlib import Path
+from typing import Optional, override
+
+import numpy as np
+from PyQt5.QtWidgets import QWidget, QGraphicsView
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtCore import Qt, QRectF, QPointF, QSizeF, pyqtSlot
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from ui.components.utils.uiFunctionBase import UIFunctionBase, EventEnum
+from ui.components.utils.imageTools import imageFromRgba
+from ui.components.widgets.layouts.gridScene import SmartGridScene
+from ui.publicDefs.styleDefs import (
+    NODE_DIAMETER,
+    MINIMAP_WIDTH,
+    MINIMAP_HEIGHT,
+    MINIMAP_MARGIN,
+    MINIMAP_PADDING,
+    MINIMAP_BACKGROUND_COLOR,
+    MINIMAP_NODE_COLOR,
+    MINIMAP_VIEWPORT_PEN,
+    MINIMAP_MIN_FRAME_SIZE,
+)
+
+
+# 浮在视图右下角的小地图：按坐标数组把所有节点画成点，结果缓存为一张小图片
+# 只在布局变化后重画图片，平移缩放时只重画表示当前视口的方框；点击或拖动时把视图中心移到对应位置
+class MinimapOverlay(QWidget, UIFunctionBase):
+    def __init__(self, view: QGraphicsView):
+        super().__init__(view)
+
+        self.view = view
+        self.image: Optional[QImage] = None
+        self.imageRect = QRectF() # 图片在小地图中的位置
+        self.sceneArea = QRectF() # 图片覆盖的场景区域
+        self.imageScale = 1.0 # 每个场景单位对应的像素数
+        self.isImageDirty = True
+
+        self.resize(MINIMAP_WIDTH, MINIMAP_HEIGHT)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.uiSubscribe(EventEnum.UI_GRAPHIC_MGR_LAYOUT_CHANGED, self._uiEvt_layoutChanged)
+
+    # 放到视图的右下角，视图大小变化后调用
+    def placeInView(self) -> None:
+        self.move(self.view.width() - self.width() - MINIMAP_MARGIN, self.view.height() - self.height() - MINIMAP_MARGIN)
+
+    # 按节点坐标生成点图，所有节点缩放到小地图内并保持长宽比
+    def buildImage(self) -> None:
+        self.image = None
+        self.isImageDirty = False
+        scene = self.view.scene()
+        if not isinstance(scene, SmartGridScene):
+            return
+        positions = scene.currentPositionArray()
+        if not len(positions):
+            return
+        centers = positions + NODE_DIAMETER / 2
+        left, top = centers.min(axis=0).tolist()
+        right, bottom = centers.max(axis=0).tolist()
+        area = QRectF(left, top, right - left, bottom - top).adjusted(-NODE_DIAMETER, -NODE_DIAMETER, NODE_DIAMETER, NODE_DIAMETER)
+        inner = QRectF(self.rect()).adjusted(MINIMAP_PADDING, MINIMAP_PADDING, -MINIMAP_PADDING, -MINIMAP_PADDING)
+        scale = min(inner.width() / area.width(), inner.height() / area.height())
+        cols = max(1, int(area.width() * scale))
+        rows = max(1, int(area.height() * scale))
+
+        xs = np.clip(((centers[:, 0] - area.left()) * scale).astype(int), 0, cols - 1)
+        ys = np.clip(((centers[:, 1] - area.top()) * scale).astype(int), 0, rows - 1)
+        pixels = np.zeros((rows, cols, 4), dtype=np.uint8)
+        # 每个节点画成 2x2 的点
+        color = (MINIMAP_NODE_COLOR.red(), MINIMAP_NODE_COLOR.green(), MINIMAP_NODE_COLOR.blue(), 255)
+        for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+            pixels[np.minimum(ys + dy, rows - 1), np.minimum(xs + dx, cols - 1)] = color
+        self.image = imageFromRgba(pixels)
+        self.imageRect = QRectF(inner.left() + (inner.width() - cols) / 2, inner.top() + (inner.height() - rows) / 2, cols, rows)
+        self.sceneArea = area
+        self.imageScale = scale
+
+    def sceneToMinimap(self, point: QPointF) -> QPointF:
+        return QPointF(
+            self.imageRect.left() + (point.x() - self.sceneArea.left()) * self.imageScale,
+            self.imageRect.top() + (point.y() - self.sceneArea.top()) * self.imageScale,
+        )
+
+    def minimapToScene(self, point: QPointF) -> QPointF:
+        return QPointF(
+            self.sceneArea.left() + (point.x() - self.imageRect.left()) / self.imageScale,
+            self.sceneArea.top() + (point.y() - self.imageRect.top()) / self.imageScale,
+        )
+
+    @override
+    def paintEvent(self, event) -> None:
+        if self.isImageDirty:
+            self.buildImage()
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(MINIMAP_BACKGROUND_COLOR)
+        painter.drawRoundedRect(QRectF(self.rect()), 6, 6)
+        if self.image is None:
+            return
+        painter.drawImage(self.imageRect.topLeft(), self.image)
+
+        # 当前视口，超出小地图的部分裁掉
+        viewport = self.view.viewport()
+        if viewport is None:
+            return
+        viewRect = self.view.mapToScene(viewport.rect()).boundingRect()
+        frame = QRectF(self.sceneToMinimap(viewRect.topLeft()), self.sceneToMinimap(viewRect.bottomRight()))
+        # 图很大时视口方框可能不到一个像素，至少画成能看清的大小
+        if frame.width() < MINIMAP_MIN_FRAME_SIZE or frame.height() < MINIMAP_MIN_FRAME_SIZE:
+            center = frame.center()
+            frame.setSize(frame.size().expandedTo(QSizeF(MINIMAP_MIN_FRAME_SIZE, MINIMAP_MIN_FRAME_SIZE)))
+            frame.moveCenter(center)
+        painter.setClipRect(QRectF(self.rect()))
+        painter.setPen(MINIMAP_VIEWPORT_PEN)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawRect(frame)
+
+    # 把视图中心移到小地图上的对应位置
+    def recenterView(self, pos: QPointF) -> None:
+        if self.image is None:
+            return
+        self.view.centerOn(self.minimapToScene(pos))
+
+    @override
+    def mousePressEvent(self, event) -> None:
+        if event and event.button() == Qt.MouseButton.LeftButton:
+            self.recenterView(QPointF(event.pos()))
+            event.accept()
+
+    @override
+    def mouseMoveEvent(self, event) -> None:
+        if event and event.buttons() & Qt.MouseButton.LeftButton:
+            self.recenterView(QPointF(event.pos()))
+            event.accept()
+
+    @pyqtSlot(EventEnum, dict)
+    def _uiEvt_layoutChanged(self, _: EventEnum, data: dict) -> None:
+        if data.get("scene") is not self.view.scene():
+            return
+        self.isImageDirty = True
+        self.update()
\ No newline at end of file
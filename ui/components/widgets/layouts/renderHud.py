@@ -0,0 +1,88 @@
+import sys
+from pathlib import Path
+from typing import override
+
+from PyQt5.QtWidgets import QWidget, QGraphicsView
+from PyQt5.QtGui import QPainter, QFont, QFontMetrics
+from PyQt5.QtCore import Qt, QTimer, QRectF
+
+rootPath = str(Path(__file__).resolve().parent.parent.parent)
+sys.path.append(rootPath)
+
+from ui.components.utils.renderStats import RenderStats
+from ui.publicDefs.styleDefs import (
+    RENDER_HUD_REFRESH_MS,
+    RENDER_HUD_MARGIN,
+    RENDER_HUD_BACKGROUND_COLOR,
+    RENDER_HUD_TEXT_COLOR,
+)
+
+
+# 浮在视图左上角的性能信息：帧耗时、各类图形项的绘制耗时、视口内的图形项数、上一帧绘制的节点数与后台事件数
+# 按固定间隔从 RenderStats 取统计并查询视口内的图形项刷新文字，不影响视图本身的重绘，也不接收鼠标事件
+class RenderHud(QWidget):
+    def __init__(self, view: QGraphicsView):
+        super().__init__(view)
+
+        self.view = view
+        self.lines: list[str] = []
+        self.textFont = QFont("Consolas")
+        self.textFont.setStyleHint(QFont.StyleHint.Monospace)
+        self.textFont.setPointSize(9)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.move(RENDER_HUD_MARGIN, RENDER_HUD_MARGIN)
+
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.setInterval(RENDER_HUD_REFRESH_MS)
+        self.refreshTimer.timeout.connect(self.refresh)
+
+    @override
+    def showEvent(self, event) -> None:
+        self.refreshTimer.start()
+        self.refresh()
+        super().showEvent(event)
+
+    @override
+    def hideEvent(self, event) -> None:
+        self.refreshTimer.stop()
+        super().hideEvent(event)
+
+    def refresh(self) -> None:
+        summary = RenderStats.getSingleton().summary()
+        if not summary:
+            self.lines = ["waiting for frames..."]
+        else:
+            self.lines = [
+                f"frame  {summary['frameMs']:6.2f} ms avg  {summary['maxFrameMs']:6.2f} ms max  {summary['fps']:5.1f} fps",
+                f"items  {self.visibleItemCount()} visible  {summary['paintedNodes']} nodes painted in last frame",
+            ]
+            for itemClass, ms in sorted(summary["paintMs"].items(), key=lambda item: -item[1]):
+                self.lines.append(f"  {itemClass:<32} {ms:6.2f} ms  x{summary['paintCounts'].get(itemClass, 0)}")
+            self.lines.append(f"events {summary['events']} handled  {summary['eventMs']:6.2f} ms  queue {summary['queueDepth']}")
+
+        metrics = QFontMetrics(self.textFont)
+        width = max(metrics.horizontalAdvance(line) for line in self.lines) + RENDER_HUD_MARGIN * 2
+        height = metrics.lineSpacing() * len(self.lines) + RENDER_HUD_MARGIN * 2
+        self.resize(width, height)
+        self.update()
+
+    # 视口内的图形项数，包括边与合批的边图块，以及使用缓存没有重画的节点
+    def visibleItemCount(self) -> int:
+        viewport = self.view.viewport()
+        if viewport is None:
+            return 0
+        return len(self.view.items(viewport.rect()))
+
+    @override
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(RENDER_HUD_BACKGROUND_COLOR)
+        painter.drawRoundedRect(QRectF(self.rect()), 4, 4)
+        painter.setFont(self.textFont)
+        painter.setPen(RENDER_HUD_TEXT_COLOR)
+        metrics = QFontMetrics(self.textFont)
+        y = RENDER_HUD_MARGIN + metrics.ascent()
+        for line in self.lines:
+            painter.drawText(RENDER_HUD_MARGIN, y, line)
+            y += metrics.lineSpacing()
\ No newline at end of file
@@ -6,9 +6,82 @@ NODE_BORDER_DEFAULT_PEN = QPen(QColor("#000"))
 
 NODE_ORANGE_FILL_BRUSH = QBrush(QColor("#FC5531"))
 NODE_FILL_DEFAULT_BRUSH = NODE_ORANGE_FILL_BRUSH
+NODE_CHAIN_FILL_BRUSH = QBrush(QColor("#8A95A9")) # 折叠的线性提交链
+# 泳道布局中各分支的颜色，按分支名的哈希取用
+NODE_LANE_FILL_BRUSHES = [QBrush(QColor(color)) for color in ("#FC5531", "#2F80ED", "#27AE60", "#F2C94C", "#9B51E0", "#00B8D9", "#EB5757", "#6FCF97")]
 
+NODE_DIAMETER = 30 # 节点圆的直径
+NODE_LABEL_MAX_WIDTH = 240 # 节点文字的最大宽度，超过时省略中间部分
 NODE_VERTICAL_SPACING = 100
 NODE_HORIZONTAL_SPACING = 100
+NODE_LANE_SPACING = 50 # 泳道布局中相邻泳道的间距
+NODE_LANE_ROW_SPACING = 70 # 泳道布局中相邻行的间距
+NODE_OVERLAP_GAP = 10 # 去除重叠后同一行相邻节点之间的最小间距
+COLLISION_CELL_SIZE = 100 # 拖动碰撞检测空间哈希的网格大小
+COLLISION_FRAME_INTERVAL_MS = 16 # 拖动时碰撞处理的最小间隔，每帧最多处理一次
+
+# 按视图缩放比例分级绘制节点，级别越高细节越多
+LOD_DENSITY = 0 # 隐藏节点与边，只画节点密度图
+LOD_DOT = 1 # 节点画成不带边框的小方块，不显示文字
+LOD_SHAPE = 2 # 画完整的节点图形，不显示文字
+LOD_KEY_LABELS = 3 # 只显示分叉、合并、末端等关键节点的文字
+LOD_FULL = 4 # 显示所有节点的文字
+# 各级别对应的最小缩放比例
+LOD_SCALE_THRESHOLDS = [
+    (LOD_FULL, 0.6),
+    (LOD_KEY_LABELS, 0.35),
+    (LOD_SHAPE, 0.2),
+    (LOD_DOT, 0.05),
+]
+LOD_DENSITY_CELL_SIZE = 200 # 密度图每个像素对应的场景大小
+LOD_DENSITY_COLOR = QColor("#FC5531")
+
+# 提交数量达到该值时自动折叠线性提交链（配置 compressChains 可强制开启或关闭）
+CHAIN_COMPRESS_NODE_THRESHOLD = 1000
+# 节点数量达到该值时布局放到子进程中计算，避免长时间占用 GIL 导致界面卡顿
+LAYOUT_PROCESS_NODE_THRESHOLD = 2000
+# 拖动节点结束后延迟该时间（毫秒）再保存坐标缓存，连续拖动只写一次文件
+LAYOUT_CACHE_SAVE_DELAY_MS = 1000
+# 显示的节点数量达到该值时场景虚拟化：只为视口附近的节点创建图形项（配置 virtualizeScene 可强制开启或关闭）
+VIRTUALIZE_NODE_THRESHOLD = 5000
+# 虚拟化时在视口四周额外创建图形项的范围，相对视口较长边的比例
+VIRTUAL_VIEWPORT_MARGIN_RATIO = 0.5
+# 提交数量达到该值时边按网格合并成少量路径图形项绘制（配置 batchEdges 可强制开启或关闭）
+EDGE_BATCH_NODE_THRESHOLD = 1000
+# 节点数量达到该值时逐帧创建图形项，靠近视口中心的先创建（配置 progressivePopulate 可强制开启或关闭）
+POPULATE_PROGRESSIVE_NODE_THRESHOLD = 500
+# 逐帧创建图形项时每帧最多占用的时间（毫秒）
+POPULATE_FRAME_BUDGET_MS = 8
+# 合并绘制边时每个网格的大小
+EDGE_TILE_SIZE = 1000
+# 网格背景按缩放比例分档缓存图块，每放大一倍分为几档
+GRID_ZOOM_BUCKETS_PER_OCTAVE = 4
+# 网格图块的最小边长（像素），网格很密时一个图块包含多个网格周期，减少平铺次数
+GRID_TILE_MIN_PIXELS = 256
+# 网格周期超过该像素数（放得很大）时不缓存，直接画线
+GRID_TILE_MAX_PIXELS = 4096
+# 最多缓存的网格图块数
+GRID_TILE_CACHE_SIZE = 32
+# 小地图的大小（像素）、距视图边缘的距离与内边距
+MINIMAP_WIDTH = 220
+MINIMAP_HEIGHT = 160
+MINIMAP_MARGIN = 12
+MINIMAP_PADDING = 6
+MINIMAP_BACKGROUND_COLOR = QColor(255, 255, 255, 200)
+MINIMAP_NODE_COLOR = QColor("#FC5531")
+MINIMAP_VIEWPORT_PEN = QPen(QColor("#2F80ED"), 1.5)
+MINIMAP_MIN_FRAME_SIZE = 6 # 视口方框的最小边长（像素）
+
+# 性能信息 HUD：保存最近多少帧的统计、导出记录的最大条数、文字刷新间隔（毫秒）与样式
+RENDER_STATS_FRAME_HISTORY = 120
+RENDER_TRACE_MAX_EVENTS = 200000
+RENDER_HUD_REFRESH_MS = 500
+RENDER_HUD_MARGIN = 8
+RENDER_HUD_BACKGROUND_COLOR = QColor(0, 0, 0, 170)
+RENDER_HUD_TEXT_COLOR = QColor("#E0E0E0")
+
+# 图结构警告弹窗中每一项最多列出的提交数，完整列表写到日志
+STRUCTURE_WARNING_MAX_ENTRIES = 5
 
 msYaheiFont: str = "微软雅黑"
 # 全局标题字体